@@ -21,7 +21,10 @@
 
 """ This module provides basic functionality to handle EOF data, which is a basic output of the OMI calculation. """
 
-import copy
+import concurrent.futures
+import json
+import os
+import shutil
 import typing
 from pathlib import Path
 import numpy as np
@@ -31,8 +34,12 @@ from matplotlib.figure import Figure
 import matplotlib.cm
 import warnings
 
+import mjoindices.tools as tools
 from mjoindices.tools import doy_list
 
+_EOF_DIRECTORY_FORMAT_VERSION = 1
+_EOF_TEXT_CACHE_DIRNAME = ".mjoindices_eof_cache"
+
 
 class EOFData:
     """
@@ -98,6 +105,24 @@ class EOFData:
             self._explained_variances = None
         self._no_observations = no_observations
 
+    @classmethod
+    def _create_view(cls, lat: np.ndarray, long: np.ndarray, eof1: np.ndarray, eof2: np.ndarray,
+                     explained_variances: np.ndarray = None, eigenvalues: np.ndarray = None,
+                     no_observations: int = None) -> "EOFData":
+        """
+        Creates an object, which references the given arrays instead of copying them. This is used by
+        :class:`EOFDataForAllDOYs` to provide read-only views on its data. No consistency checks are performed.
+        """
+        result = cls.__new__(cls)
+        result._lat = lat
+        result._long = long
+        result._eof1 = eof1
+        result._eof2 = eof2
+        result._explained_variances = explained_variances
+        result._eigenvalues = eigenvalues
+        result._no_observations = no_observations
+        return result
+
     def __eq__(self, other: "EOFData") -> bool:
         """
         Override the default equals behavior
@@ -303,17 +328,11 @@ class EOFData:
 
         :param filename: The full path- and filename.
         """
-        lat_full = np.empty(self.eof1vector.size)
-        long_full = np.empty(self.eof1vector.size)
-        for i_vec in range(0, self.eof1vector.size):
-            # find out lat/long corresponding to the vector position by evaluating the index transformation from map
-            # to vector
-            (i_lat, i_long) = np.unravel_index(i_vec, self.eof1map.shape)
-            lat_full[i_vec] = self.lat[i_lat]
-            long_full[i_vec] = self.long[i_long]
-        df = pd.DataFrame(
-            {"Lat": lat_full, "Long": long_full, "EOF1": self.eof1vector, "EOF2": self.eof2vector}).astype(float)
-        df.to_csv(filename, index=False, float_format="%13.7f")
+        # The vector index runs fastest over longitude (C order), see the index transformation from map to vector.
+        lat_full = np.repeat(self.lat, self.long.size)
+        long_full = np.tile(self.long, self.lat.size)
+        data = np.column_stack((lat_full, long_full, self.eof1vector, self.eof2vector)).astype(float)
+        np.savetxt(filename, data, fmt="%13.7f", delimiter=",", header="Lat,Long,EOF1,EOF2", comments="")
 
 
 class EOFDataForAllDOYs:
@@ -324,7 +343,10 @@ class EOFDataForAllDOYs:
     The basic EOF computation function :py:func:`mjoindices.omi.omi_calculator.calc_eofs_from_olr` will return an object
     of this class as a major result of this package.
 
-    The individual EOF pairs are represented by :class:`EOFData` objects.
+    Internally, the EOFs of all DOYs are stored in contiguous 2-dim arrays (first index DOY, second index EOF vector
+    component), which are available via :py:attr:`eof1vectors`, :py:attr:`eof2vectors`, etc.
+    The individual EOF pairs are represented by :class:`EOFData` objects, which are created on demand as read-only
+    views on these arrays.
 
     Note that the user can choose to consider or to ignore leap years in the data. This is probably of interest for the work
     with modeled data, since models might ignore leap years in idealized setups. Here, this means that the number of
@@ -332,7 +354,10 @@ class EOFDataForAllDOYs:
     The code in this package is designed to treat both cases consistently, however, the users should have their own
     choice in mind when working with the results.
 
-    :param eof_list: A list with one :class:`EOFData` object for each DOY.
+    Objects can also be created directly from arrays with :py:meth:`from_arrays`.
+
+    :param eof_list: A list with one :class:`EOFData` object for each DOY. The eigenvalues, explained variances, and
+        numbers of observations have to be given either for all DOYs or for none.
     :param no_leap_years: ``True`` if every year has 365 days, ``False`` if dataset contains leap years.
     """
 
@@ -342,30 +367,91 @@ class EOFDataForAllDOYs:
         elif (not no_leap_years and len(eof_list) != 366):
             raise ValueError("List of EOFs must contain 366 entries for no_leap_years=False") 
 
-        if no_leap_years: 
-            reference_list_len = 365 # number of days in year
-        else:
-            reference_list_len = 366
-        reference_lat = eof_list[0].lat
-        reference_long = eof_list[0].long
-        for i in range(0, reference_list_len):
-            if not np.all(eof_list[i].lat == reference_lat):
-                raise ValueError("All EOFs must have the same latitude grid. Problematic is DOY %i" % i)
-            if not np.all(eof_list[i].long == reference_long):
-                raise ValueError("All EOFs must have the same longitude grid. Problematic is DOY %i" % i)
-        # deepcopy eofs so that they cannot be modified accidentally from outside after the consistency checks
-        self._eof_list = copy.deepcopy(eof_list)
+        deviating_idx = _find_first_deviating_grid([eof.lat for eof in eof_list])
+        if deviating_idx is not None:
+            raise ValueError("All EOFs must have the same latitude grid. Problematic is DOY %i" % deviating_idx)
+        deviating_idx = _find_first_deviating_grid([eof.long for eof in eof_list])
+        if deviating_idx is not None:
+            raise ValueError("All EOFs must have the same longitude grid. Problematic is DOY %i" % deviating_idx)
+
+        self._set_arrays(eof_list[0].lat, eof_list[0].long,
+                         np.stack([eof.eof1vector for eof in eof_list]),
+                         np.stack([eof.eof2vector for eof in eof_list]),
+                         no_leap_years,
+                         explained_variances=_stack_optional([eof.explained_variances for eof in eof_list],
+                                                             "Explained variances"),
+                         eigenvalues=_stack_optional([eof.eigenvalues for eof in eof_list], "Eigenvalues"),
+                         no_observations=_stack_optional([eof.no_observations for eof in eof_list],
+                                                         "Numbers of observations"),
+                         copy_data=False)
+
+    @classmethod
+    def from_arrays(cls, lat: np.ndarray, long: np.ndarray, eof1: np.ndarray, eof2: np.ndarray, no_leap_years: bool,
+                    explained_variances: np.ndarray = None, eigenvalues: np.ndarray = None,
+                    no_observations: np.ndarray = None) -> "EOFDataForAllDOYs":
+        """
+        Creates an object directly from arrays containing the data of all DOYs, without the need to create
+        :class:`EOFData` objects first.
+
+        :param lat: The latitude grid.
+        :param long: The longitude grid.
+        :param eof1: The EOF1 vectors as 2-dim array. The first index corresponds to the DOY (DOY 1 at index 0), the
+            second index to the vector components (see :class:`EOFData`).
+        :param eof2: The EOF2 vectors. Structure similar to ``eof1``.
+        :param no_leap_years: ``True`` if every year has 365 days, ``False`` if dataset contains leap years.
+        :param explained_variances: The explained variances of the EOFs as 2-dim array. The first index corresponds to
+            the DOY, the second index to the EOF number. The spectrum may be truncated, i.e., it may contain less
+            entries than the EOF vectors (but at least 2). Can be set to ``None``.
+        :param eigenvalues: The eigenvalues of the EOFs as 2-dim array. Structure similar to
+            ``explained_variances``. Can be set to ``None``.
+        :param no_observations: The numbers of observations as 1-dim array with one entry for each DOY. Can be set to
+            ``None``.
+
+        :return: The EOFs for all DOYs.
+        """
+        result = cls.__new__(cls)
+        result._set_arrays(lat, long, eof1, eof2, no_leap_years, explained_variances=explained_variances,
+                           eigenvalues=eigenvalues, no_observations=no_observations, copy_data=True)
+        return result
+
+    def _set_arrays(self, lat: np.ndarray, long: np.ndarray, eof1: np.ndarray, eof2: np.ndarray, no_leap_years: bool,
+                    explained_variances: np.ndarray, eigenvalues: np.ndarray, no_observations: np.ndarray,
+                    copy_data: bool) -> None:
+        """
+        Checks the shapes of the given arrays and stores them as read-only arrays.
+        """
+        no_doys = 365 if no_leap_years else 366
+        expected_shape = (no_doys, lat.size * long.size)
+        if eof1.shape != expected_shape or eof2.shape != expected_shape:
+            raise ValueError("EOF1 and EOF2 arrays must have the shape %s (number of DOYs, lat.size*long.size)"
+                             % str(expected_shape))
+        for spectrum, name in ((explained_variances, "Explained variances"), (eigenvalues, "Eigenvalues")):
+            if spectrum is not None and (spectrum.ndim != 2 or spectrum.shape[0] != no_doys
+                                         or not 2 <= spectrum.shape[1] <= expected_shape[1]):
+                raise ValueError("%s (if not None) must have the shape (%i, k) with 2 <= k <= %i"
+                                 % (name, no_doys, expected_shape[1]))
+        if no_observations is not None and no_observations.shape != (no_doys,):
+            raise ValueError("Numbers of observations (if not None) must contain %i entries" % no_doys)
         self._no_leap_years = no_leap_years
+        self._lat = _read_only_array(lat, copy_data)
+        self._long = _read_only_array(long, copy_data)
+        self._eof1 = _read_only_array(eof1, copy_data)
+        self._eof2 = _read_only_array(eof2, copy_data)
+        self._explained_variances = _read_only_array(explained_variances, copy_data)
+        self._eigenvalues = _read_only_array(eigenvalues, copy_data)
+        self._no_observations = _read_only_array(no_observations, copy_data)
 
-    # FIXME: Could this property be used to modify the EOFData objects because they are mutual?
     @property
     def eof_list(self) -> typing.List[EOFData]:
         """
         EOF data for all DOYs as a list.
 
         Remember that DOY 1 corresponds to list entry 0.
+
+        The list is created on each access. The contained :class:`EOFData` objects are read-only views on the data of
+        this container.
         """
-        return self._eof_list
+        return [self.eofdata_for_doy(doy) for doy in doy_list(self._no_leap_years)]
 
     @property
     def no_leap_years(self) -> bool:
@@ -380,14 +466,14 @@ class EOFDataForAllDOYs:
         The latitude grid common to the EOFs of all DOYs.
 
         """
-        return self.eof_list[0].lat
+        return self._lat
 
     @property
     def long(self) -> np.ndarray:
         """
         The longitude grid common to the EOFs of all DOYs.
         """
-        return self.eof_list[0].long
+        return self._long
 
     @property
     def len_eof_list(self) -> int:
@@ -399,15 +485,71 @@ class EOFDataForAllDOYs:
         else:
             return 366
 
+    @property
+    def eof1vectors(self) -> np.ndarray:
+        """
+        The EOF1 vectors of all DOYs as read-only 2-dim array. The first index corresponds to the DOY (DOY 1 at
+        index 0).
+        """
+        return self._eof1
+
+    @property
+    def eof2vectors(self) -> np.ndarray:
+        """
+        The EOF2 vectors of all DOYs as read-only 2-dim array. The first index corresponds to the DOY (DOY 1 at
+        index 0).
+        """
+        return self._eof2
+
+    @property
+    def explained_variances(self) -> np.ndarray:
+        """
+        The explained variances of all EOFs for all DOYs as read-only 2-dim array. The first index corresponds to the
+        DOY (DOY 1 at index 0).
+
+        Note that the spectrum might be truncated (see :py:meth:`save_all_eofs_to_npy_dir`).
+
+        :return: The explained variances. Might be ``None``.
+        """
+        return self._explained_variances
+
+    @property
+    def eigenvalues(self) -> np.ndarray:
+        """
+        The eigenvalues of all EOFs for all DOYs as read-only 2-dim array. The first index corresponds to the
+        DOY (DOY 1 at index 0).
+
+        :return: The eigenvalues. Might be ``None``.
+        """
+        return self._eigenvalues
+
+    @property
+    def no_observations(self) -> np.ndarray:
+        """
+        The numbers of observations for all DOYs as read-only 1-dim array (DOY 1 at index 0).
+
+        :return: The numbers of observations. Might be ``None``.
+        """
+        return self._no_observations
+
     def eofdata_for_doy(self, doy: int) -> EOFData:
         """
         Returns the :class:`EOFData` object for a particular DOY.
 
+        The object is a read-only view on the data of this container. If the spectra of the eigenvalues and explained
+        variances are truncated, they are padded with zeros in the returned object.
+
         :param doy: The DOY
 
         :return: The :class:`EOFData` object
         """
-        return self.eof_list[doy - 1]
+        idx = doy - 1
+        vector_length = self._eof1.shape[1]
+        return EOFData._create_view(self._lat, self._long, self._eof1[idx, :], self._eof2[idx, :],
+                                    explained_variances=_spectrum_row(self._explained_variances, idx, vector_length),
+                                    eigenvalues=_spectrum_row(self._eigenvalues, idx, vector_length),
+                                    no_observations=(None if self._no_observations is None
+                                                     else self._no_observations[idx]))
 
     def eof1vector_for_doy(self, doy: int) -> np.ndarray:
         """
@@ -417,7 +559,7 @@ class EOFDataForAllDOYs:
 
         :return: The vector.
         """
-        return self.eof_list[doy - 1].eof1vector
+        return self._eof1[doy - 1, :]
 
     def eof2vector_for_doy(self, doy: int) -> np.ndarray:
         """
@@ -427,7 +569,7 @@ class EOFDataForAllDOYs:
 
         :return: The vector.
         """
-        return self.eof_list[doy - 1].eof2vector
+        return self._eof2[doy - 1, :]
 
     def explained_variance1_for_all_doys(self):
         """
@@ -436,11 +578,7 @@ class EOFDataForAllDOYs:
         :return: The variance vector.
 
         """
-        doys = doy_list(self._no_leap_years)
-        result = []
-        for doy in doys:
-            result.append(self.eofdata_for_doy(doy).explained_variance_eof1)
-        return np.array(result)
+        return self._column_or_none(self._explained_variances, 0)
 
     def explained_variance2_for_all_doys(self):
         """
@@ -448,23 +586,19 @@ class EOFDataForAllDOYs:
 
         :return: The variance vector.
         """
-        doys = doy_list(self._no_leap_years)
-        result = []
-        for doy in doys:
-            result.append(self.eofdata_for_doy(doy).explained_variance_eof2)
-        return np.array(result)
+        return self._column_or_none(self._explained_variances, 1)
 
     def total_explained_variance_for_all_doys(self):
         """
         Returns a vector containing -for each DOY- the sum of the explained variance over all EOFs.
 
+        If the spectrum of the explained variances is truncated, the sum only covers the retained EOFs.
+
         :return: The variance vector. Should by close to 1 for each DOY if computation was successful.
         """
-        doys = doy_list(self._no_leap_years)
-        result = []
-        for doy in doys:
-            result.append(self.eofdata_for_doy(doy).sum_of_explained_variances)
-        return np.array(result)
+        if self._explained_variances is None:
+            return np.full(self.len_eof_list, None)
+        return np.sum(self._explained_variances, axis=1)
 
     def no_observations_for_all_doys(self):
         """
@@ -473,11 +607,9 @@ class EOFDataForAllDOYs:
 
         :return: The number of observations vector.
         """
-        doys = doy_list(self._no_leap_years)
-        result = []
-        for doy in doys:
-            result.append(self.eofdata_for_doy(doy).no_observations)
-        return np.array(result)
+        if self._no_observations is None:
+            return np.full(self.len_eof_list, None)
+        return self._no_observations.copy()
 
     def eigenvalue1_for_all_doys(self):
         """
@@ -485,11 +617,7 @@ class EOFDataForAllDOYs:
 
         :return: The eigenvalue vector.
         """
-        doys = doy_list(self._no_leap_years)
-        result = []
-        for doy in doys:
-            result.append(self.eofdata_for_doy(doy).eigenvalue_eof1)
-        return np.array(result)
+        return self._column_or_none(self._eigenvalues, 0)
 
     def eigenvalue2_for_all_doys(self):
         """
@@ -497,13 +625,14 @@ class EOFDataForAllDOYs:
 
         :return: The eigenvalue vector.
         """
-        doys = doy_list(self._no_leap_years)
-        result = []
-        for doy in doys:
-            result.append(self.eofdata_for_doy(doy).eigenvalue_eof2)
-        return np.array(result)
+        return self._column_or_none(self._eigenvalues, 1)
+
+    def _column_or_none(self, data: np.ndarray, column: int) -> np.ndarray:
+        if data is None:
+            return np.full(self.len_eof_list, None)
+        return data[:, column].copy()
 
-    def save_all_eofs_to_dir(self, dirname: Path, create_dir=True) -> None:
+    def save_all_eofs_to_dir(self, dirname: Path, create_dir=True, max_workers: int = None) -> None:
         """
         Saves the EOF1 and EOF2 data for each of the DOYs in the given directory.
 
@@ -513,40 +642,146 @@ class EOFDataForAllDOYs:
 
         :param dirname: The directory, where the files will be saved into.
         :param create_dir: If ``True``, the directory (and parent directories) will be created, if not existing.
+        :param max_workers: Maximum number of threads used to write the files concurrently. If ``None``, the default
+            of :py:class:`concurrent.futures.ThreadPoolExecutor` is used.
         """
         if not dirname.exists() and create_dir:
             dirname.mkdir(parents=True, exist_ok=False)
-        for doy in doy_list(self.no_leap_years):
+
+        def save_doy(doy):
             filename = dirname / Path("eof%s.txt" % format(doy, '03'))
             self.eofdata_for_doy(doy).save_eofs_to_txt_file(filename)
 
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # list() propagates exceptions raised during writing
+            list(executor.map(save_doy, doy_list(self.no_leap_years)))
+
     def save_all_eofs_to_npzfile(self, filename: Path) -> None:
         """
         Saves the complete EOF data to a numpy file.
 
         :param filename: The filename.
         """
-        doys = doy_list(self._no_leap_years)
-        eof1 = np.empty((doys.size, self.lat.size * self.long.size))
-        eof2 = np.empty((doys.size, self.lat.size * self.long.size))
-        eigenvalues = np.empty((doys.size, self.lat.size * self.long.size))
-        explained_variances = np.empty((doys.size, self.lat.size * self.long.size))
-        no_observations = np.empty(doys.size)
-        for i in range(0, doys.size):
-            eof = self.eof_list[i]
-            eof1[i, :] = eof.eof1vector
-            eof2[i, :] = eof.eof2vector
-            eigenvalues[i, :] = eof.eigenvalues
-            explained_variances[i, :] = eof.explained_variances
-            no_observations[i] = eof.no_observations
+        optional_data = {}
+        if self._explained_variances is not None:
+            optional_data["explained_variances"] = self._explained_variances
+        if self._eigenvalues is not None:
+            optional_data["eigenvalues"] = self._eigenvalues
+        if self._no_observations is not None:
+            optional_data["no_observations"] = self._no_observations
         np.savez(filename,
-                 eof1=eof1,
-                 eof2=eof2,
-                 explained_variances=explained_variances,
-                 eigenvalues=eigenvalues,
-                 no_observations=no_observations,
+                 eof1=self._eof1,
+                 eof2=self._eof2,
                  lat=self.lat,
-                 long=self.long)
+                 long=self.long,
+                 **optional_data)
+
+    def save_all_eofs_to_npy_dir(self, dirname: Path, no_eigenvalues: int = None, dtype: np.dtype = None,
+                                 create_dir: bool = True) -> None:
+        """
+        Saves the complete EOF data as uncompressed numpy files into a directory.
+
+        In contrast to :py:func:`save_all_eofs_to_npzfile`, the data saved in this way can be memory-mapped when
+        restoring it with :py:func:`restore_all_eofs_from_npy_dir`, so that opening the EOFs is almost instantaneous
+        and the EOFs of individual DOYs are only read from disk when they are accessed.
+
+        The file size can be reduced considerably by retaining only the leading eigenvalues and explained variances
+        and by saving the data in single precision. Note that the explained variances refer to the total variance of the
+        complete spectrum also after the truncation.
+
+        :param dirname: The directory. Existing files of a previously saved dataset will be overwritten.
+        :param no_eigenvalues: The number of retained eigenvalues and explained variances for each DOY (at least 2).
+            If ``None``, the complete spectra are saved.
+        :param dtype: The floating point type of the saved data, e.g., ``np.float32``. If ``None``, the present type is
+            kept.
+        :param create_dir: If ``True``, the directory (and parent directories) will be created, if not existing.
+        """
+        if no_eigenvalues is not None and no_eigenvalues < 2:
+            raise ValueError("At least 2 eigenvalues have to be retained.")
+        dirname = Path(dirname)
+        if not dirname.exists() and create_dir:
+            dirname.mkdir(parents=True, exist_ok=False)
+
+        metadata_filename = dirname / "metadata.json"
+        # invalidate a previously saved dataset until all files have been rewritten
+        tools.remove_metadata_file(metadata_filename)
+
+        def convert(data):
+            return data if dtype is None else data.astype(dtype, copy=False)
+
+        def truncate(spectrum):
+            return None if spectrum is None else convert(spectrum[:, :no_eigenvalues])
+
+        # The files are replaced instead of overwritten, since the data may be memory-mapped from the same directory.
+        tools.save_npy_file(dirname / "eof1.npy", convert(self._eof1))
+        tools.save_npy_file(dirname / "eof2.npy", convert(self._eof2))
+        tools.save_npy_file(dirname / "lat.npy", self.lat)
+        tools.save_npy_file(dirname / "long.npy", self.long)
+        for name, data in (("explained_variances", truncate(self._explained_variances)),
+                           ("eigenvalues", truncate(self._eigenvalues)),
+                           ("no_observations", self._no_observations)):
+            filename = dirname / ("%s.npy" % name)
+            if data is not None:
+                tools.save_npy_file(filename, data)
+            elif filename.exists():
+                # remove the file of a previously saved dataset
+                filename.unlink()
+        # The metadata file is written last, so that an incompletely written directory is not recognized as valid store.
+        metadata = {"content": "EOFDataForAllDOYs", "format_version": _EOF_DIRECTORY_FORMAT_VERSION,
+                    "no_leap_years": self.no_leap_years}
+        tools.write_metadata_file(metadata_filename, metadata)
+
+
+def _find_first_deviating_grid(grids: typing.List[np.ndarray]) -> typing.Optional[int]:
+    """
+    Compares a list of grids with the first grid of the list.
+
+    :return: The index of the first grid, which differs from the first one, or ``None`` if all grids are equal.
+    """
+    reference = grids[0]
+    sizes = np.array([grid.size for grid in grids])
+    deviating = sizes != reference.size
+    same_size_inds = np.nonzero(~deviating)[0]
+    stacked = np.stack([np.ravel(grids[idx]) for idx in same_size_inds])
+    deviating[same_size_inds] = np.any(stacked != np.ravel(reference), axis=1)
+    if np.any(deviating):
+        return int(np.argmax(deviating))
+    return None
+
+
+def _stack_optional(values: typing.List, name: str) -> typing.Optional[np.ndarray]:
+    """
+    Stacks a list of values, which may be ``None``, into an array.
+
+    :return: The array or ``None``, if all values are ``None``.
+    """
+    is_none = [value is None for value in values]
+    if all(is_none):
+        return None
+    if any(is_none):
+        raise ValueError("%s must be given either for all DOYs or for none." % name)
+    return np.stack(values)
+
+
+def _read_only_array(data: np.ndarray, copy_data: bool) -> typing.Optional[np.ndarray]:
+    if data is None:
+        return None
+    result = np.array(data, copy=True) if copy_data else np.asarray(data).view()
+    result.flags.writeable = False
+    return result
+
+
+def _spectrum_row(data: np.ndarray, idx: int, vector_length: int) -> typing.Optional[np.ndarray]:
+    """
+    Returns the spectrum of one DOY, padded with zeros to the length of the EOF vectors, if truncated.
+    """
+    if data is None:
+        return None
+    row = data[idx, :]
+    if row.size < vector_length:
+        row = np.pad(row, (0, vector_length - row.size), 'constant', constant_values=(0, 0))
+        row.flags.writeable = False
+    return row
 
 
 def load_single_eofs_from_txt_file(filename: Path) -> EOFData:
@@ -604,41 +839,54 @@ def load_original_eofs_for_doy(dirname: Path, doy: int) -> EOFData:
     """
     orig_lat = np.arange(-20., 20.1, 2.5)
     orig_long = np.arange(0., 359.9, 2.5)
-    eof1filename = dirname / "eof1" / ("eof" + str(doy).zfill(3) + ".txt")
-    eof1 = np.genfromtxt(eof1filename)
-    eof2filename = dirname / "eof2" / ("eof" + str(doy).zfill(3) + ".txt")
-    eof2 = np.genfromtxt(eof2filename)
+    eof1filename, eof2filename = _original_eof_filenames(dirname, doy)
+    # np.loadtxt is considerably faster than np.genfromtxt for these plain files and yields identical values.
+    eof1 = np.loadtxt(eof1filename)
+    eof2 = np.loadtxt(eof2filename)
     return EOFData(orig_lat, orig_long, eof1, eof2)
 
 
-def load_all_eofs_from_directory(dirname: Path) -> EOFDataForAllDOYs:
+def _original_eof_filenames(dirname: Path, doy: int) -> typing.Tuple[Path, Path]:
+    return (Path(dirname) / "eof1" / ("eof" + str(doy).zfill(3) + ".txt"),
+            Path(dirname) / "eof2" / ("eof" + str(doy).zfill(3) + ".txt"))
+
+
+def load_all_eofs_from_directory(dirname: Path, max_workers: int = None, use_cache: bool = False) -> EOFDataForAllDOYs:
     """
     Loads the EOF functions (created with the function :py:func:`EOFDataForAllDOYs.save_all_eofs_to_dir`)
     for all DOYs from the given directory
 
+    The files are parsed concurrently in a thread pool.
+
     :param dirname: The directory in which the files are stored.
+    :param max_workers: Maximum number of threads used for parsing. If ``None``, the default of
+        :py:class:`concurrent.futures.ThreadPoolExecutor` is used.
+    :param use_cache: If ``True``, the parsed EOFs are additionally saved in a binary format into the sub directory
+        ``.mjoindices_eof_cache`` of ``dirname``. Subsequent calls will then only read the memory-mapped binary data,
+        as long as the sizes and modification times of the text files are unchanged.
 
     :return: The EOFs for all DOYs.
     """
-    eofs = []
-    for doy in doy_list(no_leap_years=False):
-        filename = dirname / Path("eof%s.txt" % format(doy, '03'))
-        if doy < 366:
-            eof = load_single_eofs_from_txt_file(filename)
-            eofs.append(eof) 
-        else:
-            # try to load DOY 366 from directory, if it exists. 
-            try:
-                eof = load_single_eofs_from_txt_file(filename)
-                eofs.append(eof)
-                no_leap_years = False
-            except:
-                no_leap_years = True
-                warnings.warn('No EOFs from DOY 366 in directory. Assuming no leap years in dataset.')            
-    return EOFDataForAllDOYs(eofs, no_leap_years) 
-
-
-def load_all_original_eofs_from_directory(dirname: Path) -> EOFDataForAllDOYs:
+    dirname = Path(dirname)
+    filenames = [dirname / Path("eof%s.txt" % format(doy, '03')) for doy in doy_list(no_leap_years=False)]
+    # try to load DOY 366 from directory, if it exists.
+    no_leap_years = not filenames[-1].is_file()
+    if no_leap_years:
+        filenames = filenames[:-1]
+        warnings.warn('No EOFs from DOY 366 in directory. Assuming no leap years in dataset.')
+
+    def parse():
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            eofs = list(executor.map(load_single_eofs_from_txt_file, filenames))
+        return EOFDataForAllDOYs(eofs, no_leap_years)
+
+    if use_cache:
+        return _load_eofs_using_cache(dirname / _EOF_TEXT_CACHE_DIRNAME, filenames, parse)
+    return parse()
+
+
+def load_all_original_eofs_from_directory(dirname: Path, max_workers: int = None,
+                                          use_cache: bool = False) -> EOFDataForAllDOYs:
     """
     Loads the EOF functions for all DOYs from the original file format.
 
@@ -652,14 +900,75 @@ def load_all_original_eofs_from_directory(dirname: Path) -> EOFDataForAllDOYs:
     :param dirname: Path to the directory, in which the EOFs for all DOYs are stored.
         This path should contain the sub directories "eof1" and "eof2", in which the 366 files each are located:
         One file per day of the year.
+    :param max_workers: See :py:func:`load_all_eofs_from_directory`.
+    :param use_cache: See :py:func:`load_all_eofs_from_directory`. The cache is placed into the sub directory
+        ``.mjoindices_eof_cache`` of ``dirname``.
 
     :return: The original EOFs for all DOYs.
     """
-    eofs = []
-    for doy in doy_list(no_leap_years=False): # the original files contain leap years
-        eof = load_original_eofs_for_doy(dirname, doy)
-        eofs.append(eof)
-    return EOFDataForAllDOYs(eofs, no_leap_years=False)
+    dirname = Path(dirname)
+    doys = doy_list(no_leap_years=False)  # the original files contain leap years
+
+    def parse():
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            eofs = list(executor.map(lambda doy: load_original_eofs_for_doy(dirname, doy), doys))
+        return EOFDataForAllDOYs(eofs, no_leap_years=False)
+
+    if use_cache:
+        filenames = [filename for doy in doys for filename in _original_eof_filenames(dirname, doy)]
+        return _load_eofs_using_cache(dirname / _EOF_TEXT_CACHE_DIRNAME, filenames, parse)
+    return parse()
+
+
+def _load_eofs_using_cache(cache_dirname: Path, source_filenames: typing.List[Path],
+                           parse: typing.Callable[[], EOFDataForAllDOYs]) -> EOFDataForAllDOYs:
+    """
+    Loads EOFs from a binary cache, if the cache is valid for the given source files. Otherwise, the EOFs are parsed
+    from the source files and the cache is (re-)written.
+
+    The cache is valid if it has been created from the same list of files with the same sizes and modification times.
+    An outdated cache is not overwritten in place, since EOFs restored from it earlier may still be memory-mapped from
+    its files. Instead, the new cache is written into a sibling directory, which then replaces the old one by renaming.
+
+    :param cache_dirname: The directory of the cache.
+    :param source_filenames: The files from which the EOFs are parsed.
+    :param parse: Function without arguments, which parses the EOFs from the source files.
+
+    :return: The EOFs for all DOYs.
+    """
+    fingerprint = []
+    for filename in source_filenames:
+        stat = Path(filename).stat()
+        fingerprint.append([Path(filename).relative_to(cache_dirname.parent).as_posix(), stat.st_size,
+                            stat.st_mtime_ns])
+    fingerprint_filename = cache_dirname / "source_files.json"
+    if fingerprint_filename.is_file():
+        try:
+            with open(fingerprint_filename, "r") as f:
+                cached_fingerprint = json.load(f)
+            if cached_fingerprint == fingerprint:
+                return restore_all_eofs_from_npy_dir(cache_dirname)
+        except (OSError, ValueError):
+            pass
+    eofs = parse()
+    new_dirname = cache_dirname.with_name("%s.new-%i" % (cache_dirname.name, os.getpid()))
+    old_dirname = cache_dirname.with_name("%s.old-%i" % (cache_dirname.name, os.getpid()))
+    try:
+        shutil.rmtree(new_dirname, ignore_errors=True)
+        shutil.rmtree(old_dirname, ignore_errors=True)
+        eofs.save_all_eofs_to_npy_dir(new_dirname)
+        # The fingerprint is written last, so that an incompletely written cache is not considered valid.
+        tools.write_metadata_file(new_dirname / "source_files.json", fingerprint)
+        if cache_dirname.exists():
+            os.replace(cache_dirname, old_dirname)
+        os.replace(new_dirname, cache_dirname)
+    except OSError as e:
+        warnings.warn("EOF cache could not be written into %s: %s" % (str(cache_dirname), str(e)))
+        shutil.rmtree(new_dirname, ignore_errors=True)
+    # Files which are still memory-mapped remain readable after the removal on POSIX systems. Elsewhere, the old
+    # directory is left behind and removed at the next rewrite of the cache.
+    shutil.rmtree(old_dirname, ignore_errors=True)
+    return eofs
 
 
 def restore_all_eofs_from_npzfile(filename: Path) -> EOFDataForAllDOYs:
@@ -675,10 +984,9 @@ def restore_all_eofs_from_npzfile(filename: Path) -> EOFDataForAllDOYs:
         eof2 = data["eof2"]
         lat = data["lat"]
         long = data["long"]
-        eigenvalues = data["eigenvalues"]
-        explained_variances = data["explained_variances"]
-        no_observations = data["no_observations"]
-    eofs = []
+        eigenvalues = data["eigenvalues"] if "eigenvalues" in data else None
+        explained_variances = data["explained_variances"] if "explained_variances" in data else None
+        no_observations = data["no_observations"] if "no_observations" in data else None
     if eof1.shape[0] == 365:
         no_leap_years = True # sets True if no leap years in dataset. 
     elif eof1.shape[0] == 366:
@@ -686,13 +994,50 @@ def restore_all_eofs_from_npzfile(filename: Path) -> EOFDataForAllDOYs:
     else:
         raise ValueError('Dataset does not have EOFs from each day of year.')
 
-    for i in range(0, doy_list(no_leap_years).size):
-        eof = EOFData(lat, long, np.squeeze(eof1[i, :]), np.squeeze(eof2[i, :]),
-                      eigenvalues=np.squeeze(eigenvalues[i, :]),
-                      explained_variances=np.squeeze(explained_variances[i, :]),
-                      no_observations=no_observations[i])
-        eofs.append(eof)
-    return EOFDataForAllDOYs(eofs, no_leap_years)
+    # The arrays have been freshly read from the file, so that they do not need to be copied again.
+    result = EOFDataForAllDOYs.__new__(EOFDataForAllDOYs)
+    result._set_arrays(lat, long, eof1, eof2, no_leap_years, explained_variances=explained_variances,
+                       eigenvalues=eigenvalues, no_observations=no_observations, copy_data=False)
+    return result
+
+
+def restore_all_eofs_from_npy_dir(dirname: Path, mmap_mode: str = "r") -> EOFDataForAllDOYs:
+    """
+    Loads all EOF data from a directory, which was written with :py:func:`EOFDataForAllDOYs.save_all_eofs_to_npy_dir`.
+
+    By default, the data is memory-mapped instead of being read completely, so that only the EOFs of the DOYs, which
+    are actually accessed, are read from disk.
+
+    :param dirname: The directory.
+    :param mmap_mode: The memory-map mode as described for :py:func:`numpy.load`. The default ``"r"`` opens the
+        data read-only. If ``None``, the data is read completely into memory.
+
+    :return: The EOFs for all DOYs.
+    """
+    dirname = Path(dirname)
+    metadata_filename = dirname / "metadata.json"
+    if not metadata_filename.is_file():
+        raise ValueError("Directory %s does not contain a valid EOF dataset." % str(dirname))
+    with open(metadata_filename, "r") as f:
+        metadata = json.load(f)
+    if (metadata.get("content") != "EOFDataForAllDOYs"
+            or metadata.get("format_version", 0) > _EOF_DIRECTORY_FORMAT_VERSION):
+        raise ValueError("Directory %s does not contain an EOF dataset in a supported format." % str(dirname))
+
+    def load_optional(name):
+        filename = dirname / ("%s.npy" % name)
+        return np.load(filename, mmap_mode=mmap_mode) if filename.is_file() else None
+
+    result = EOFDataForAllDOYs.__new__(EOFDataForAllDOYs)
+    result._set_arrays(np.load(dirname / "lat.npy"), np.load(dirname / "long.npy"),
+                       np.load(dirname / "eof1.npy", mmap_mode=mmap_mode),
+                       np.load(dirname / "eof2.npy", mmap_mode=mmap_mode),
+                       metadata["no_leap_years"],
+                       explained_variances=load_optional("explained_variances"),
+                       eigenvalues=load_optional("eigenvalues"),
+                       no_observations=load_optional("no_observations"),
+                       copy_data=False)
+    return result
 
 
 def plot_explained_variance_for_all_doys(eofs: EOFDataForAllDOYs, include_total_variance: bool = False,
@@ -23,11 +23,15 @@
 This module provides basic functionality to handle OLR data, which is the basic input for the OMI calculation.
 """
 
+import concurrent.futures
+import glob
+import json
+import threading
+import typing
 from pathlib import Path
 
 import numpy as np
 import scipy
-import scipy.interpolate
 from matplotlib.figure import Figure
 import scipy.io
 import netCDF4 as netcdf4
@@ -35,6 +39,11 @@ import matplotlib.pyplot as plt
 
 import mjoindices.tools as tools
 
+# The NetCDF4/HDF5 libraries are not thread-safe, so that all accesses from several threads have to be serialized.
+_netcdf4_lock = threading.Lock()
+
+_OLR_DIRECTORY_FORMAT_VERSION = 1
+
 
 class OLRData:
     """
@@ -47,31 +56,115 @@ class OLRData:
     :param time: The temporal grid as 1-dim array of :class:`numpy.datetime64` dates.
     :param lat: The latitude grid as 1-dim array.
     :param long: The longitude grid as 1-dim array.
+    :param copy_data: If ``False``, the given arrays are stored directly instead of copies of them. This avoids an
+        additional copy of large data cubes, but the caller must not modify the arrays afterwards.
+    :param scale_factor: If given (together with or without ``add_offset``), the OLR data is treated as packed integer
+        data (e.g., int16), which is decoded according to ``olr * scale_factor + add_offset``. The packed cube needs
+        only a quarter of the memory of the decoded float64 cube. See :py:func:`pack_olr_data`.
+    :param add_offset: The offset for packed data. See ``scale_factor``.
     """
 
-    def __init__(self, olr: np.ndarray, time: np.ndarray, lat: np.ndarray, long: np.ndarray) -> None:
+    def __init__(self, olr: np.ndarray, time: np.ndarray, lat: np.ndarray, long: np.ndarray,
+                 copy_data: bool = True, scale_factor: float = None, add_offset: float = None) -> None:
         """
         Initialization of basic variables.
         """
+        is_packed = scale_factor is not None or add_offset is not None
+        if is_packed and not np.issubdtype(olr.dtype, np.integer):
+            raise ValueError('Packed OLR data has to be of an integer type, but is of type %s' % str(olr.dtype))
         if olr.shape[0] != time.size:
             raise ValueError('Length of time grid does not fit to first dimension of OLR data cube')
         if olr.shape[1] != lat.size:
             raise ValueError('Length of lat grid does not fit to second dimension of OLR data cube')
         if olr.shape[2] != long.size:
             raise ValueError('Length of long grid does not fit to third dimension of OLR data cube')
-        self._olr = olr.copy()
-        self._time = time.copy()
-        self._lat = lat.copy()
-        self._long = long.copy()
+        if copy_data:
+            self._olr = olr.copy()
+            self._time = time.copy()
+            self._lat = lat.copy()
+            self._long = long.copy()
+        else:
+            self._olr = olr
+            self._time = time
+            self._lat = lat
+            self._long = long
+        if is_packed:
+            self._scale_factor = 1. if scale_factor is None else float(scale_factor)
+            self._add_offset = 0. if add_offset is None else float(add_offset)
+        else:
+            self._scale_factor = None
+            self._add_offset = None
 
     @property
     def olr(self):
         """
         The OLR data as a 3-dim array. The three dimensions correspond to time, latitude, and longitude, in this
         order.
+
+        For packed data, the complete cube is decoded into a new float64 array on each access. Use
+        :py:func:`get_olr_block` to decode only the part of the data, which is actually needed.
         """
+        if self.is_packed:
+            return self._decode(self._olr)
         return self._olr
 
+    @property
+    def is_packed(self) -> bool:
+        """
+        ``True`` if the OLR data is stored as packed integers with scale factor and offset.
+        """
+        return self._scale_factor is not None
+
+    @property
+    def packed_olr(self) -> np.ndarray:
+        """
+        The packed (not decoded) OLR data cube or ``None``, if the data is not packed.
+        """
+        return self._olr if self.is_packed else None
+
+    @property
+    def scale_factor(self) -> float:
+        """
+        The scale factor of packed data or ``None``, if the data is not packed.
+        """
+        return self._scale_factor
+
+    @property
+    def add_offset(self) -> float:
+        """
+        The offset of packed data or ``None``, if the data is not packed.
+        """
+        return self._add_offset
+
+    def get_olr_block(self, index) -> np.ndarray:
+        """
+        Returns a part of the OLR data cube.
+
+        For packed data, only the selected part is decoded. For unpacked data, the result of basic indexing is a view
+        on the data cube, as with ``olr.olr[index]``.
+
+        :param index: Any numpy index applicable to the 3-dim OLR data cube, e.g., ``np.s_[:, 3, :]``.
+
+        :return: The selected OLR values.
+        """
+        block = self._olr[index]
+        if self.is_packed:
+            block = self._decode(block)
+        return block
+
+    def mean_olr(self) -> float:
+        """
+        Returns the mean of all OLR values.
+
+        For packed data, the mean is computed from the packed values, so that the cube is not decoded completely.
+        """
+        if self.is_packed:
+            return float(np.mean(self._olr, dtype=np.float64)) * self._scale_factor + self._add_offset
+        return float(np.mean(self._olr))
+
+    def _decode(self, packed: np.ndarray) -> np.ndarray:
+        return packed * self._scale_factor + self._add_offset
+
     @property
     def time(self):
         """
@@ -126,7 +219,7 @@ class OLRData:
         """
         cand = self.time == date
         if not np.all(cand == False):  # noqa: E712
-            return np.squeeze(self.olr[cand, :, :])
+            return np.squeeze(self.get_olr_block(np.s_[cand, :, :]))
         else:
             return None
 
@@ -149,18 +242,54 @@ class OLRData:
         """
         inds, doys = tools.find_doy_ranges_in_dates(self.time, center_doy, window_length=window_length,
                                                     leap_year_treatment=leap_year_treatment)
-        return self.olr[inds, :, :]
+        return self.get_olr_block(np.s_[inds, :, :])
 
     def save_to_npzfile(self, filename: Path) -> None:
         """
         Saves the data arrays contained in the OLRData object to a numpy file.
 
+        Packed data is saved in its packed form together with scale factor and offset.
+
         :param filename: The full filename.
         """
-        np.savez(filename, olr=self.olr, time=self.time, lat=self.lat, long=self.long)
+        if self.is_packed:
+            np.savez(filename, olr=self._olr, time=self.time, lat=self.lat, long=self.long,
+                     scale_factor=self._scale_factor, add_offset=self._add_offset)
+        else:
+            np.savez(filename, olr=self.olr, time=self.time, lat=self.lat, long=self.long)
 
+    def save_to_directory(self, dirname: Path, create_dir: bool = True) -> None:
+        """
+        Saves the data arrays contained in the OLRData object as uncompressed numpy files into a directory.
 
-def interpolate_spatial_grid_to_original(olr: OLRData) -> OLRData:
+        In contrast to :py:func:`save_to_npzfile`, the OLR data cube saved in this way can be memory-mapped when
+        restoring it with :py:func:`mjoindices.olr_handling.restore_from_directory`. Hence, restoring is almost
+        instantaneous and only the parts of the data, which are actually used later on, are read from disk.
+        Packed data is saved in its packed form together with scale factor and offset.
+
+        :param dirname: The directory. Existing files of a previously saved dataset will be overwritten.
+        :param create_dir: If ``True``, the directory (and parent directories) will be created, if not existing.
+        """
+        dirname = Path(dirname)
+        if not dirname.exists() and create_dir:
+            dirname.mkdir(parents=True, exist_ok=False)
+        metadata_filename = dirname / "metadata.json"
+        # invalidate a previously saved dataset until all files have been rewritten
+        tools.remove_metadata_file(metadata_filename)
+        # The files are replaced instead of overwritten, since the data may be memory-mapped from the same directory.
+        tools.save_npy_file(dirname / "olr.npy", self._olr)
+        tools.save_npy_file(dirname / "time.npy", self.time)
+        tools.save_npy_file(dirname / "lat.npy", self.lat)
+        tools.save_npy_file(dirname / "long.npy", self.long)
+        # The metadata file is written last, so that an incompletely written directory is not recognized as valid store.
+        metadata = {"content": "OLRData", "format_version": _OLR_DIRECTORY_FORMAT_VERSION}
+        if self.is_packed:
+            metadata["scale_factor"] = self._scale_factor
+            metadata["add_offset"] = self._add_offset
+        tools.write_metadata_file(metadata_filename, metadata)
+
+
+def interpolate_spatial_grid_to_original(olr: OLRData, dtype: np.dtype = np.float64) -> OLRData:
     """
     Convenience function that interpolates the OLR data in an :class:`OLRData` object spatially onto the spatial grid,
     which was used for the original OMI calculation by :ref:`refKiladis2014`.
@@ -171,16 +300,18 @@ def interpolate_spatial_grid_to_original(olr: OLRData) -> OLRData:
     * Longitude: Whole globe with 2.5 deg-sampling.
 
     :param olr: The OLR data
+    :param dtype: The floating point type of the interpolated data. See :py:func:`interpolate_spatial_grid`.
 
     :return:  A new :class:`OLRData` object with the interpolated data.
     """
     # FIXME Combine with definition in empirical_or....py
     orig_lat = np.arange(-20., 20.1, 2.5)
     orig_long = np.arange(0., 359.9, 2.5)
-    return interpolate_spatial_grid(olr, orig_lat, orig_long)
+    return interpolate_spatial_grid(olr, orig_lat, orig_long, dtype=dtype)
 
 
-def interpolate_spatial_grid(olr: OLRData, target_lat: np.ndarray, target_long: np.ndarray) -> OLRData:
+def interpolate_spatial_grid(olr: OLRData, target_lat: np.ndarray, target_long: np.ndarray,
+                             dtype: np.dtype = np.float64) -> OLRData:
     """
     Interpolates the OLR data linearly onto the given grids.
 
@@ -193,14 +324,20 @@ def interpolate_spatial_grid(olr: OLRData, target_lat: np.ndarray, target_long:
     :param olr: The OLR data to resample.
     :param target_lat: The new latitude grid.
     :param target_long: The new longitude grid.
+    :param dtype: The floating point type of the interpolated data, e.g., ``np.float32`` to halve the memory
+        consumption. The interpolation itself is always computed in double precision.
 
     :return: A new :class:`OLRData` object containing the resampled OLR data.
     """
     no_days = olr.time.size
-    olr_interpol = np.empty((no_days, target_lat.size, target_long.size))
-    for idx in range(0, no_days):
-        f = scipy.interpolate.interp2d(olr.long, olr.lat, np.squeeze(olr.olr[idx, :, :]), kind='linear', bounds_error=True)
-        olr_interpol[idx, :, :] = f(target_long, target_lat)
+    olr_interpol = np.empty((no_days, target_lat.size, target_long.size), dtype=dtype)
+    # The bilinear interpolation weights are computed only once for the grid pair. The data is processed in blocks of
+    # days to limit the memory consumption of the intermediate double precision arrays.
+    block_length = 365
+    for start_idx in range(0, no_days, block_length):
+        block = np.s_[start_idx:start_idx + block_length, :, :]
+        olr_interpol[block] = tools.regrid_bilinear(olr.get_olr_block(block), olr.lat, olr.long,
+                                                    target_lat, target_long)
     return OLRData(olr_interpol, olr.time, target_lat, target_long)
 
 
@@ -228,7 +365,7 @@ def restrict_time_coverage(olr: OLRData, start: np.datetime64, stop: np.datetime
         raise ValueError("No OLR data within specified period found. Data covers the period from %s to %s."
                          % (str(olr.time[0]), str(olr.time[-1])))
     else:
-        return OLRData(olr.olr[window_inds, :, :], olr.time[window_inds], olr.lat, olr.long)
+        return _select_days(olr, window_inds)
 
 
 def remove_leap_years(olr: OLRData) -> OLRData:
@@ -243,11 +380,56 @@ def remove_leap_years(olr: OLRData) -> OLRData:
 
     window_inds = [(i.astype(object).month != 2) | (i.astype(object).day != 29) for i in olr.time]
 
-    return OLRData(olr.olr[window_inds, :, :], olr.time[window_inds], olr.lat, olr.long) 
-    
+    return _select_days(olr, window_inds)
+
+
+def pack_olr_data(olr: OLRData, scale_factor: float = 0.01, add_offset: float = 327.65) -> OLRData:
+    """
+    Converts OLR data into the packed int16 representation, which is decoded according to
+    ``packed * scale_factor + add_offset``.
 
+    The default values correspond to the packing of the NOAA OLR data product, which has a resolution of 0.01 W/m^2.
+    Hence, data loaded from such files can be packed without loss of information. The packed data needs only a quarter
+    of the memory of the float64 data.
 
-def load_noaa_interpolated_olr(filename: Path, use_xarray: bool = False) -> OLRData:
+    :param olr: The OLR data.
+    :param scale_factor: The scale factor, which is equal to the resolution of the packed data.
+    :param add_offset: The offset.
+
+    :return: A new :class:`OLRData` object with packed data.
+
+    :raises: :py:class:`ValueError` if the OLR values contain NaN or exceed the range that is representable with the
+        given scale factor and offset.
+    """
+    if olr.is_packed and olr.scale_factor == scale_factor and olr.add_offset == add_offset:
+        return olr
+    info = np.iinfo(np.int16)
+    packed = np.empty((olr.time.size, olr.lat.size, olr.long.size), dtype=np.int16)
+    # pack one day after the other to avoid float64 temporaries of the size of the complete data cube
+    for idx in range(0, olr.time.size):
+        values = np.round((olr.get_olr_block(np.s_[idx, :, :]) - add_offset) / scale_factor)
+        if np.any(np.isnan(values)):
+            raise ValueError("OLR values of %s contain NaN, which cannot be represented as int16."
+                             % str(olr.time[idx]))
+        if np.any(values < info.min) or np.any(values > info.max):
+            raise ValueError("OLR values of %s cannot be represented as int16 with scale factor %s and offset %s."
+                             % (str(olr.time[idx]), str(scale_factor), str(add_offset)))
+        packed[idx, :, :] = values
+    return OLRData(packed, olr.time, olr.lat, olr.long, copy_data=False, scale_factor=scale_factor,
+                   add_offset=add_offset)
+
+
+def _select_days(olr: OLRData, inds) -> OLRData:
+    """
+    Returns a new :class:`OLRData` object containing only the selected days. Packed data remains packed.
+    """
+    return OLRData(olr._olr[inds, :, :], olr.time[inds], olr.lat, olr.long, scale_factor=olr.scale_factor,
+                   add_offset=olr.add_offset)
+
+
+def load_noaa_interpolated_olr(filename: Path, use_xarray: bool = False, lat_range: typing.Tuple = None,
+                               lon_range: typing.Tuple = None, time_range: typing.Tuple = None,
+                               keep_packed: bool = False) -> OLRData:
     """
     Loads the standard OLR data product provided by NOAA in NetCDF3 format.
     This is mainly used to load the OLR files originally used for the OMI calculation some years ago.
@@ -270,6 +452,15 @@ def load_noaa_interpolated_olr(filename: Path, use_xarray: bool = False) -> OLRD
         however, this is probably only caused by very small numerical differences, which are irrelevant for the actual use.
         Still make sure that you trust the values when activating the option. A further advantage of this option is that is works for
         NetCDF3 and NetCDF4 files, hence for the older and the newer NOAA OLR datafiles.
+    :param lat_range: Optional tuple ``(lat_min, lat_max)``. If given, only the latitudes within this range (boundaries
+        included) are read from the file, e.g., ``(-20., 20.)`` for the tropical band used by OMI.
+    :param lon_range: Optional tuple ``(long_min, long_max)``. If given, only the longitudes within this range
+        (boundaries included) are read from the file. Ranges crossing the end of the longitude grid are not supported.
+        Note that the complete OMI calculation requires the whole globe.
+    :param time_range: Optional tuple ``(start, stop)`` of :class:`numpy.datetime64` dates. If given, only the data
+        within this period (boundaries included) is read from the file.
+    :param keep_packed: If ``True``, the OLR data is kept in the packed int16 representation of the file instead of
+        being decoded to float64 (see :class:`OLRData`). Not supported in combination with ``use_xarray``.
 
     :return: The OLR data.
     """
@@ -277,34 +468,54 @@ def load_noaa_interpolated_olr(filename: Path, use_xarray: bool = False) -> OLRD
     # that the OMI values are probably essentially the same but numerical differeces lead to failiures of the integration tests).
     # If the values are ok, make the xarray option the default (which also means that Python 3.8 is at least needed) and remove the
     # special function for NetCDF 4 below.
+    if use_xarray and keep_packed:
+        raise ValueError("The option keep_packed is not supported in combination with use_xarray.")
+    scale_factor = None
+    add_offset = None
     if use_xarray:
         import xarray as xr
         f = xr.open_dataset(filename)
+        time = np.array(f.olr.time.values, dtype='datetime64[D]')
+        time_slice = _find_slice_for_range(time, time_range, "time")
+        lat_slice = _find_slice_for_range(f.lat.data, lat_range, "latitude")
+        lon_slice = _find_slice_for_range(f.lon.data, lon_range, "longitude")
+        # isel works lazily, so that only the selected hyperslab is read from the file afterwards.
+        f = f.isel(time=time_slice, lat=lat_slice, lon=lon_slice)
         lat = f.lat.data.copy()
         lon = f.lon.data.copy()
         olr = f.olr.data.copy()
-        time = np.array(f.olr.time.values, dtype='datetime64[D]')
+        time = time[time_slice]
     else:
         f = scipy.io.netcdf_file(str(filename), 'r')
-        lat = f.variables['lat'].data.copy()
-        lon = f.variables['lon'].data.copy()
-        # scaling and offset as given in meta data of nc file
-        olr = f.variables['olr'].data.copy() / 100. + 327.65
-        hours_since1800 = f.variables['time'].data.copy()
+        time = _convert_hours_since_1800_to_dates(f.variables['time'].data.copy())
+        time_slice = _find_slice_for_range(time, time_range, "time")
+        lat_slice = _find_slice_for_range(f.variables['lat'].data, lat_range, "latitude")
+        lon_slice = _find_slice_for_range(f.variables['lon'].data, lon_range, "longitude")
+        lat = f.variables['lat'].data[lat_slice].copy()
+        lon = f.variables['lon'].data[lon_slice].copy()
+        variable = f.variables['olr']
+        # The variable data is memory-mapped, so that slicing before copying reads only the needed parts of the file.
+        olr = variable.data[time_slice, lat_slice, lon_slice].copy()
+        file_scale_factor, file_add_offset = _netcdf3_packing_attributes(variable)
+        del variable  # the file can only be closed cleanly if no references to memory-mapped variables exist
+        time = time[time_slice]
         f.close()
-
-        temptime = []
-        for item in hours_since1800:
-            delta = np.timedelta64(int(item / 24), 'D')
-            day = np.datetime64('1800-01-01') + delta
-            temptime.append(day)
-        time = np.array(temptime, dtype=np.datetime64)
-    result = OLRData(np.squeeze(olr), time, lat, lon)
+        if keep_packed:
+            # NetCDF3 data is big-endian, native byte order is faster for the later decoding
+            olr = olr.astype(olr.dtype.newbyteorder("="), copy=False)
+            scale_factor = file_scale_factor
+            add_offset = file_add_offset
+        else:
+            olr = _decode_netcdf3_olr(olr, file_scale_factor, file_add_offset)
+    result = OLRData(olr, time, lat, lon, copy_data=False, scale_factor=scale_factor,
+                     add_offset=add_offset)
 
     return result
 
 
-def load_noaa_interpolated_olr_netcdf4(filename: Path, use_xarray: bool = False) -> OLRData:
+def load_noaa_interpolated_olr_netcdf4(filename: Path, use_xarray: bool = False, lat_range: typing.Tuple = None,
+                                       lon_range: typing.Tuple = None, time_range: typing.Tuple = None,
+                                       keep_packed: bool = False) -> OLRData:
     """
     Loads the standard OLR data product provided by NOAA in NetCDF4 format.
 
@@ -323,29 +534,345 @@ def load_noaa_interpolated_olr_netcdf4(filename: Path, use_xarray: bool = False)
         activating this parameter, you should call instead :py:func:`load_noaa_interpolated_olr`, since it works for NetCDF
         3 and 4. Later on, when the xarray option is established, the present function particularly for NetCDF4 will be removed.
         Please also take into account the warnings in the docs of :py:func:`load_noaa_interpolated_olr`.
+    :param lat_range: See :py:func:`load_noaa_interpolated_olr`.
+    :param lon_range: See :py:func:`load_noaa_interpolated_olr`.
+    :param time_range: See :py:func:`load_noaa_interpolated_olr`.
+    :param keep_packed: If ``True``, the OLR data is kept in the packed integer representation of the file instead of
+        being decoded to float64 (see :class:`OLRData`). A :py:class:`ValueError` is raised if the OLR variable is not
+        stored as packed integers in the file. Not supported in combination with ``use_xarray``.
+
     :return: The OLR data.
     """
     if use_xarray:
-        result = load_noaa_interpolated_olr(filename=filename, use_xarray=True)
+        result = load_noaa_interpolated_olr(filename=filename, use_xarray=True, lat_range=lat_range,
+                                            lon_range=lon_range, time_range=time_range, keep_packed=keep_packed)
     else:
         f = netcdf4.Dataset(filename, "r")
+        time = _convert_hours_since_1800_to_dates(f.variables['time'][:].data.copy())
         lat = f.variables['lat'][:].data.copy()
         lon = f.variables['lon'][:].data.copy()
-        olr = f.variables['olr'][:].data.copy()
-        hours_since1800 = f.variables['time'][:].data.copy()
+        time_slice = _find_slice_for_range(time, time_range, "time")
+        lat_slice = _find_slice_for_range(lat, lat_range, "latitude")
+        lon_slice = _find_slice_for_range(lon, lon_range, "longitude")
+        scale_factor = None
+        add_offset = None
+        variable = f.variables['olr']
+        if keep_packed:
+            if not np.issubdtype(variable.dtype, np.integer) or not hasattr(variable, "scale_factor"):
+                f.close()
+                raise ValueError("The OLR variable in file %s is not stored as packed integers." % str(filename))
+            variable.set_auto_maskandscale(False)
+            scale_factor = variable.scale_factor
+            add_offset = getattr(variable, "add_offset", 0.)
+        # hyperslab read: only the selected part of the OLR variable is read from the file.
+        olr = np.ma.getdata(variable[time_slice, lat_slice, lon_slice]).copy()
         f.close()
-
-        temptime = []
-        for item in hours_since1800:
-            delta = np.timedelta64(int(item / 24), 'D')
-            day = np.datetime64('1800-01-01') + delta
-            temptime.append(day)
-        time = np.array(temptime, dtype=np.datetime64)
-        result = OLRData(np.squeeze(olr), time, lat, lon)
+        result = OLRData(olr, time[time_slice], lat[lat_slice], lon[lon_slice], copy_data=False,
+                         scale_factor=scale_factor, add_offset=add_offset)
 
     return result
 
 
+def load_noaa_interpolated_olr_from_multiple_files(filenames: typing.Union[str, Path, typing.Sequence[Path]],
+                                                   lat_range: typing.Tuple = None, lon_range: typing.Tuple = None,
+                                                   time_range: typing.Tuple = None,
+                                                   max_workers: int = None) -> OLRData:
+    """
+    Loads OLR data, which is split into several files along the time axis (e.g., one file per year), into one
+    :class:`OLRData` object.
+
+    The files have to follow the structure of the NOAA OLR data product (variables ``time`` in hours since 1800-01-01,
+    ``lat``, ``lon``, and ``olr``; see :py:func:`load_noaa_interpolated_olr`). NetCDF3 and NetCDF4 files are
+    supported. Packed values are unpacked using the attributes ``scale_factor`` and ``add_offset`` of the ``olr``
+    variable.
+
+    The files are read concurrently in a thread pool and written directly into their slots of a preallocated data
+    cube, so that the cube is not copied again afterwards. Note that the access to NetCDF4 files is serialized
+    internally, since the underlying library is not thread-safe. Hence, the concurrent reading is mainly effective for
+    NetCDF3 files.
+
+    The order of the files does not matter. However, all files have to share the same spatial grid and the time axes of
+    the files have to continue each other without gaps or overlaps. Otherwise, a :py:class:`ValueError` is raised.
+
+    :param filenames: Either a glob pattern (e.g., ``"/data/olr.day.mean.*.nc"``) or a list of filenames.
+    :param lat_range: See :py:func:`load_noaa_interpolated_olr`.
+    :param lon_range: See :py:func:`load_noaa_interpolated_olr`.
+    :param time_range: See :py:func:`load_noaa_interpolated_olr`. Files that do not contain any date within this
+        period are skipped.
+    :param max_workers: Maximum number of threads used for reading. If ``None``, the default of
+        :py:class:`concurrent.futures.ThreadPoolExecutor` is used.
+
+    :return: The OLR data of all files.
+    """
+    # Pass 1: read only the coordinate variables to be able to preallocate the complete data cube.
+    file_infos, time = _collect_noaa_olr_file_infos(filenames, lat_range, lon_range, time_range)
+    reference_lat = file_infos[0][2]
+    reference_lon = file_infos[0][3]
+
+    # Pass 2: read the OLR hyperslabs concurrently into their slots of the preallocated cube.
+    olr = np.empty((time.size, reference_lat.size, reference_lon.size))
+    offsets = np.cumsum([0] + [info[1].size for info in file_infos])
+
+    def read_into_slot(idx):
+        filename, file_time, _, _, slices = file_infos[idx]
+        olr[offsets[idx]:offsets[idx + 1], :, :] = _read_noaa_olr_file_hyperslab(filename, slices)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # list() propagates the exceptions of the worker threads
+        list(executor.map(read_into_slot, range(len(file_infos))))
+
+    return OLRData(olr, time, reference_lat, reference_lon, copy_data=False)
+
+
+def iterate_noaa_interpolated_olr_chunks(filenames: typing.Union[str, Path, typing.Sequence[Path]],
+                                         chunk_length: int = 365, lat_range: typing.Tuple = None,
+                                         lon_range: typing.Tuple = None,
+                                         time_range: typing.Tuple = None) -> typing.Iterator[OLRData]:
+    """
+    Reads OLR data from one or several files chunk by chunk along the time axis.
+
+    In contrast to :py:func:`load_noaa_interpolated_olr_from_multiple_files`, the complete data cube is never held in
+    memory. Instead, only one chunk of ``chunk_length`` days is read at a time, regardless of how the data is split
+    into files. This allows processing of very long records, e.g., of multi-century model runs, with
+    :py:func:`mjoindices.omi.omi_calculator.calculate_pcs_from_olr_chunks`.
+
+    The requirements for the files are the same as for :py:func:`load_noaa_interpolated_olr_from_multiple_files`.
+    The consistency of the grids and the continuity of the time axis are checked before the first chunk is read.
+
+    :param filenames: Either a glob pattern (e.g., ``"/data/olr.day.mean.*.nc"``) or a list of filenames.
+    :param chunk_length: The number of time steps per chunk. The last chunk may be shorter.
+    :param lat_range: See :py:func:`load_noaa_interpolated_olr`.
+    :param lon_range: See :py:func:`load_noaa_interpolated_olr`.
+    :param time_range: See :py:func:`load_noaa_interpolated_olr`.
+
+    :return: A generator of :class:`OLRData` objects, one for each chunk.
+    """
+    if chunk_length < 1:
+        raise ValueError("chunk_length must be positive.")
+    file_infos, time = _collect_noaa_olr_file_infos(filenames, lat_range, lon_range, time_range)
+    reference_lat = file_infos[0][2]
+    reference_lon = file_infos[0][3]
+    offsets = np.cumsum([0] + [info[1].size for info in file_infos])
+
+    def generate_chunks():
+        for chunk_start in range(0, time.size, chunk_length):
+            chunk_stop = min(chunk_start + chunk_length, time.size)
+            olr = np.empty((chunk_stop - chunk_start, reference_lat.size, reference_lon.size))
+            for idx, (filename, _, _, _, slices) in enumerate(file_infos):
+                read_start = max(chunk_start, offsets[idx])
+                read_stop = min(chunk_stop, offsets[idx + 1])
+                if read_start >= read_stop:
+                    continue
+                file_time_start = 0 if slices[0].start is None else slices[0].start
+                time_slice = slice(file_time_start + read_start - offsets[idx],
+                                   file_time_start + read_stop - offsets[idx])
+                olr[read_start - chunk_start:read_stop - chunk_start, :, :] = _read_noaa_olr_file_hyperslab(
+                    filename, (time_slice, slices[1], slices[2]))
+            yield OLRData(olr, time[chunk_start:chunk_stop], reference_lat, reference_lon, copy_data=False)
+
+    # The checks above are executed immediately and not only when the first chunk is requested.
+    return generate_chunks()
+
+
+def iterate_time_chunks(olr: OLRData, chunk_length: int = 365) -> typing.Iterator[OLRData]:
+    """
+    Splits OLR data into chunks along the time axis.
+
+    This is particularly useful for data restored with :py:func:`restore_from_directory` in memory-mapped mode, since
+    then only the data of the current chunk is read from disk.
+
+    :param olr: The OLR data.
+    :param chunk_length: The number of time steps per chunk. The last chunk may be shorter.
+
+    :return: A generator of :class:`OLRData` objects, one for each chunk.
+    """
+    if chunk_length < 1:
+        raise ValueError("chunk_length must be positive.")
+    for chunk_start in range(0, olr.time.size, chunk_length):
+        inds = np.s_[chunk_start:chunk_start + chunk_length]
+        if olr.is_packed:
+            yield OLRData(olr.packed_olr[inds], olr.time[inds], olr.lat, olr.long,
+                          scale_factor=olr.scale_factor, add_offset=olr.add_offset)
+        else:
+            yield OLRData(olr.get_olr_block(np.s_[inds, :, :]), olr.time[inds], olr.lat, olr.long, copy_data=False)
+
+
+def _collect_noaa_olr_file_infos(filenames: typing.Union[str, Path, typing.Sequence[Path]],
+                                 lat_range: typing.Tuple, lon_range: typing.Tuple,
+                                 time_range: typing.Tuple) -> typing.Tuple:
+    """
+    Reads the coordinates of several NOAA-like OLR files and checks that the files can be combined along the time
+    axis.
+
+    :return: Tuple of the list of file information (filename, dates, latitude grid, longitude grid, and hyperslab
+        slices for each file), sorted by time, and the combined time axis.
+    """
+    if isinstance(filenames, (str, Path)):
+        filenames = [Path(name) for name in sorted(glob.glob(str(filenames)))]
+    else:
+        filenames = [Path(name) for name in filenames]
+    if len(filenames) == 0:
+        raise ValueError("No OLR files given or found.")
+
+    file_infos = []
+    for filename in filenames:
+        time, lat, lon = _read_noaa_olr_file_coordinates(filename)
+        if time_range is not None:
+            time_inds = np.nonzero((time >= min(time_range)) & (time <= max(time_range)))[0]
+            if time_inds.size == 0:
+                continue
+            time_slice = slice(time_inds[0], time_inds[-1] + 1)
+        else:
+            time_slice = slice(None)
+        lat_slice = _find_slice_for_range(lat, lat_range, "latitude")
+        lon_slice = _find_slice_for_range(lon, lon_range, "longitude")
+        file_infos.append((filename, time[time_slice], lat[lat_slice], lon[lon_slice],
+                           (time_slice, lat_slice, lon_slice)))
+    if len(file_infos) == 0:
+        raise ValueError("No OLR data within specified period found in any of the files.")
+
+    file_infos.sort(key=lambda info: info[1][0])
+    reference_filename, _, reference_lat, reference_lon, _ = file_infos[0]
+    for filename, _, file_lat, file_lon, _ in file_infos[1:]:
+        if file_lat.size != reference_lat.size or not np.all(file_lat == reference_lat):
+            raise ValueError("Latitude grid of file %s does not fit to that of file %s."
+                             % (filename, reference_filename))
+        if file_lon.size != reference_lon.size or not np.all(file_lon == reference_lon):
+            raise ValueError("Longitude grid of file %s does not fit to that of file %s."
+                             % (filename, reference_filename))
+
+    time = np.concatenate([info[1] for info in file_infos])
+    if time.size > 1:
+        time_spacing = time[1] - time[0]
+        gap_inds = np.nonzero(np.diff(time) != time_spacing)[0]
+        if gap_inds.size > 0:
+            raise ValueError("Time axis is not continuous around %s (gap or overlap between the files)."
+                             % str(time[gap_inds[0]]))
+
+    return file_infos, time
+
+
+def _is_netcdf3_file(filename: Path) -> bool:
+    """
+    Checks by means of the magic number whether a file is a NetCDF3 (classic or 64-bit offset) file.
+    """
+    with open(filename, "rb") as f:
+        magic = f.read(4)
+    return magic[0:3] == b"CDF" and magic[3:4] in (b"\x01", b"\x02")
+
+
+def _read_noaa_olr_file_coordinates(filename: Path) -> typing.Tuple:
+    """
+    Reads the time, latitude, and longitude axes of a NOAA-like OLR file.
+
+    :return: Tuple of the dates, the latitude grid, and the longitude grid.
+    """
+    if _is_netcdf3_file(filename):
+        f = scipy.io.netcdf_file(str(filename), 'r')
+        hours_since1800 = f.variables['time'].data.copy()
+        lat = f.variables['lat'].data.copy()
+        lon = f.variables['lon'].data.copy()
+        f.close()
+    else:
+        with _netcdf4_lock:
+            f = netcdf4.Dataset(filename, "r")
+            hours_since1800 = f.variables['time'][:].data.copy()
+            lat = f.variables['lat'][:].data.copy()
+            lon = f.variables['lon'][:].data.copy()
+            f.close()
+    return _convert_hours_since_1800_to_dates(hours_since1800), lat, lon
+
+
+def _netcdf3_packing_attributes(variable) -> typing.Tuple[float, float]:
+    """
+    Returns the attributes ``scale_factor`` and ``add_offset`` of the OLR variable of a NetCDF3 file.
+
+    The attributes are often stored in single precision. They are converted via their shortest decimal representation,
+    so that, e.g., a scale factor of 0.01 is used as 0.01 and not as 0.009999999776. Missing attributes are replaced by
+    the values of the NOAA OLR files (0.01 and 327.65), which have always been assumed by earlier versions.
+    """
+    def convert(name, default):
+        value = getattr(variable, name, None)
+        if value is None:
+            return default
+        return float(str(np.asarray(value).ravel()[0]))
+    return convert("scale_factor", 0.01), convert("add_offset", 327.65)
+
+
+def _decode_netcdf3_olr(data: np.ndarray, scale_factor: float, add_offset: float) -> np.ndarray:
+    """
+    Unpacks OLR values read from a NetCDF3 file according to ``data * scale_factor + add_offset``.
+
+    A scale factor, which is the inverse of an integer (like 0.01 in the NOAA files), is applied as division by this
+    integer. This reproduces the values of earlier versions exactly, which decoded the data by ``data / 100. + 327.65``.
+    """
+    inverse = round(1. / scale_factor)
+    if inverse != 0 and abs(1. / scale_factor - inverse) < 1e-9 * inverse:
+        return data / float(inverse) + add_offset
+    return data * scale_factor + add_offset
+
+
+def _read_noaa_olr_file_hyperslab(filename: Path, slices: typing.Tuple) -> np.ndarray:
+    """
+    Reads a hyperslab of the (unpacked) OLR variable of a NOAA-like OLR file.
+
+    :param filename: The filename.
+    :param slices: Tuple of slices for the time, latitude, and longitude axes.
+
+    :return: The OLR values of the hyperslab.
+    """
+    if _is_netcdf3_file(filename):
+        f = scipy.io.netcdf_file(str(filename), 'r')
+        variable = f.variables['olr']
+        data = variable.data[slices].copy()
+        scale_factor, add_offset = _netcdf3_packing_attributes(variable)
+        del variable  # the file can only be closed cleanly if no references to memory-mapped variables exist
+        f.close()
+        # decoded in the same way as by load_noaa_interpolated_olr, so that both loaders yield identical values
+        data = _decode_netcdf3_olr(data, scale_factor, add_offset)
+    else:
+        with _netcdf4_lock:
+            f = netcdf4.Dataset(filename, "r")
+            data = f.variables['olr'][slices].data.copy()
+            f.close()
+    return data
+
+
+def _convert_hours_since_1800_to_dates(hours_since1800: np.ndarray) -> np.ndarray:
+    """
+    Converts the time axis of the NOAA OLR files (hours since 1800-01-01) into :class:`numpy.datetime64` dates.
+
+    :param hours_since1800: The time values as found in the file.
+
+    :return: The dates with daily resolution.
+    """
+    # astype(int) truncates towards zero, which is the same behavior as int() applied to the individual elements.
+    days_since1800 = (np.asarray(hours_since1800) / 24).astype(np.int64)
+    return np.datetime64('1800-01-01') + days_since1800.astype('timedelta64[D]')
+
+
+def _find_slice_for_range(grid: np.ndarray, value_range: typing.Tuple, grid_name: str) -> slice:
+    """
+    Finds the index slice of a monotonic grid that covers a given range of values.
+
+    :param grid: The monotonic (increasing or decreasing) grid.
+    :param value_range: Tuple of the two boundaries of the range (boundaries included, order does not matter).
+        If ``None``, the complete grid is selected.
+    :param grid_name: Name of the grid, only used for error messages.
+
+    :return: The slice.
+    """
+    if value_range is None:
+        return slice(None)
+    lower = min(value_range)
+    upper = max(value_range)
+    inds = np.nonzero((grid >= lower) & (grid <= upper))[0]
+    if inds.size == 0:
+        raise ValueError("No grid points of the %s grid found within the range from %s to %s."
+                         % (grid_name, str(lower), str(upper)))
+    return slice(inds[0], inds[-1] + 1)
+
+
 def restore_from_npzfile(filename: Path) -> OLRData:
     """
     Loads an :py:class:`OLRData` object from a numpy file, which has been saved with the function
@@ -360,7 +887,40 @@ def restore_from_npzfile(filename: Path) -> OLRData:
         time = data["time"]
         lat = data["lat"]
         long = data["long"]
-    return OLRData(olr, time, lat, long)
+        scale_factor = float(data["scale_factor"]) if "scale_factor" in data else None
+        add_offset = float(data["add_offset"]) if "add_offset" in data else None
+    return OLRData(olr, time, lat, long, scale_factor=scale_factor, add_offset=add_offset)
+
+
+def restore_from_directory(dirname: Path, mmap_mode: str = "r") -> OLRData:
+    """
+    Loads an :py:class:`OLRData` object from a directory, which has been written with the function
+    :py:func:`mjoindices.olr_handling.OLRData.save_to_directory`.
+
+    By default, the OLR data cube is memory-mapped instead of being read completely. The subsequent calculation steps,
+    e.g., the extraction of the DOY windows for the EOF calculation or the regression of the OLR maps for the PC
+    calculation, will then read only the data they actually touch.
+
+    :param dirname: The directory.
+    :param mmap_mode: The memory-map mode as described for :py:func:`numpy.load`. The default ``"r"`` opens the
+        data cube read-only. If ``None``, the data cube is read completely into memory.
+
+    :return: The OLR data.
+    """
+    dirname = Path(dirname)
+    metadata_filename = dirname / "metadata.json"
+    if not metadata_filename.is_file():
+        raise ValueError("Directory %s does not contain a valid OLR dataset." % str(dirname))
+    with open(metadata_filename, "r") as f:
+        metadata = json.load(f)
+    if metadata.get("content") != "OLRData" or metadata.get("format_version", 0) > _OLR_DIRECTORY_FORMAT_VERSION:
+        raise ValueError("Directory %s does not contain an OLR dataset in a supported format." % str(dirname))
+    olr = np.load(dirname / "olr.npy", mmap_mode=mmap_mode)
+    time = np.load(dirname / "time.npy")
+    lat = np.load(dirname / "lat.npy")
+    long = np.load(dirname / "long.npy")
+    return OLRData(olr, time, lat, long, copy_data=False, scale_factor=metadata.get("scale_factor"),
+                   add_offset=metadata.get("add_offset"))
 
 
 def plot_olr_map_for_date(olr: OLRData, date: np.datetime64) -> Figure:
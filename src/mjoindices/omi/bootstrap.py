@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2019 Christoph G. Hoffmann. All rights reserved.
+
+# This file is part of mjoindices
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Contact: christoph.hoffmann@uni-greifswald.de
+
+
+"""
+Bootstrap estimates of the uncertainty of the OMI EOFs, their explained variances, and the resulting PCs.
+
+Each bootstrap replicate draws the years of the record with replacement. Instead of rerunning
+:py:func:`~mjoindices.omi.omi_calculator.calc_eofs_from_olr` for a concatenated record, each OLR map within the DOY
+windows is weighted by the number of times its year has been drawn. Hence, the temporal filtering is done only once
+and the replicates only repeat the covariance matrices and the eigen-decompositions (and optionally the projection of
+the OLR data onto the replicated EOFs).
+
+The replicates can be distributed over several processes. The OLR data is then placed in shared memory, so that it is
+not copied into each process. Each replicate uses its own random generator spawned from a common seed, so that the
+replicates do not depend on the number of processes. The statistics are accumulated replicate by replicate (see
+:class:`BootstrapStatistics`), so that the replicates are never held in memory at once.
+
+Typical usage:
+
+.. code-block:: python
+
+    preprocessed_olr = omi.preprocess_olr(olrdata)
+    statistics = bootstrap_eofs_and_pcs(preprocessed_olr, no_replicates=200, seed=42, max_workers=8)
+    lower, upper = statistics.confidence_interval("explained_variance1", level=0.95)
+"""
+
+import concurrent.futures
+import typing
+
+import numpy as np
+import scipy.stats
+
+import mjoindices.empirical_orthogonal_functions as eof
+import mjoindices.olr_handling as olr
+import mjoindices.omi.omi_calculator as omi
+import mjoindices.tools as tools
+
+
+class BootstrapStatistics:
+    """
+    Accumulates the mean and the variance of several quantities over bootstrap replicates.
+
+    The accumulation follows the streaming algorithm of Welford. Partial statistics, e.g., of different processes, can
+    be combined with :py:meth:`merge`.
+
+    The statistics created by :py:func:`bootstrap_eofs_and_pcs` contain the quantities ``"eof1"`` and ``"eof2"``
+    (shape: (DOYs, grid points)), ``"explained_variance1"`` and ``"explained_variance2"`` (shape: (DOYs,)) and, if
+    OLR data for the PCs has been given, ``"pc1"`` and ``"pc2"`` (shape: (time,)).
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialization without any replicate.
+        """
+        self._count = 0
+        self._means = {}
+        self._squared_deviation_sums = {}
+
+    @property
+    def count(self) -> int:
+        """
+        The number of accumulated replicates.
+        """
+        return self._count
+
+    @property
+    def names(self) -> typing.List[str]:
+        """
+        The names of the accumulated quantities.
+        """
+        return list(self._means.keys())
+
+    def add(self, values: typing.Mapping[str, np.ndarray]) -> None:
+        """
+        Adds one replicate.
+
+        :param values: The values of all quantities of the replicate. The same quantities have to be given for all
+            replicates.
+        """
+        if self._count > 0 and set(values.keys()) != set(self._means.keys()):
+            raise ValueError("The replicate does not contain the same quantities as the previous ones.")
+        self._count += 1
+        for name, value in values.items():
+            value = np.asarray(value, dtype=np.float64)
+            if self._count == 1:
+                self._means[name] = value.copy()
+                self._squared_deviation_sums[name] = np.zeros_like(value)
+            else:
+                deviation = value - self._means[name]
+                self._means[name] += deviation / self._count
+                self._squared_deviation_sums[name] += deviation * (value - self._means[name])
+
+    def merge(self, other: "BootstrapStatistics") -> None:
+        """
+        Adds the statistics of further replicates.
+
+        :param other: The statistics of the further replicates.
+        """
+        if other._count == 0:
+            return
+        if self._count == 0:
+            self._count = other._count
+            self._means = {name: value.copy() for name, value in other._means.items()}
+            self._squared_deviation_sums = {name: value.copy() for name, value in other._squared_deviation_sums.items()}
+            return
+        if set(other._means.keys()) != set(self._means.keys()):
+            raise ValueError("The statistics do not contain the same quantities.")
+        total_count = self._count + other._count
+        for name in self._means.keys():
+            deviation = other._means[name] - self._means[name]
+            self._means[name] += deviation * other._count / total_count
+            self._squared_deviation_sums[name] += (other._squared_deviation_sums[name]
+                                                   + np.square(deviation) * self._count * other._count / total_count)
+        self._count = total_count
+
+    def mean(self, name: str) -> np.ndarray:
+        """
+        Returns the mean of a quantity over all replicates.
+
+        :param name: The name of the quantity.
+        """
+        return self._means[name].copy()
+
+    def std(self, name: str) -> np.ndarray:
+        """
+        Returns the sample standard deviation of a quantity over all replicates. The values are NaN, if less than two
+        replicates have been accumulated.
+
+        :param name: The name of the quantity.
+        """
+        if self._count < 2:
+            return np.full_like(self._means[name], np.nan)
+        return np.sqrt(self._squared_deviation_sums[name] / (self._count - 1))
+
+    def confidence_interval(self, name: str, level: float = 0.95) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns a confidence interval of a quantity based on the normal approximation of the bootstrap distribution.
+
+        Percentile intervals would require all replicates to be kept, which is avoided here.
+
+        :param name: The name of the quantity.
+        :param level: The confidence level.
+
+        :return: Tuple of the lower and the upper limits.
+        """
+        if not 0. < level < 1.:
+            raise ValueError("level must be between 0 and 1.")
+        half_width = scipy.stats.norm.ppf(0.5 + level / 2.) * self.std(name)
+        return self._means[name] - half_width, self._means[name] + half_width
+
+
+def bootstrap_eofs_and_pcs(preprocessed_olr: olr.OLRData,
+                           no_replicates: int,
+                           pc_olr: olr.OLRData = None,
+                           leap_year_treatment: str = "original",
+                           eofs_postprocessing_type: str = "kiladis2014",
+                           eofs_postprocessing_params: dict = None,
+                           reference_eofs: eof.EOFDataForAllDOYs = None,
+                           seed: int = None,
+                           max_workers: int = 1,
+                           dtype: np.dtype = np.float64) -> BootstrapStatistics:
+    """
+    Estimates the uncertainty of the EOFs and PCs by resampling the years of the record.
+
+    Each replicate draws the calendar years of the record with replacement. The OLR maps in the DOY windows of the EOF
+    calculation are then weighted by the number of draws of their years. The resulting EOFs are post-processed and
+    their signs are aligned with the reference EOFs, so that the statistics are not affected by the arbitrary signs of
+    the eigenvectors. Note that a swap of EOF1 and EOF2 in a replicate is not corrected.
+
+    :param preprocessed_olr: The filtered OLR data, from which the EOFs are calculated (see
+        :py:func:`~mjoindices.omi.omi_calculator.preprocess_olr`).
+    :param no_replicates: The number of bootstrap replicates.
+    :param pc_olr: If given, the PCs are calculated for each replicate by projecting this OLR data onto the EOFs of the
+        replicate and normalizing them as in :py:func:`~mjoindices.omi.omi_calculator.calculate_pcs_from_olr`. The data
+        has to be filtered for the PC calculation already (see, e.g.,
+        :py:func:`mjoindices.omi.wheeler_kiladis_mjo_filter.filter_olr_for_mjo_pc_calculation`) and to be given on the
+        spatial grid of ``preprocessed_olr``.
+    :param leap_year_treatment: See :py:func:`~mjoindices.omi.omi_calculator.calc_eofs_from_olr`.
+    :param eofs_postprocessing_type: See :py:func:`~mjoindices.omi.omi_calculator.calc_eofs_from_olr`.
+    :param eofs_postprocessing_params: See :py:func:`~mjoindices.omi.omi_calculator.calc_eofs_from_olr`.
+    :param reference_eofs: The EOFs, to which the signs of the replicated EOFs are aligned. If ``None``, the EOFs are
+        calculated from the complete record with the same settings.
+    :param seed: The seed of the random generators. Given the same seed, the results do not depend on the number of
+        processes (apart from rounding errors of the accumulation).
+    :param max_workers: The number of processes, among which the replicates are distributed. Several processes
+        require Python 3.8 or newer.
+    :param dtype: The floating point precision of the covariance matrices and the projection.
+
+    :return: The statistics over all replicates.
+    """
+    if no_replicates < 1:
+        raise ValueError("no_replicates must be positive.")
+    if pc_olr is not None and not (np.array_equal(pc_olr.lat, preprocessed_olr.lat)
+                                   and np.array_equal(pc_olr.long, preprocessed_olr.long)):
+        raise ValueError("The OLR data for the PCs has to be given on the spatial grid of the preprocessed OLR data.")
+    if reference_eofs is None:
+        raw_eofs = omi.calc_eofs_from_preprocessed_olr(preprocessed_olr, leap_year_treatment=leap_year_treatment,
+                                                       dtype=dtype)
+        reference_eofs = omi.initiate_eof_post_processing(raw_eofs, eofs_postprocessing_type,
+                                                          eofs_postprocessing_params)
+    no_leap_years = leap_year_treatment == "no_leap_years"
+    sample_years = preprocessed_olr.time.astype("datetime64[Y]").astype(int)
+    years, year_indices = np.unique(sample_years, return_inverse=True)
+    window_indices = [tools.find_doy_ranges_in_dates(preprocessed_olr.time, doy, window_length=60,
+                                                     leap_year_treatment=leap_year_treatment)[0]
+                      for doy in tools.doy_list(no_leap_years)]
+    settings = {"lat": preprocessed_olr.lat,
+                "long": preprocessed_olr.long,
+                "pc_time": None if pc_olr is None else pc_olr.time,
+                "no_years": years.size,
+                "year_indices": year_indices,
+                "window_indices": window_indices,
+                "no_leap_years": no_leap_years,
+                "eofs_postprocessing_type": eofs_postprocessing_type,
+                "eofs_postprocessing_params": eofs_postprocessing_params,
+                "reference_eof1": reference_eofs.eof1vectors,
+                "reference_eof2": reference_eofs.eof2vectors,
+                "dtype": np.dtype(dtype)}
+    seed_sequences = np.random.SeedSequence(seed).spawn(no_replicates)
+
+    eof_cube = preprocessed_olr.get_olr_block(np.s_[:, :, :])
+    pc_cube = None if pc_olr is None else pc_olr.get_olr_block(np.s_[:, :, :])
+    if max_workers == 1 or no_replicates == 1:
+        return _run_bootstrap_replicates(eof_cube, pc_cube, settings, seed_sequences)
+
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        raise ImportError("Distributing the replicates over several processes requires Python 3.8 or newer. Use "
+                          "max_workers=1 instead.")
+    replicate_groups = [inds for inds in np.array_split(np.arange(no_replicates), max_workers) if inds.size > 0]
+    shared_blocks = []
+    try:
+        descriptors = {}
+        for name, cube in (("eof_cube", eof_cube), ("pc_cube", pc_cube)):
+            if cube is None:
+                continue
+            block = shared_memory.SharedMemory(create=True, size=max(cube.nbytes, 1))
+            shared_blocks.append(block)
+            np.ndarray(cube.shape, dtype=cube.dtype, buffer=block.buf)[...] = cube
+            descriptors[name] = (block.name, cube.shape, cube.dtype.str)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=len(replicate_groups),
+                                                    initializer=_attach_shared_cubes,
+                                                    initargs=(descriptors,)) as executor:
+            futures = [executor.submit(_run_bootstrap_replicates_in_worker, settings,
+                                       [seed_sequences[i] for i in inds])
+                       for inds in replicate_groups]
+            result = BootstrapStatistics()
+            for future in futures:
+                result.merge(future.result())
+    finally:
+        for block in shared_blocks:
+            block.close()
+            block.unlink()
+    return result
+
+
+# The shared OLR data cubes attached in a worker process. The shared memory blocks are kept as well, since the arrays
+# are only valid as long as the blocks are open.
+_worker_shared_cubes = {}
+
+
+def _attach_shared_cubes(descriptors: typing.Mapping[str, typing.Tuple]) -> None:
+    """
+    Attaches the shared OLR data cubes in a worker process.
+    """
+    from multiprocessing import shared_memory
+    for name, (block_name, shape, dtype) in descriptors.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _worker_shared_cubes[name] = (block, np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf))
+
+
+def _run_bootstrap_replicates_in_worker(settings: dict,
+                                        seed_sequences: typing.List[np.random.SeedSequence]) -> BootstrapStatistics:
+    pc_cube = _worker_shared_cubes["pc_cube"][1] if "pc_cube" in _worker_shared_cubes else None
+    return _run_bootstrap_replicates(_worker_shared_cubes["eof_cube"][1], pc_cube, settings, seed_sequences)
+
+
+def _run_bootstrap_replicates(eof_cube: np.ndarray, pc_cube: typing.Optional[np.ndarray], settings: dict,
+                              seed_sequences: typing.List[np.random.SeedSequence]) -> BootstrapStatistics:
+    """
+    Calculates a group of bootstrap replicates and accumulates their statistics.
+    """
+    lat = settings["lat"]
+    long = settings["long"]
+    dtype = settings["dtype"]
+    no_years = settings["no_years"]
+    no_gridpoints = lat.size * long.size
+    statistics = BootstrapStatistics()
+    for seed_sequence in seed_sequences:
+        rng = np.random.default_rng(seed_sequence)
+        year_weights = np.bincount(rng.integers(0, no_years, size=no_years), minlength=no_years)
+        sample_weights = year_weights[settings["year_indices"]]
+        raw_eofs = []
+        for doy_index, inds in enumerate(settings["window_indices"]):
+            weights = sample_weights[inds]
+            inds = inds[weights > 0]
+            weights = weights[weights > 0]
+            no_observations = int(np.sum(weights))
+            if no_observations == 0:
+                raise ValueError("No OLR data for DOY %i in a bootstrap replicate." % (doy_index + 1))
+            F = np.reshape(eof_cube[inds].astype(dtype, copy=False), [inds.size, no_gridpoints])
+            R = np.matmul(F.T * weights.astype(dtype), F) / no_observations
+            raw_eofs.append(omi._calc_eofs_from_covariance_matrix(R, no_observations, lat, long))
+        eofs = omi.initiate_eof_post_processing(eof.EOFDataForAllDOYs(raw_eofs, settings["no_leap_years"]),
+                                                settings["eofs_postprocessing_type"],
+                                                settings["eofs_postprocessing_params"])
+        eof1 = _align_signs(eofs.eof1vectors, settings["reference_eof1"])
+        eof2 = _align_signs(eofs.eof2vectors, settings["reference_eof2"])
+        values = {"eof1": eof1,
+                  "eof2": eof2,
+                  "explained_variance1": eofs.explained_variance1_for_all_doys(),
+                  "explained_variance2": eofs.explained_variance2_for_all_doys()}
+        if pc_cube is not None:
+            aligned_eofs = eof.EOFDataForAllDOYs.from_arrays(lat, long, eof1, eof2,
+                                                             no_leap_years=settings["no_leap_years"])
+            raw_pcs = omi.regress_3dim_data_onto_eofs(
+                olr.OLRData(pc_cube, settings["pc_time"], lat, long, copy_data=False), aligned_eofs, dtype=dtype)
+            normalization_factor = 1 / np.std(raw_pcs.pc1)
+            values["pc1"] = raw_pcs.pc1 * normalization_factor
+            values["pc2"] = raw_pcs.pc2 * normalization_factor
+        statistics.add(values)
+    return statistics
+
+
+def _align_signs(vectors: np.ndarray, reference_vectors: np.ndarray) -> np.ndarray:
+    """
+    Flips the sign of those vectors (one per DOY), which point into the opposite direction of the reference vectors.
+    """
+    signs = np.where(np.sum(vectors * reference_vectors, axis=1) < 0, -1., 1.)
+    return vectors * signs[:, np.newaxis]
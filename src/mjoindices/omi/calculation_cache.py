@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2019 Christoph G. Hoffmann. All rights reserved.
+
+# This file is part of mjoindices
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Contact: christoph.hoffmann@uni-greifswald.de
+
+"""
+Provides an optional disk cache for intermediate results of the OMI EOF calculation.
+
+The expensive parts of the EOF calculation are the filtering of the OLR data and the eigen-decompositions for all DOYs,
+whereas the subsequent post-processing of the EOFs is cheap. When the post-processing is varied (e.g., by changing
+the parameter ``eofs_postprocessing_type`` of :py:func:`~mjoindices.omi.omi_calculator.calc_eofs_from_olr`), the
+filtered OLR data and the raw EOFs can therefore be reused from a :class:`CalculationCache`:
+
+.. code-block:: python
+
+    cache = CalculationCache(Path("/tmp/omi_cache"), max_size_bytes=10 * 1024 ** 3)
+    eofs_kil = omi.calc_eofs_from_olr(olr_data, eofs_postprocessing_type="kiladis2014", result_cache=cache)
+    eofs_rot = omi.calc_eofs_from_olr(olr_data, eofs_postprocessing_type="eof_rotation", result_cache=cache)
+
+The cache entries are content-addressed: The key of an entry is a SHA-256 hash of the OLR data (values, time axis,
+and spatial grids) and of all settings, which influence the cached result. Hence, it is safe to share one cache
+directory between different datasets and settings. Modified input data simply leads to new entries.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import typing
+from pathlib import Path
+
+import numpy as np
+
+import mjoindices
+import mjoindices.empirical_orthogonal_functions as eof
+import mjoindices.olr_handling as olr
+import mjoindices.tools as tools
+
+# Increase this version if the cached quantities would change for identical input data and settings.
+_CACHE_FORMAT_VERSION = 1
+
+
+def fingerprint_olr(olrdata: olr.OLRData) -> str:
+    """
+    Calculates a fingerprint of an OLR dataset, which covers the OLR values, the time axis, and the spatial grids.
+
+    :param olrdata: The OLR data.
+
+    :return: The SHA-256 hash as hex string.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(np.ascontiguousarray(olrdata.time.astype("datetime64[ns]")).view(np.int64).tobytes())
+    hasher.update(np.ascontiguousarray(olrdata.lat, dtype=np.float64).tobytes())
+    hasher.update(np.ascontiguousarray(olrdata.long, dtype=np.float64).tobytes())
+    if olrdata.is_packed:
+        hasher.update(json.dumps(["packed", str(olrdata.packed_olr.dtype), olrdata.scale_factor,
+                                  olrdata.add_offset]).encode())
+        data = olrdata.packed_olr
+    else:
+        data = olrdata.olr
+    hasher.update(str(data.dtype).encode())
+    # The data is hashed in blocks of days, so that memory-mapped data is not read completely into memory.
+    block_length = 365
+    for start_idx in range(0, data.shape[0], block_length):
+        hasher.update(np.ascontiguousarray(data[start_idx:start_idx + block_length]).tobytes())
+    return hasher.hexdigest()
+
+
+class CalculationCache:
+    """
+    A disk cache for filtered OLR data and raw (not yet post-processed) EOFs.
+
+    Each entry is stored as a sub directory of the cache directory using the memory-mappable directory formats of
+    :py:func:`mjoindices.olr_handling.OLRData.save_to_directory` and
+    :py:func:`mjoindices.empirical_orthogonal_functions.EOFDataForAllDOYs.save_all_eofs_to_npy_dir`.
+
+    :param directory: The cache directory. It will be created, if not existing.
+    :param max_size_bytes: If given, the least recently used entries are removed after storing a new entry, until the
+        total size of all entries is not larger than this value. The entry just stored is never removed.
+    """
+
+    def __init__(self, directory: Path, max_size_bytes: int = None) -> None:
+        """
+        Initialization of the cache.
+        """
+        if max_size_bytes is not None and max_size_bytes < 0:
+            raise ValueError("max_size_bytes must not be negative.")
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_size_bytes = max_size_bytes
+
+    @property
+    def directory(self) -> Path:
+        """
+        The cache directory.
+        """
+        return self._directory
+
+    @property
+    def max_size_bytes(self) -> typing.Optional[int]:
+        """
+        The maximum total size of the cache entries in bytes or ``None`` if the size is not limited.
+        """
+        return self._max_size_bytes
+
+    def fingerprint_olr(self, olrdata: olr.OLRData) -> str:
+        """
+        Calculates a fingerprint of an OLR dataset. See :py:func:`fingerprint_olr`.
+
+        :param olrdata: The OLR data.
+
+        :return: The fingerprint as hex string.
+        """
+        return fingerprint_olr(olrdata)
+
+    def key(self, kind: str, **settings) -> str:
+        """
+        Calculates the key of a cache entry.
+
+        :param kind: The kind of the entry, e.g., ``"filtered_olr"``.
+        :param settings: All values that determine the content of the entry (e.g., the fingerprint of the input data
+            and the calculation settings). The values must be serializable to JSON.
+
+        :return: The key as hex string.
+        """
+        description = {"kind": kind, "cache_format_version": _CACHE_FORMAT_VERSION,
+                       "mjoindices_version": mjoindices.__version__, "settings": settings}
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    def load_olr(self, key: str) -> typing.Optional[olr.OLRData]:
+        """
+        Loads OLR data from the cache.
+
+        :param key: The key of the entry.
+
+        :return: The memory-mapped OLR data or ``None``, if the cache does not contain a complete entry for the key.
+        """
+        entry_dirname = self._valid_entry_dirname(key, "OLRData")
+        if entry_dirname is None:
+            return None
+        return olr.restore_from_directory(entry_dirname / "data")
+
+    def store_olr(self, key: str, olrdata: olr.OLRData) -> None:
+        """
+        Stores OLR data in the cache.
+
+        :param key: The key of the entry.
+        :param olrdata: The OLR data.
+        """
+        self._store(key, "OLRData", olrdata.save_to_directory)
+
+    def load_eofs(self, key: str) -> typing.Optional[eof.EOFDataForAllDOYs]:
+        """
+        Loads EOFs from the cache.
+
+        :param key: The key of the entry.
+
+        :return: The memory-mapped EOFs or ``None``, if the cache does not contain a complete entry for the key.
+        """
+        entry_dirname = self._valid_entry_dirname(key, "EOFDataForAllDOYs")
+        if entry_dirname is None:
+            return None
+        return eof.restore_all_eofs_from_npy_dir(entry_dirname / "data")
+
+    def store_eofs(self, key: str, eofs: eof.EOFDataForAllDOYs) -> None:
+        """
+        Stores EOFs in the cache.
+
+        :param key: The key of the entry.
+        :param eofs: The EOFs.
+        """
+        self._store(key, "EOFDataForAllDOYs", eofs.save_all_eofs_to_npy_dir)
+
+    def total_size_bytes(self) -> int:
+        """
+        Calculates the total size of all entries in the cache.
+
+        :return: The size in bytes.
+        """
+        return sum(size for (key, size, last_access) in self._list_entries())
+
+    def clear(self) -> None:
+        """
+        Removes all entries from the cache.
+        """
+        for (key, size, last_access) in self._list_entries():
+            shutil.rmtree(self._directory / key, ignore_errors=True)
+
+    def _valid_entry_dirname(self, key: str, content: str) -> typing.Optional[Path]:
+        entry_dirname = self._directory / key
+        entry_filename = entry_dirname / "entry.json"
+        try:
+            with open(entry_filename, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("content") != content:
+            return None
+        # Mark the entry as recently used for the eviction.
+        os.utime(entry_filename)
+        return entry_dirname
+
+    def _store(self, key: str, content: str, save_function: typing.Callable[[Path], None]) -> None:
+        entry_dirname = self._directory / key
+        entry_filename = entry_dirname / "entry.json"
+        tools.remove_metadata_file(entry_filename)
+        save_function(entry_dirname / "data")
+        size = sum(f.stat().st_size for f in (entry_dirname / "data").iterdir() if f.is_file())
+        # The entry file is written last, so that incomplete entries are not considered as valid.
+        tools.write_metadata_file(entry_filename, {"content": content, "size_bytes": size, "created": time.time()})
+        self._evict(keep_key=key)
+
+    def _list_entries(self) -> typing.List[typing.Tuple[str, int, float]]:
+        entries = []
+        for entry_dirname in self._directory.iterdir():
+            entry_filename = entry_dirname / "entry.json"
+            if entry_filename.is_file():
+                try:
+                    with open(entry_filename, "r") as f:
+                        size = json.load(f)["size_bytes"]
+                    entries.append((entry_dirname.name, size, entry_filename.stat().st_mtime))
+                except (OSError, ValueError, KeyError):
+                    pass
+        return entries
+
+    def _evict(self, keep_key: str) -> None:
+        if self._max_size_bytes is None:
+            return
+        entries = sorted(self._list_entries(), key=lambda entry: entry[2])
+        total_size = sum(size for (key, size, last_access) in entries)
+        for (key, size, last_access) in entries:
+            if total_size <= self._max_size_bytes:
+                break
+            if key == keep_key:
+                continue
+            shutil.rmtree(self._directory / key, ignore_errors=True)
+            total_size -= size
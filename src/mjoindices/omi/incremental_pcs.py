@@ -0,0 +1,443 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2019 Christoph G. Hoffmann. All rights reserved.
+
+# This file is part of mjoindices
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Contact: christoph.hoffmann@uni-greifswald.de
+
+"""
+Provides an incremental calculation of the OMI PCs for operational use, in which new OLR data becomes available day
+by day.
+
+The function :py:func:`~mjoindices.omi.omi_calculator.calculate_pcs_from_olr` always processes the complete OLR record:
+The data is interpolated onto the grid of the EOFs, temporally filtered, and projected onto the EOFs. Finally, the PCs
+are normalized by the standard deviation of the complete PC1 time series. The class :class:`IncrementalPCCalculator`
+instead keeps a state, which is updated with each new day of OLR data:
+
+* Only the new OLR maps are interpolated onto the EOF grid.
+* The temporal filter is only applied to a trailing window of the OLR record (but see the note on the filter costs
+  below).
+* Only the PCs for the new days and for a short revision period before them are recalculated. Older PCs are kept.
+* The normalization factor is determined once from the initial OLR record and is kept frozen afterwards, so that the
+  PCs of different days remain comparable.
+
+The state can be saved to disk with :py:meth:`IncrementalPCCalculator.save_to_directory` and restored with
+:py:func:`restore_from_directory` between the daily runs:
+
+.. code-block:: python
+
+    calculator = IncrementalPCCalculator(eofs, olr_history)
+    calculator.save_to_directory(Path("/data/omi_state"))
+
+    # next day
+    calculator = restore_from_directory(Path("/data/omi_state"))
+    updated_pcs = calculator.add_days(olr_new_day)
+    calculator.save_to_directory(Path("/data/omi_state"))
+
+Note that the temporal filter takes into account the complete filter window. Hence, the PCs of the last days are
+generally revised when new data is added, since they are close to the end of the filter window. In contrast to a
+complete recalculation, however, the PCs before the revision period are not touched anymore, and the filter window does
+not cover the complete record. The deviations from a complete recalculation are small, if the filter window is long
+compared to the filter periods (at most 96 days).
+
+Note that the filter costs are only reduced by the trailing window with ``use_quick_temporal_filter=True``. The default
+Wheeler-Kiladis filter always zero-pads the time series to a fixed length of 2^17 days (in consistency with the
+original Kiladis code, see
+:py:meth:`~mjoindices.omi.wheeler_kiladis_mjo_filter.WKFilter.perform_2dim_spectral_filtering`), so that
+filtering the trailing window takes about as long as filtering a complete record of several decades. With the default
+filter, the daily update only saves the interpolation and projection of the older data.
+
+Alternatively, the calculator provides a real-time OMI (ROMI) mode in the spirit of :ref:`refKiladis2014` by
+``method="romi"``. The ROMI mode replaces the temporal bandpass filter by the removal of the mean of the previous 40
+days from each OLR map and a short trailing running mean of the PCs. Hence, the PCs of each day only depend on the
+past and are never revised, and each new day only costs one projection and a few running sums. The same EOFs and the
+same persistence are used as in the OMI mode.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+import mjoindices.empirical_orthogonal_functions as eof
+import mjoindices.olr_handling as olr
+import mjoindices.principal_components as pc
+import mjoindices.omi.omi_calculator as omi
+import mjoindices.omi.quick_temporal_filter as qfilter
+import mjoindices.omi.wheeler_kiladis_mjo_filter as wkfilter
+import mjoindices.tools as tools
+
+# Version 2 adds the raw PCs and the settings of the ROMI mode. States of version 1 are still restored in the OMI mode.
+_INCREMENTAL_STATE_FORMAT_VERSION = 2
+_METHODS = ("omi", "romi")
+
+
+class IncrementalPCCalculator:
+    """
+    Stateful calculator of the OMI PCs, which can be updated with new OLR data day by day.
+
+    On initialization, the PCs are calculated for the complete given OLR record. In the OMI mode, this is done in the
+    same way as by :py:func:`~mjoindices.omi.omi_calculator.calculate_pcs_from_olr`. The normalization factor is also
+    determined from the initial record and frozen afterwards.
+
+    :param eofdata: The EOFs, onto which the OLR data is projected. The spatial grid of the EOFs defines the grid of
+        the calculation.
+    :param olrdata: The initial OLR record. It must consist of consecutive days.
+    :param filter_window_length: OMI mode only: The number of most recent days, to which the temporal filter is applied
+        when new data is added.
+    :param revision_length: OMI mode only: The number of days before the new days, for which the PCs are recalculated
+        when new data is added. This accounts for the change of the filtered data close to the end of the filter
+        window.
+    :param use_quick_temporal_filter: OMI mode only: See
+        :py:func:`~mjoindices.omi.omi_calculator.calculate_pcs_from_olr`. Only the quick filter profits from the
+        shorter filter window in terms of computation time, since the default filter pads every time series to a fixed
+        length of 2^17 days.
+    :param dtype: See :py:func:`~mjoindices.omi.omi_calculator.calculate_pcs_from_olr`.
+    :param method: ``"omi"`` for the PCs based on the temporally filtered OLR data or ``"romi"`` for the real-time
+        variant (see the module description).
+    :param mean_removal_length: ROMI mode only: The number of previous days, whose mean is removed from the OLR map of
+        each day. The PCs of the first days of the initial record, for which not enough previous days are available,
+        are NaN.
+    :param smoothing_length: ROMI mode only: The length of the trailing running mean, which is applied to the PCs.
+        The normalization factor refers to the smoothed PCs.
+    """
+
+    def __init__(self, eofdata: eof.EOFDataForAllDOYs, olrdata: olr.OLRData, filter_window_length: int = 1461,
+                 revision_length: int = 100, use_quick_temporal_filter: bool = False,
+                 dtype: np.dtype = np.float64, method: str = "omi", mean_removal_length: int = 40,
+                 smoothing_length: int = 9) -> None:
+        """
+        Initialization with the initial calculation of the PCs.
+        """
+        if method not in _METHODS:
+            raise ValueError("method must be one of %s." % ", ".join(_METHODS))
+        if revision_length < 0:
+            raise ValueError("revision_length must not be negative.")
+        if filter_window_length <= revision_length:
+            raise ValueError("filter_window_length must be greater than revision_length.")
+        if mean_removal_length < 1 or smoothing_length < 1:
+            raise ValueError("mean_removal_length and smoothing_length must be positive.")
+        _check_consecutive_days(olrdata.time)
+        if method == "romi" and olrdata.time.size < mean_removal_length + smoothing_length + 1:
+            raise ValueError("The initial OLR record has to contain at least %i days in the ROMI mode."
+                             % (mean_removal_length + smoothing_length + 1))
+        self._eofdata = eofdata
+        self._filter_window_length = filter_window_length
+        self._revision_length = revision_length
+        self._use_quick_temporal_filter = use_quick_temporal_filter
+        self._dtype = np.dtype(dtype)
+        self._method = method
+        self._mean_removal_length = mean_removal_length
+        self._smoothing_length = smoothing_length
+
+        resampled_olr = olr.interpolate_spatial_grid(olrdata, eofdata.lat, eofdata.long, dtype=self._dtype)
+        if method == "omi":
+            raw_pcs = omi.regress_3dim_data_onto_eofs(self._filter(resampled_olr), eofdata, dtype=self._dtype)
+            self._time = raw_pcs.time
+            self._raw_pc1 = raw_pcs.pc1
+            self._raw_pc2 = raw_pcs.pc2
+            self._normalization_factor = float(1 / np.std(raw_pcs.pc1))
+            self._pc1 = np.multiply(raw_pcs.pc1, self._normalization_factor)
+            self._pc2 = np.multiply(raw_pcs.pc2, self._normalization_factor)
+            self._history = _select_last_days(resampled_olr, filter_window_length)
+        else:
+            raw_pcs = self._calc_romi_raw_pcs(resampled_olr.olr, resampled_olr.time[mean_removal_length:])
+            nans = np.full(mean_removal_length, np.nan, dtype=raw_pcs.pc1.dtype)
+            self._time = resampled_olr.time
+            self._raw_pc1 = np.concatenate((nans, raw_pcs.pc1))
+            self._raw_pc2 = np.concatenate((nans, raw_pcs.pc2))
+            smoothed_pc1 = np.concatenate((nans, _trailing_running_mean(raw_pcs.pc1, smoothing_length)))
+            smoothed_pc2 = np.concatenate((nans, _trailing_running_mean(raw_pcs.pc2, smoothing_length)))
+            self._normalization_factor = float(1 / np.nanstd(smoothed_pc1))
+            self._pc1 = np.multiply(smoothed_pc1, self._normalization_factor)
+            self._pc2 = np.multiply(smoothed_pc2, self._normalization_factor)
+            self._history = _select_last_days(resampled_olr, mean_removal_length)
+
+    @classmethod
+    def _from_state(cls, eofdata: eof.EOFDataForAllDOYs, history: olr.OLRData, pcs: pc.PCData,
+                    raw_pcs: pc.PCData, normalization_factor: float, filter_window_length: int,
+                    revision_length: int, use_quick_temporal_filter: bool, dtype: np.dtype, method: str,
+                    mean_removal_length: int, smoothing_length: int) -> "IncrementalPCCalculator":
+        """
+        Creates an object from a previously saved state without any calculation.
+        """
+        result = cls.__new__(cls)
+        result._eofdata = eofdata
+        result._filter_window_length = filter_window_length
+        result._revision_length = revision_length
+        result._use_quick_temporal_filter = use_quick_temporal_filter
+        result._dtype = np.dtype(dtype)
+        result._method = method
+        result._mean_removal_length = mean_removal_length
+        result._smoothing_length = smoothing_length
+        result._normalization_factor = normalization_factor
+        result._time = pcs.time
+        result._pc1 = pcs.pc1
+        result._pc2 = pcs.pc2
+        result._raw_pc1 = raw_pcs.pc1
+        result._raw_pc2 = raw_pcs.pc2
+        result._history = history
+        return result
+
+    @property
+    def eofdata(self) -> eof.EOFDataForAllDOYs:
+        """
+        The EOFs, onto which the OLR data is projected.
+        """
+        return self._eofdata
+
+    @property
+    def pcs(self) -> pc.PCData:
+        """
+        The normalized PCs for the complete period processed so far.
+        """
+        return pc.PCData(self._time, self._pc1, self._pc2)
+
+    @property
+    def normalization_factor(self) -> float:
+        """
+        The frozen factor, with which the raw PCs are multiplied.
+        """
+        return self._normalization_factor
+
+    @property
+    def last_date(self) -> np.datetime64:
+        """
+        The last date processed so far.
+        """
+        return self._time[-1]
+
+    @property
+    def filter_window_length(self) -> int:
+        """
+        The number of most recent days, to which the temporal filter is applied.
+        """
+        return self._filter_window_length
+
+    @property
+    def revision_length(self) -> int:
+        """
+        The number of days before new days, for which the PCs are recalculated.
+        """
+        return self._revision_length
+
+    @property
+    def method(self) -> str:
+        """
+        The calculation method, either ``"omi"`` or ``"romi"``.
+        """
+        return self._method
+
+    @property
+    def mean_removal_length(self) -> int:
+        """
+        The number of previous days, whose mean is removed from the OLR maps in the ROMI mode.
+        """
+        return self._mean_removal_length
+
+    @property
+    def smoothing_length(self) -> int:
+        """
+        The length of the trailing running mean of the PCs in the ROMI mode.
+        """
+        return self._smoothing_length
+
+    def add_days(self, olrdata: olr.OLRData) -> pc.PCData:
+        """
+        Adds new OLR data and updates the PCs.
+
+        :param olrdata: The new OLR data. It has to start on the day after :py:attr:`last_date` and has to consist of
+            consecutive days. The spatial grid must cover the grid of the EOFs.
+
+        :return: The normalized PCs of all days, which have been added or revised. In the ROMI mode, no days are
+            revised.
+        """
+        _check_consecutive_days(olrdata.time)
+        if olrdata.time[0] != self.last_date + np.timedelta64(1, "D"):
+            raise ValueError("The new OLR data has to start on the day after the last processed date %s."
+                             % str(self.last_date))
+        resampled_olr = olr.interpolate_spatial_grid(olrdata, self._eofdata.lat, self._eofdata.long,
+                                                     dtype=self._dtype)
+        if self._method == "romi":
+            return self._add_days_romi(resampled_olr)
+        self._history = _select_last_days(
+            olr.OLRData(np.concatenate((self._history.olr, resampled_olr.olr), axis=0),
+                        np.concatenate((self._history.time, resampled_olr.time)),
+                        self._eofdata.lat, self._eofdata.long, copy_data=False),
+            self._filter_window_length)
+        no_new_days = olrdata.time.size
+        no_revised_days = min(self._revision_length, self._time.size, self._history.time.size - no_new_days)
+
+        filtered_olr = self._filter(self._history)
+        update_olr = _select_last_days(filtered_olr, no_revised_days + no_new_days)
+        raw_pcs = omi.regress_3dim_data_onto_eofs(update_olr, self._eofdata, dtype=self._dtype)
+        updated_pc1 = np.multiply(raw_pcs.pc1, self._normalization_factor)
+        updated_pc2 = np.multiply(raw_pcs.pc2, self._normalization_factor)
+
+        no_kept_days = self._time.size - no_revised_days
+        self._time = np.concatenate((self._time[:no_kept_days], raw_pcs.time))
+        self._raw_pc1 = np.concatenate((self._raw_pc1[:no_kept_days], raw_pcs.pc1))
+        self._raw_pc2 = np.concatenate((self._raw_pc2[:no_kept_days], raw_pcs.pc2))
+        self._pc1 = np.concatenate((self._pc1[:no_kept_days], updated_pc1))
+        self._pc2 = np.concatenate((self._pc2[:no_kept_days], updated_pc2))
+        return pc.PCData(raw_pcs.time, updated_pc1, updated_pc2)
+
+    def _add_days_romi(self, resampled_olr: olr.OLRData) -> pc.PCData:
+        """
+        Adds new days in the ROMI mode. Only the PCs of the new days are calculated.
+        """
+        maps = np.concatenate((self._history.olr, resampled_olr.olr), axis=0)
+        raw_pcs = self._calc_romi_raw_pcs(maps, resampled_olr.time)
+        no_new_days = resampled_olr.time.size
+        # the running mean of the new days needs the raw PCs of the preceding days
+        no_preceding_days = self._smoothing_length - 1
+        raw_pc1 = np.concatenate((self._raw_pc1[self._raw_pc1.size - no_preceding_days:], raw_pcs.pc1))
+        raw_pc2 = np.concatenate((self._raw_pc2[self._raw_pc2.size - no_preceding_days:], raw_pcs.pc2))
+        new_pc1 = np.multiply(_trailing_running_mean(raw_pc1, self._smoothing_length)[-no_new_days:],
+                              self._normalization_factor)
+        new_pc2 = np.multiply(_trailing_running_mean(raw_pc2, self._smoothing_length)[-no_new_days:],
+                              self._normalization_factor)
+
+        self._time = np.concatenate((self._time, resampled_olr.time))
+        self._raw_pc1 = np.concatenate((self._raw_pc1, raw_pcs.pc1))
+        self._raw_pc2 = np.concatenate((self._raw_pc2, raw_pcs.pc2))
+        self._pc1 = np.concatenate((self._pc1, new_pc1))
+        self._pc2 = np.concatenate((self._pc2, new_pc2))
+        self._history = olr.OLRData(maps[-self._mean_removal_length:],
+                                    np.concatenate((self._history.time, resampled_olr.time))[-self._mean_removal_length:],
+                                    self._eofdata.lat, self._eofdata.long, copy_data=False)
+        return pc.PCData(resampled_olr.time, new_pc1, new_pc2)
+
+    def _calc_romi_raw_pcs(self, maps: np.ndarray, time: np.ndarray) -> pc.PCData:
+        """
+        Removes the mean of the previous days from the maps and projects them onto the EOFs.
+
+        :param maps: The interpolated OLR maps, starting ``mean_removal_length`` days before the first day of ``time``.
+        :param time: The days, for which the PCs are calculated.
+        """
+        length = self._mean_removal_length
+        # running sums of the maps, computed in double precision
+        cumulative_sums = np.zeros((maps.shape[0] + 1,) + maps.shape[1:])
+        np.cumsum(maps, axis=0, out=cumulative_sums[1:])
+        previous_means = (cumulative_sums[length:-1] - cumulative_sums[:-length - 1]) / length
+        anomalies = (maps[length:] - previous_means).astype(self._dtype, copy=False)
+        return omi.regress_3dim_data_onto_eofs(
+            olr.OLRData(anomalies, time, self._eofdata.lat, self._eofdata.long, copy_data=False), self._eofdata,
+            dtype=self._dtype)
+
+    def save_to_directory(self, dirname: Path, create_dir: bool = True) -> None:
+        """
+        Saves the complete state into a directory, from which it can be restored with :py:func:`restore_from_directory`.
+
+        :param dirname: The directory. A previously saved state will be overwritten.
+        :param create_dir: If ``True``, the directory (and parent directories) will be created, if not existing.
+        """
+        dirname = Path(dirname)
+        if not dirname.exists() and create_dir:
+            dirname.mkdir(parents=True, exist_ok=False)
+        metadata_filename = dirname / "metadata.json"
+        # The metadata file is removed first and written last, so that an incompletely written state is not
+        # recognized as valid.
+        tools.remove_metadata_file(metadata_filename)
+        self._eofdata.save_all_eofs_to_npy_dir(dirname / "eofs")
+        self._history.save_to_directory(dirname / "olr_history")
+        np.savez(dirname / "pcs.npz", time=self._time, pc1=self._pc1, pc2=self._pc2, raw_pc1=self._raw_pc1,
+                 raw_pc2=self._raw_pc2)
+        metadata = {"content": "IncrementalPCCalculator",
+                    "format_version": _INCREMENTAL_STATE_FORMAT_VERSION,
+                    "normalization_factor": self._normalization_factor,
+                    "filter_window_length": self._filter_window_length,
+                    "revision_length": self._revision_length,
+                    "use_quick_temporal_filter": self._use_quick_temporal_filter,
+                    "dtype": self._dtype.name,
+                    "method": self._method,
+                    "mean_removal_length": self._mean_removal_length,
+                    "smoothing_length": self._smoothing_length}
+        tools.write_metadata_file(metadata_filename, metadata)
+
+    def _filter(self, olrdata: olr.OLRData) -> olr.OLRData:
+        if self._use_quick_temporal_filter:
+            return qfilter.filter_olr_for_mjo_pc_calculation_1d_spectral_smoothing(olrdata, dtype=self._dtype)
+        else:
+            return wkfilter.filter_olr_for_mjo_pc_calculation(olrdata, dtype=self._dtype)
+
+
+def restore_from_directory(dirname: Path) -> IncrementalPCCalculator:
+    """
+    Restores an :class:`IncrementalPCCalculator` from a directory, into which it has been saved with
+    :py:meth:`IncrementalPCCalculator.save_to_directory`.
+
+    :param dirname: The directory.
+
+    :return: The calculator with the restored state.
+    """
+    dirname = Path(dirname)
+    metadata_filename = dirname / "metadata.json"
+    if not metadata_filename.is_file():
+        raise ValueError("Directory %s does not contain a valid state of an incremental PC calculation."
+                         % str(dirname))
+    with open(metadata_filename, "r") as f:
+        metadata = json.load(f)
+    format_version = metadata.get("format_version")
+    if metadata.get("content") != "IncrementalPCCalculator" or format_version not in (1, 2):
+        raise ValueError("Directory %s does not contain a state of an incremental PC calculation in a supported "
+                         "format." % str(dirname))
+    if format_version == 1:
+        metadata.update(method="omi", mean_removal_length=40, smoothing_length=9)
+    eofdata = eof.restore_all_eofs_from_npy_dir(dirname / "eofs", mmap_mode=None)
+    history = olr.restore_from_directory(dirname / "olr_history", mmap_mode=None)
+    with np.load(dirname / "pcs.npz") as data:
+        pcs = pc.PCData(data["time"], data["pc1"], data["pc2"])
+        if format_version == 1:
+            raw_pcs = pc.PCData(pcs.time, pcs.pc1 / metadata["normalization_factor"],
+                                pcs.pc2 / metadata["normalization_factor"])
+        else:
+            raw_pcs = pc.PCData(data["time"], data["raw_pc1"], data["raw_pc2"])
+    return IncrementalPCCalculator._from_state(eofdata, history, pcs, raw_pcs,
+                                               normalization_factor=metadata["normalization_factor"],
+                                               filter_window_length=metadata["filter_window_length"],
+                                               revision_length=metadata["revision_length"],
+                                               use_quick_temporal_filter=metadata["use_quick_temporal_filter"],
+                                               dtype=np.dtype(metadata["dtype"]),
+                                               method=metadata["method"],
+                                               mean_removal_length=metadata["mean_removal_length"],
+                                               smoothing_length=metadata["smoothing_length"])
+
+
+def _check_consecutive_days(time: np.ndarray) -> None:
+    if time.size < 1:
+        raise ValueError("OLR data does not contain any days.")
+    if not np.all(np.diff(time) == np.timedelta64(1, "D")):
+        raise ValueError("OLR data has to consist of consecutive days.")
+
+
+def _select_last_days(olrdata: olr.OLRData, no_days: int) -> olr.OLRData:
+    if olrdata.time.size <= no_days:
+        return olrdata
+    return olr.OLRData(olrdata.get_olr_block(np.s_[-no_days:, :, :]), olrdata.time[-no_days:], olrdata.lat,
+                       olrdata.long)
+
+
+def _trailing_running_mean(values: np.ndarray, length: int) -> np.ndarray:
+    """
+    Calculates the mean of each value and the ``length - 1`` preceding values. The first ``length - 1`` results are
+    NaN.
+    """
+    cumulative_sums = np.concatenate(([0.], np.cumsum(values, dtype=np.float64)))
+    result = np.full(values.size, np.nan)
+    result[length - 1:] = (cumulative_sums[length:] - cumulative_sums[:-length]) / length
+    return result.astype(values.dtype, copy=False)
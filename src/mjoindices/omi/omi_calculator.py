@@ -44,8 +44,11 @@ They are selected with the parameter ``eofs_postprocessing_type`` of the functio
 
 """
 
+import concurrent.futures
+import json
+import os
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import warnings
@@ -58,6 +61,7 @@ import mjoindices.omi.wheeler_kiladis_mjo_filter as wkfilter
 import mjoindices.omi.quick_temporal_filter as qfilter
 import mjoindices.omi.postprocessing_original_kiladis2014 as pp_kil2014
 import mjoindices.omi.postprocessing_rotation_approach as pp_rotation
+import mjoindices.omi.calculation_cache as calculation_cache
 import mjoindices.tools as tools
 
 eofs_spec = importlib.util.find_spec("eofs")
@@ -77,7 +81,9 @@ def calc_eofs_from_olr(olrdata: olr.OLRData,
                        interpolate_eofs: bool = None,
                        interpolation_start_doy: int = None,
                        interpolation_end_doy: int = None,
-                       strict_leap_year_treatment: bool = None
+                       strict_leap_year_treatment: bool = None,
+                       dtype: np.dtype = np.float64,
+                       result_cache: calculation_cache.CalculationCache = None
                        ) -> eof.EOFDataForAllDOYs:
     """
     One of the major functions of this module. It performs the complete OMI EOF computation.
@@ -117,6 +123,16 @@ def calc_eofs_from_olr(olrdata: olr.OLRData,
     :param interpolation_start_doy: .. deprecated:: 1.4
     :param interpolation_end_doy: .. deprecated:: 1.4
     :param strict_leap_year_treatment: .. deprecated:: 1.4
+    :param dtype: The floating point precision of the filtering and the EOF analysis, either ``np.float64`` (default)
+        or ``np.float32``. Single precision halves the memory consumption of the filtering and the covariance matrices
+        and speeds up the FFTs and the eigen-decompositions. Compared to the double precision results, the
+        single-precision EOFs typically deviate by less than 1e-4 (absolute, for normalized EOF vectors) and the
+        explained variances by less than 1e-5. Note that the deviations become larger for DOYs, for which the first
+        two eigenvalues are nearly degenerate, since the EOFs themselves are then ill-defined.
+    :param result_cache: If given, the filtered OLR data and the raw EOFs (before the post-processing) are taken from
+        this cache, if they have been calculated before for the same OLR data and settings. Otherwise, they are
+        calculated and stored in the cache. This is useful to compare different post-processing approaches, since
+        only the post-processing has to be repeated then. See :py:mod:`mjoindices.omi.calculation_cache`.
 
     :return: The computed EOFs.
 
@@ -179,13 +195,43 @@ def calc_eofs_from_olr(olrdata: olr.OLRData,
     # ###### end of backward compatibility section.
 
 
-    preprocessed_olr = preprocess_olr(olrdata)
-    raw_eofs = calc_eofs_from_preprocessed_olr(preprocessed_olr, implementation=implementation,
-                                               leap_year_treatment=leap_year_treatment)
+    if result_cache is None:
+        preprocessed_olr = preprocess_olr(olrdata, dtype=dtype)
+        raw_eofs = calc_eofs_from_preprocessed_olr(preprocessed_olr, implementation=implementation,
+                                                   leap_year_treatment=leap_year_treatment, dtype=dtype)
+    else:
+        raw_eofs = _calc_raw_eofs_using_cache(olrdata, result_cache, implementation, leap_year_treatment, dtype)
     result = initiate_eof_post_processing(raw_eofs, eofs_postprocessing_type, eofs_postprocessing_params)
     return result
 
 
+def _calc_raw_eofs_using_cache(olrdata: olr.OLRData, result_cache: calculation_cache.CalculationCache,
+                               implementation: str, leap_year_treatment: str,
+                               dtype: np.dtype) -> eof.EOFDataForAllDOYs:
+    """
+    Executes the preprocessing and the EOF analysis of :py:func:`calc_eofs_from_olr`, reusing the results from the
+    cache, if possible.
+    """
+    filtered_olr_key = result_cache.key("filtered_olr", olr=result_cache.fingerprint_olr(olrdata),
+                                        filter="wheeler_kiladis_mjo_eof", dtype=np.dtype(dtype).name)
+    raw_eofs_key = result_cache.key("raw_eofs", filtered_olr=filtered_olr_key, implementation=implementation,
+                                    leap_year_treatment=leap_year_treatment)
+    raw_eofs = result_cache.load_eofs(raw_eofs_key)
+    if raw_eofs is not None:
+        print("Raw EOFs loaded from cache")
+        return raw_eofs
+    preprocessed_olr = result_cache.load_olr(filtered_olr_key)
+    if preprocessed_olr is not None:
+        print("Filtered OLR data loaded from cache")
+    else:
+        preprocessed_olr = preprocess_olr(olrdata, dtype=dtype)
+        result_cache.store_olr(filtered_olr_key, preprocessed_olr)
+    raw_eofs = calc_eofs_from_preprocessed_olr(preprocessed_olr, implementation=implementation,
+                                               leap_year_treatment=leap_year_treatment, dtype=dtype)
+    result_cache.store_eofs(raw_eofs_key, raw_eofs)
+    return raw_eofs
+
+
 def initiate_eof_post_processing(raw_eofs: eof.EOFDataForAllDOYs,
                                  eofs_postprocessing_type: str = "kiladis2014",
                                  eofs_postprocessing_params: dict = None) -> eof.EOFDataForAllDOYs:
@@ -217,7 +263,7 @@ def initiate_eof_post_processing(raw_eofs: eof.EOFDataForAllDOYs,
         raise ValueError("EOF post-processing type unknown.")
     return result
 
-def preprocess_olr(olrdata: olr.OLRData) -> olr.OLRData:
+def preprocess_olr(olrdata: olr.OLRData, dtype: np.dtype = np.float64) -> olr.OLRData:
     """
     Performs the preprocessing of an OLR dataset to make it suitable for the EOF analysis.
 
@@ -227,17 +273,22 @@ def preprocess_olr(olrdata: olr.OLRData) -> olr.OLRData:
 
     :param olrdata: The original OLR dataset to be preprocessed. Note that OLR values are assumed to be given in
         positive values.
+    :param dtype: see :py:func:`calc_eofs_from_olr`.
 
     :return: The filtered OLR dataset.
     """
-    if np.mean(olrdata.olr) < 0:
+    if olrdata.mean_olr() < 0:
         warnings.warn("OLR data apparently given in negative numbers. Here it is assumed that OLR is positive.")
-    olrdata_filtered = wkfilter.filter_olr_for_mjo_eof_calculation(olrdata)
+    olrdata_filtered = wkfilter.filter_olr_for_mjo_eof_calculation(olrdata, dtype=dtype)
     return olrdata_filtered
 
 
 def calc_eofs_from_preprocessed_olr(olrdata: olr.OLRData, implementation: str = "internal",
-                                    leap_year_treatment: str = "original") -> eof.EOFDataForAllDOYs:
+                                    leap_year_treatment: str = "original",
+                                    dtype: np.dtype = np.float64,
+                                    checkpoint_dirname: Path = None,
+                                    resume: bool = False,
+                                    max_workers: int = 1) -> eof.EOFDataForAllDOYs:
     """
     Calculates a series of EOF pairs: one pair for each DOY.
 
@@ -247,6 +298,14 @@ def calc_eofs_from_preprocessed_olr(olrdata: olr.OLRData, implementation: str =
     :param olrdata: the preprocessed OLR data, from which the EOFs are calculated.
     :param implementation: see :py:func:`calc_eofs_from_olr`.
     :param leap_year_treatment: see :py:func:`calc_eofs_from_olr`.
+    :param dtype: see :py:func:`calc_eofs_from_olr`.
+    :param checkpoint_dirname: If given, the EOFs of each DOY are saved into this directory as soon as they have been
+        calculated. Together with ``resume=True``, an interrupted calculation can be continued later on.
+    :param resume: If ``True``, the EOFs of those DOYs, which are already found in the checkpoint directory, are not
+        calculated again. A :py:class:`ValueError` is raised if the checkpoints have been created for different input
+        data or settings. If ``False``, existing checkpoints are discarded.
+    :param max_workers: The number of threads, which calculate the EOFs for different DOYs concurrently. Note that the
+        eigen-decompositions may already use several threads internally, depending on the linear algebra library.
     :return: A pair of EOFs for each DOY. This series of EOFs has probably still to be postprocessed.
     """
     if implementation == "eofs_package" and not eofs_package_available:
@@ -256,18 +315,102 @@ def calc_eofs_from_preprocessed_olr(olrdata: olr.OLRData, implementation: str =
     if leap_year_treatment == "no_leap_years":
         no_leap_years = True
     doys = tools.doy_list(no_leap_years)
-    eofs = []
-    for doy in doys:
+    if checkpoint_dirname is not None:
+        checkpoint_dirname = Path(checkpoint_dirname)
+        _prepare_eof_checkpoint_dir(checkpoint_dirname, olrdata, implementation, leap_year_treatment, dtype, resume)
+
+    def calc_for_doy(doy):
+        if checkpoint_dirname is not None:
+            singleeof = _load_eof_checkpoint(checkpoint_dirname, doy, olrdata.lat, olrdata.long)
+            if singleeof is not None:
+                print("EOFs for DOY %i loaded from checkpoint" % doy)
+                return singleeof
         print("Calculating EOFs for DOY %i" % doy)
         if (implementation == "eofs_package"):
-            singleeof = calc_eofs_for_doy_using_eofs_package(olrdata, doy, leap_year_treatment=leap_year_treatment)
+            singleeof = calc_eofs_for_doy_using_eofs_package(olrdata, doy, leap_year_treatment=leap_year_treatment,
+                                                             dtype=dtype)
         else:
-            singleeof = calc_eofs_for_doy(olrdata, doy, leap_year_treatment=leap_year_treatment)
-        eofs.append(singleeof)
+            singleeof = calc_eofs_for_doy(olrdata, doy, leap_year_treatment=leap_year_treatment, dtype=dtype)
+        if checkpoint_dirname is not None:
+            _save_eof_checkpoint(checkpoint_dirname, doy, singleeof)
+        return singleeof
+
+    if max_workers == 1:
+        eofs = [calc_for_doy(doy) for doy in doys]
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            eofs = list(executor.map(calc_for_doy, doys))
     return eof.EOFDataForAllDOYs(eofs, no_leap_years)
 
 
-def calc_eofs_for_doy(olrdata: olr.OLRData, doy: int, leap_year_treatment: str = "original") -> eof.EOFData:
+def _prepare_eof_checkpoint_dir(dirname: Path, olrdata: olr.OLRData, implementation: str, leap_year_treatment: str,
+                                dtype: np.dtype, resume: bool) -> None:
+    """
+    Prepares the checkpoint directory for :py:func:`calc_eofs_from_preprocessed_olr`.
+
+    The directory contains a file ``checkpoint.json``, which describes the input data and settings. Existing
+    checkpoints are only kept if ``resume`` is ``True`` and if they have been created for the same input.
+    """
+    metadata = {"olr_fingerprint": calculation_cache.fingerprint_olr(olrdata),
+                "implementation": implementation,
+                "leap_year_treatment": leap_year_treatment,
+                "dtype": np.dtype(dtype).name}
+    metadata_filename = dirname / "checkpoint.json"
+    dirname.mkdir(parents=True, exist_ok=True)
+    if metadata_filename.is_file():
+        with open(metadata_filename, "r") as f:
+            existing_metadata = json.load(f)
+        if resume:
+            if existing_metadata != metadata:
+                raise ValueError("The checkpoints in %s have been created for different input data or settings."
+                                 % str(dirname))
+            return
+    elif resume and any(dirname.glob("doy*.npz")):
+        raise ValueError("The checkpoints in %s cannot be validated, since %s is missing."
+                         % (str(dirname), metadata_filename.name))
+    for filename in dirname.glob("doy*.npz"):
+        filename.unlink()
+    tools.write_metadata_file(metadata_filename, metadata)
+
+
+def _eof_checkpoint_filename(dirname: Path, doy: int) -> Path:
+    return dirname / ("doy%s.npz" % format(doy, '03'))
+
+
+def _save_eof_checkpoint(dirname: Path, doy: int, eofdata: eof.EOFData) -> None:
+    """
+    Saves the EOFs of one DOY into the checkpoint directory.
+
+    The file is first written under a temporary name and renamed afterwards, so that an interruption during writing
+    does not leave a corrupted checkpoint.
+    """
+    filename = _eof_checkpoint_filename(dirname, doy)
+    temp_filename = filename.with_name(filename.name + ".tmp")
+    with open(temp_filename, "wb") as f:
+        np.savez(f, eof1=eofdata.eof1vector, eof2=eofdata.eof2vector,
+                 explained_variances=eofdata.explained_variances, eigenvalues=eofdata.eigenvalues,
+                 no_observations=eofdata.no_observations)
+    os.replace(temp_filename, filename)
+
+
+def _load_eof_checkpoint(dirname: Path, doy: int, lat: np.ndarray, long: np.ndarray) -> Optional[eof.EOFData]:
+    """
+    Loads the EOFs of one DOY from the checkpoint directory.
+
+    :return: The EOFs or ``None``, if no checkpoint exists for the DOY.
+    """
+    filename = _eof_checkpoint_filename(dirname, doy)
+    if not filename.is_file():
+        return None
+    with np.load(filename) as data:
+        return eof.EOFData(lat, long, data["eof1"], data["eof2"],
+                           explained_variances=data["explained_variances"],
+                           eigenvalues=data["eigenvalues"],
+                           no_observations=int(data["no_observations"]))
+
+
+def calc_eofs_for_doy(olrdata: olr.OLRData, doy: int, leap_year_treatment: str = "original",
+                      dtype: np.dtype = np.float64) -> eof.EOFData:
     """
     Calculates a pair of EOFs for a particular DOY.
 
@@ -279,6 +422,8 @@ def calc_eofs_for_doy(olrdata: olr.OLRData, doy: int, leap_year_treatment: str =
     :param olrdata: The filtered OLR data to calculate the EOFs from.
     :param doy: The DOY for which the EOFs are calculated.
     :param leap_year_treatment: see :py:func:`calc_eofs_from_olr`.
+    :param dtype: The floating point precision of the covariance matrix and the eigen-decomposition.
+        See :py:func:`calc_eofs_from_olr`.
 
     :return: An object containing the pair of EOFs together with diagnostic values.
 
@@ -289,10 +434,23 @@ def calc_eofs_for_doy(olrdata: olr.OLRData, doy: int, leap_year_treatment: str =
     nlong = olrdata.long.size
     olr_maps_for_doy = olrdata.extract_olr_matrix_for_doy_range(doy, window_length=60,
                                                                 leap_year_treatment=leap_year_treatment)
+    olr_maps_for_doy = olr_maps_for_doy.astype(dtype, copy=False)
     N = olr_maps_for_doy.shape[0]
     M = nlat * nlong
     F = np.reshape(olr_maps_for_doy, [N, M]).T  # vector: only one dimension. Length given by original longitude and latitude bins
     R = np.matmul(F, F.T) / N  # in some references, it is divided by (N-1), however, we follow Kutzbach (1967), in which it is only divided by N. In any case, the result should not differ much.
+    return _calc_eofs_from_covariance_matrix(R, N, olrdata.lat, olrdata.long)
+
+
+def _calc_eofs_from_covariance_matrix(R: np.ndarray, N: int, lat: np.ndarray, long: np.ndarray) -> eof.EOFData:
+    """
+    Solves the eigenproblem of a covariance matrix and returns the leading pair of EOFs.
+
+    :param R: The covariance matrix.
+    :param N: The number of observations, from which the covariance matrix has been computed.
+    :param lat: The latitude grid.
+    :param long: The longitude grid.
+    """
     if not np.allclose(R, R.T):
         warnings.warn("Covariance matrix is not symmetric within defined tolerance")
     L, E = np.linalg.eig(R)
@@ -312,12 +470,13 @@ def calc_eofs_for_doy(olrdata: olr.OLRData, doy: int, leap_year_treatment: str =
     eof1_vec = np.squeeze(E[:, 0])
     eof2_vec = np.squeeze(E[:, 1])
 
-    return eof.EOFData(olrdata.lat, olrdata.long, eof1_vec, eof2_vec,
+    return eof.EOFData(lat, long, eof1_vec, eof2_vec,
                        eigenvalues=L, explained_variances=explainedVariances, no_observations=N)
 
 
 def calc_eofs_for_doy_using_eofs_package(olrdata: olr.OLRData, doy: int,
-                                         leap_year_treatment: str = "original") -> eof.EOFData:
+                                         leap_year_treatment: str = "original",
+                                         dtype: np.dtype = np.float64) -> eof.EOFData:
     """
     Calculates a pair of EOFs for a particular DOY.
 
@@ -328,6 +487,7 @@ def calc_eofs_for_doy_using_eofs_package(olrdata: olr.OLRData, doy: int,
     :param olrdata: The filtered OLR data to calculate the EOFs from.
     :param doy: The DOY for which the EOFs are calculated.
     :param leap_year_treatment: see :py:func:`calc_eofs_from_olr`.
+    :param dtype: The floating point precision of the data passed to the :py:mod:`eofs` package.
 
     :return: An object containing the pair of EOFs together with diagnostic values.
 
@@ -339,6 +499,7 @@ def calc_eofs_for_doy_using_eofs_package(olrdata: olr.OLRData, doy: int,
         nlong = olrdata.long.size
         olr_maps_for_doy = olrdata.extract_olr_matrix_for_doy_range(doy, window_length=60,
                                                                     leap_year_treatment=leap_year_treatment)
+        olr_maps_for_doy = olr_maps_for_doy.astype(dtype, copy=False)
 
         ntime = olr_maps_for_doy.shape[0]
         N = ntime
@@ -362,13 +523,315 @@ def calc_eofs_for_doy_using_eofs_package(olrdata: olr.OLRData, doy: int,
     else:
         raise ModuleNotFoundError("eofs")
 
+
+# #################Covariance accumulators for sub-periods
+
+_COVARIANCE_ACCUMULATORS_FORMAT_VERSION = 1
+
+
+class DOYCovarianceAccumulators:
+    """
+    Partial sums of the DOY-window covariance matrices, separately for each calendar year.
+
+    The covariance matrix of each DOY (see :py:func:`calc_eofs_for_doy`) is a sum over the OLR maps in the DOY window,
+    which can be split into the contributions of the individual years. Based on these partial sums, the EOFs for any
+    subset of years are obtained by summing the respective contributions and solving only the eigenproblems. This is
+    much faster than a complete calculation with :py:func:`calc_eofs_from_olr` for each subset, e.g., for a
+    leave-one-year-out cross-validation.
+
+    Objects of this class are created by :py:func:`calc_doy_covariance_accumulators` or
+    :py:func:`restore_doy_covariance_accumulators`.
+
+    Note that the partial sums require ``ndoys * nyears * M**2`` values, with M being the number of grid points. For
+    the full OMI grid, this is too much to be kept in memory. In this case, the accumulators should be stored in a
+    directory and used in memory-mapped mode.
+
+    :param lat: The latitude grid.
+    :param long: The longitude grid.
+    :param years: The calendar years.
+    :param covariance_sums: For each DOY, an array with the shape (years, M, M) containing the sums of the outer
+        products of the OLR vectors in the DOY window, separately for each year.
+    :param counts: The number of OLR maps contributing to the sums with the shape (DOYs, years).
+    :param no_leap_years: ``True`` if the DOYs are based on years with 365 days.
+    """
+
+    def __init__(self, lat: np.ndarray, long: np.ndarray, years: np.ndarray, covariance_sums: List[np.ndarray],
+                 counts: np.ndarray, no_leap_years: bool) -> None:
+        """
+        Initialization with all partial sums.
+        """
+        no_doys = tools.doy_list(no_leap_years).size
+        no_gridpoints = lat.size * long.size
+        if len(covariance_sums) != no_doys or counts.shape != (no_doys, years.size):
+            raise ValueError("Partial sums have to be given for all DOYs and years.")
+        if any(sums.shape != (years.size, no_gridpoints, no_gridpoints) for sums in covariance_sums):
+            raise ValueError("Shape of the partial sums does not fit to the years and the spatial grid.")
+        self._lat = lat
+        self._long = long
+        self._years = years
+        self._covariance_sums = covariance_sums
+        self._counts = counts
+        self._no_leap_years = no_leap_years
+
+    @property
+    def lat(self) -> np.ndarray:
+        """
+        The latitude grid.
+        """
+        return self._lat
+
+    @property
+    def long(self) -> np.ndarray:
+        """
+        The longitude grid.
+        """
+        return self._long
+
+    @property
+    def years(self) -> np.ndarray:
+        """
+        The calendar years, for which partial sums are available.
+        """
+        return self._years
+
+    @property
+    def counts(self) -> np.ndarray:
+        """
+        The number of OLR maps contributing to the partial sums with the shape (DOYs, years).
+        """
+        return self._counts
+
+    @property
+    def no_leap_years(self) -> bool:
+        """
+        ``True`` if the DOYs are based on years with 365 days.
+        """
+        return self._no_leap_years
+
+    def calc_eofs(self, years: Optional[Sequence[int]] = None, exclude_years: Optional[Sequence[int]] = None,
+                  eofs_postprocessing_type: str = "kiladis2014", eofs_postprocessing_params: dict = None,
+                  max_workers: int = 1) -> eof.EOFDataForAllDOYs:
+        """
+        Calculates the EOFs for a subset of years.
+
+        :param years: The years to consider. If ``None``, all years are considered.
+        :param exclude_years: Years, which are excluded from ``years``.
+        :param eofs_postprocessing_type: See :py:func:`calc_eofs_from_olr`.
+        :param eofs_postprocessing_params: See :py:func:`calc_eofs_from_olr`.
+        :param max_workers: The number of threads, which solve the eigenproblems for different DOYs concurrently.
+
+        :return: The EOFs.
+        """
+        selection = self._select_years(years, exclude_years)
+
+        def calc_for_doy(doy_index):
+            covariance_sum = np.sum(self._covariance_sums[doy_index][selection], axis=0)
+            no_observations = int(np.sum(self._counts[doy_index, selection]))
+            if no_observations == 0:
+                raise ValueError("No OLR data available for DOY %i in the selected years." % (doy_index + 1))
+            return _calc_eofs_from_covariance_matrix(covariance_sum / no_observations, no_observations, self._lat,
+                                                     self._long)
+
+        raw_eofs = self._calc_for_all_doys(calc_for_doy, max_workers)
+        return initiate_eof_post_processing(eof.EOFDataForAllDOYs(raw_eofs, self._no_leap_years),
+                                            eofs_postprocessing_type, eofs_postprocessing_params)
+
+    def calc_leave_one_year_out_eofs(self, eofs_postprocessing_type: str = "kiladis2014",
+                                     eofs_postprocessing_params: dict = None,
+                                     max_workers: int = 1) -> Dict[int, eof.EOFDataForAllDOYs]:
+        """
+        Calculates the EOFs for all years but one, for each of the years.
+
+        For each DOY, the sum over all years is computed only once and the contribution of the left-out year is
+        subtracted afterwards.
+
+        :param eofs_postprocessing_type: See :py:func:`calc_eofs_from_olr`.
+        :param eofs_postprocessing_params: See :py:func:`calc_eofs_from_olr`.
+        :param max_workers: The number of threads, which solve the eigenproblems for different DOYs concurrently.
+
+        :return: The EOFs for each left-out year.
+        """
+        if self._years.size < 2:
+            raise ValueError("At least two years are necessary for a leave-one-year-out calculation.")
+
+        def calc_for_doy(doy_index):
+            sums = self._covariance_sums[doy_index]
+            counts = self._counts[doy_index]
+            total_sum = np.sum(sums, axis=0)
+            total_count = int(np.sum(counts))
+            if np.any(counts == total_count):
+                raise ValueError("No OLR data available for DOY %i without one of the years." % (doy_index + 1))
+            return [_calc_eofs_from_covariance_matrix((total_sum - sums[i]) / (total_count - counts[i]),
+                                                      total_count - int(counts[i]), self._lat, self._long)
+                    for i in range(self._years.size)]
+
+        raw_eofs_per_doy = self._calc_for_all_doys(calc_for_doy, max_workers)
+        result = {}
+        for i, year in enumerate(self._years):
+            raw_eofs = eof.EOFDataForAllDOYs([eofs[i] for eofs in raw_eofs_per_doy], self._no_leap_years)
+            result[int(year)] = initiate_eof_post_processing(raw_eofs, eofs_postprocessing_type,
+                                                             eofs_postprocessing_params)
+        return result
+
+    def save_to_directory(self, dirname: Path, create_dir: bool = True) -> None:
+        """
+        Saves the partial sums as uncompressed numpy files into a directory, from which they can be restored with
+        :py:func:`restore_doy_covariance_accumulators`.
+
+        :param dirname: The directory. Existing files of previously saved accumulators will be overwritten.
+        :param create_dir: If ``True``, the directory (and parent directories) will be created, if not existing.
+        """
+        dirname = Path(dirname)
+        if not dirname.exists() and create_dir:
+            dirname.mkdir(parents=True, exist_ok=False)
+        metadata_filename = dirname / "metadata.json"
+        tools.remove_metadata_file(metadata_filename)
+        for doy_index, sums in enumerate(self._covariance_sums):
+            filename = _covariance_sums_filename(dirname, doy_index + 1)
+            # sums which are already memory-mapped from the target file do not need to be written again
+            if not (isinstance(sums, np.memmap) and sums.filename is not None
+                    and Path(sums.filename).resolve() == filename.resolve()):
+                np.save(filename, sums)
+        np.save(dirname / "counts.npy", self._counts)
+        np.save(dirname / "years.npy", self._years)
+        np.save(dirname / "lat.npy", self._lat)
+        np.save(dirname / "long.npy", self._long)
+        # The metadata file is written last, so that an incompletely written directory is not recognized as valid.
+        metadata = {"content": "DOYCovarianceAccumulators",
+                    "format_version": _COVARIANCE_ACCUMULATORS_FORMAT_VERSION,
+                    "no_leap_years": self._no_leap_years}
+        tools.write_metadata_file(metadata_filename, metadata)
+
+    def _select_years(self, years: Optional[Sequence[int]], exclude_years: Optional[Sequence[int]]) -> np.ndarray:
+        """
+        Returns a boolean array marking the selected years.
+        """
+        if years is None:
+            selection = np.ones(self._years.size, dtype=bool)
+        else:
+            if not np.all(np.isin(years, self._years)):
+                raise ValueError("No partial sums available for some of the years.")
+            selection = np.isin(self._years, years)
+        if exclude_years is not None:
+            selection &= ~np.isin(self._years, exclude_years)
+        if not np.any(selection):
+            raise ValueError("No years selected.")
+        return selection
+
+    def _calc_for_all_doys(self, calc_for_doy, max_workers: int) -> list:
+        if max_workers == 1:
+            return [calc_for_doy(doy_index) for doy_index in range(len(self._covariance_sums))]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(calc_for_doy, range(len(self._covariance_sums))))
+
+
+def calc_doy_covariance_accumulators(olrdata: olr.OLRData, leap_year_treatment: str = "original",
+                                     dtype: np.dtype = np.float64,
+                                     dirname: Path = None) -> DOYCovarianceAccumulators:
+    """
+    Calculates the partial sums of the DOY-window covariance matrices for each calendar year.
+
+    Each OLR map contributes to the partial sum of the calendar year, in which it is located. For the leap year
+    treatments ``"original"`` and ``"no_leap_years"``, the DOY windows only depend on the DOYs of the OLR maps. Hence,
+    the EOFs calculated for a subset of years (see :py:meth:`DOYCovarianceAccumulators.calc_eofs`) are the same as
+    those calculated from the OLR data of these years alone. Note, however, that the temporal filtering has been applied
+    to the complete record before.
+
+    :param olrdata: The preprocessed OLR data (see :py:func:`preprocess_olr`).
+    :param leap_year_treatment: ``"original"`` or ``"no_leap_years"``, see :py:func:`calc_eofs_from_olr`.
+        The setting ``"strict"`` is not supported, since its DOY windows are not separable into calendar years.
+    :param dtype: The floating point precision of the partial sums.
+    :param dirname: If given, the partial sums are written into this directory DOY by DOY and are memory-mapped
+        afterwards. Hence, only the partial sums of a single DOY have to be kept in memory during the calculation.
+
+    :return: The partial sums.
+    """
+    if leap_year_treatment not in ("original", "no_leap_years"):
+        raise ValueError("Covariance accumulators are only available for the leap year treatments 'original' and "
+                         "'no_leap_years'.")
+    no_leap_years = leap_year_treatment == "no_leap_years"
+    sample_years = olrdata.time.astype("datetime64[Y]").astype(int) + 1970
+    years = np.unique(sample_years)
+    no_gridpoints = olrdata.lat.size * olrdata.long.size
+    doys = tools.doy_list(no_leap_years)
+    counts = np.zeros((doys.size, years.size), dtype=np.int64)
+    if dirname is not None:
+        dirname = Path(dirname)
+        dirname.mkdir(parents=True, exist_ok=True)
+        # invalidate previously saved accumulators, whose files are overwritten in the following
+        tools.remove_metadata_file(dirname / "metadata.json")
+    covariance_sums = []
+    for doy_index, doy in enumerate(doys):
+        print("Calculating covariance accumulators for DOY %i" % doy)
+        inds, _ = tools.find_doy_ranges_in_dates(olrdata.time, doy, window_length=60,
+                                                 leap_year_treatment=leap_year_treatment)
+        if dirname is None:
+            sums = np.zeros((years.size, no_gridpoints, no_gridpoints), dtype=dtype)
+        else:
+            sums = np.lib.format.open_memmap(_covariance_sums_filename(dirname, doy), mode="w+", dtype=dtype,
+                                             shape=(years.size, no_gridpoints, no_gridpoints))
+        for year_index, year in enumerate(years):
+            year_inds = inds[sample_years[inds] == year]
+            if year_inds.size == 0:
+                continue
+            F = np.reshape(olrdata.get_olr_block(np.s_[year_inds, :, :]).astype(dtype, copy=False),
+                           [year_inds.size, no_gridpoints])
+            np.matmul(F.T, F, out=sums[year_index])
+            counts[doy_index, year_index] = year_inds.size
+        if dirname is not None:
+            sums.flush()
+            del sums
+            sums = np.load(_covariance_sums_filename(dirname, doy), mmap_mode="r")
+        covariance_sums.append(sums)
+    result = DOYCovarianceAccumulators(olrdata.lat, olrdata.long, years, covariance_sums, counts, no_leap_years)
+    if dirname is not None:
+        result.save_to_directory(dirname)
+    return result
+
+
+def restore_doy_covariance_accumulators(dirname: Path, mmap_mode: Optional[str] = "r") -> DOYCovarianceAccumulators:
+    """
+    Restores partial sums of the covariance matrices, which have been saved with
+    :py:meth:`DOYCovarianceAccumulators.save_to_directory` or calculated with
+    :py:func:`calc_doy_covariance_accumulators` into a directory.
+
+    :param dirname: The directory.
+    :param mmap_mode: The memory-map mode of the partial sums (see :py:func:`numpy.load`). If ``None``, the partial
+        sums are read completely into memory.
+
+    :return: The partial sums.
+    """
+    dirname = Path(dirname)
+    metadata_filename = dirname / "metadata.json"
+    if not metadata_filename.is_file():
+        raise ValueError("Directory %s does not contain complete covariance accumulators." % str(dirname))
+    with open(metadata_filename, "r") as f:
+        metadata = json.load(f)
+    if (metadata.get("content") != "DOYCovarianceAccumulators"
+            or metadata.get("format_version") != _COVARIANCE_ACCUMULATORS_FORMAT_VERSION):
+        raise ValueError("Directory %s does not contain covariance accumulators in the expected format."
+                         % str(dirname))
+    no_leap_years = metadata["no_leap_years"]
+    covariance_sums = [np.load(_covariance_sums_filename(dirname, doy), mmap_mode=mmap_mode)
+                       for doy in tools.doy_list(no_leap_years)]
+    return DOYCovarianceAccumulators(np.load(dirname / "lat.npy"), np.load(dirname / "long.npy"),
+                                     np.load(dirname / "years.npy"), covariance_sums,
+                                     np.load(dirname / "counts.npy"), no_leap_years)
+
+
+def _covariance_sums_filename(dirname: Path, doy: int) -> Path:
+    return dirname / ("covariance_doy%s.npy" % format(doy, '03'))
+
+
 # #################PC Calculation
 
 def calculate_pcs_from_olr(olrdata: olr.OLRData,
                            eofdata: eof.EOFDataForAllDOYs,
                            period_start: np.datetime64,
                            period_end: np.datetime64,
-                           use_quick_temporal_filter=False) -> pc.PCData:
+                           use_quick_temporal_filter=False,
+                           dtype: np.dtype = np.float64,
+                           fused_projection: bool = False) -> pc.PCData:
     """
     This major function computes PCs according to the OMI algorithm based on given OLR data and previously calculated
     EOFs.
@@ -384,15 +847,34 @@ def calculate_pcs_from_olr(olrdata: olr.OLRData,
           slower (because it is based on a 2-dim FFT).
         * ``True``: 1-dim FFT Filter, which results in a quicker computation.
 
+    :param dtype: The floating point precision of the interpolation result, the filtering, and the regression, either
+        ``np.float64`` (default) or ``np.float32``. Compared to the double precision results, the normalized
+        single-precision PCs typically deviate by less than 1e-4.
+    :param fused_projection: If ``True``, the filtered OLR data cube is not kept in memory. Instead, the filtered data
+        of each latitude is directly projected onto the EOFs of the corresponding DOYs and discarded afterwards. This
+        is possible since the projection is linear in the grid points. The peak memory of the filtering and the
+        regression is reduced to the filtered data of one latitude and the resulting PCs. The PCs deviate from those of
+        the default calculation only by rounding errors.
+
     :return: The PC time series. Normalized by the full PC time series
     """
     resticted_olr_data = olr.restrict_time_coverage(olrdata, period_start, period_end)
-    resampled_olr_data = olr.interpolate_spatial_grid(resticted_olr_data, eofdata.lat, eofdata.long)
-    if use_quick_temporal_filter:
-        filtered_olr_data = qfilter.filter_olr_for_mjo_pc_calculation_1d_spectral_smoothing(resampled_olr_data)
+    resampled_olr_data = olr.interpolate_spatial_grid(resticted_olr_data, eofdata.lat, eofdata.long, dtype=dtype)
+    if fused_projection:
+        if use_quick_temporal_filter:
+            filtered_latitudes = qfilter.filter_olr_for_mjo_pc_calculation_1d_spectral_smoothing_latitudewise(
+                resampled_olr_data, dtype=dtype)
+        else:
+            filtered_latitudes = wkfilter.filter_olr_for_mjo_pc_calculation_latitudewise(resampled_olr_data,
+                                                                                        dtype=dtype)
+        raw_pcs = _regress_latitudes_onto_eofs(filtered_latitudes, resampled_olr_data.time, eofdata, dtype=dtype)
     else:
-        filtered_olr_data = wkfilter.filter_olr_for_mjo_pc_calculation(resampled_olr_data)
-    raw_pcs = regress_3dim_data_onto_eofs(filtered_olr_data, eofdata)
+        if use_quick_temporal_filter:
+            filtered_olr_data = qfilter.filter_olr_for_mjo_pc_calculation_1d_spectral_smoothing(resampled_olr_data,
+                                                                                                dtype=dtype)
+        else:
+            filtered_olr_data = wkfilter.filter_olr_for_mjo_pc_calculation(resampled_olr_data, dtype=dtype)
+        raw_pcs = regress_3dim_data_onto_eofs(filtered_olr_data, eofdata, dtype=dtype)
     normalization_factor = 1 / np.std(raw_pcs.pc1)
     pc1 = np.multiply(raw_pcs.pc1, normalization_factor)
     pc2 = np.multiply(raw_pcs.pc2, normalization_factor)
@@ -401,7 +883,9 @@ def calculate_pcs_from_olr(olrdata: olr.OLRData,
 
 def calculate_pcs_from_olr_original_conditions(olrdata: olr.OLRData,
                                                original_eof_dirname: Path,
-                                               use_quick_temporal_filter=False) -> pc.PCData:
+                                               use_quick_temporal_filter=False,
+                                               dtype: np.dtype = np.float64,
+                                               use_eof_cache: bool = False) -> pc.PCData:
     """
     Convenience function that calculates the OMI PCs for the original period using the original dataset (which has,
     however, to be provided by the user).
@@ -413,20 +897,340 @@ def calculate_pcs_from_olr_original_conditions(olrdata: olr.OLRData,
         from ftp://ftp.cdc.noaa.gov/Datasets.other/MJO/eof1/ and ftp://ftp.cdc.noaa.gov/Datasets.other/MJO/eof2/ .
         The contents of both remote directories should again be placed into sub directories *eof1* and *eof2*
     :param use_quick_temporal_filter: See :py:func:`calculate_pcs_from_olr`
+    :param dtype: See :py:func:`calculate_pcs_from_olr`
+    :param use_eof_cache: If ``True``, the parsed original EOFs are cached in a binary format inside of
+        ``original_eof_dirname``, which speeds up subsequent calls.
+        See :py:func:`mjoindices.empirical_orthogonal_functions.load_all_original_eofs_from_directory`.
 
     :return: The PCs, which should be similar to the original ones.
     """
     period_start = np.datetime64("1979-01-01")
     period_end = np.datetime64("2018-08-28")
-    eofs = eof.load_all_original_eofs_from_directory(original_eof_dirname)
+    eofs = eof.load_all_original_eofs_from_directory(original_eof_dirname, use_cache=use_eof_cache)
     return calculate_pcs_from_olr(olrdata,
                                   eofs,
                                   period_start,
                                   period_end,
-                                  use_quick_temporal_filter)
+                                  use_quick_temporal_filter,
+                                  dtype=dtype)
+
+
+def calculate_pcs_from_olr_chunks(olr_chunks: Iterable[olr.OLRData],
+                                  eofdata: eof.EOFDataForAllDOYs,
+                                  overlap: int = 365,
+                                  use_quick_temporal_filter=False,
+                                  dtype: np.dtype = np.float64) -> pc.PCData:
+    """
+    Computes the PCs like :py:func:`calculate_pcs_from_olr`, but processes the OLR data chunk by chunk.
+
+    This allows calculating PCs for records, which do not fit into memory as a whole, e.g., multi-century model runs.
+    The required memory is determined by the chunk length and the overlap and not by the length of the record. Only the
+    raw PC time series of the complete record are accumulated before the final normalization.
+
+    Note that the Wheeler-Kiladis filter pads each window to the same FFT length, so that its computing time per
+    window hardly depends on the chunk length. Hence, chunks of several years are recommended when this filter is used.
+
+    The OLR chunks can be read from disk, e.g., with :py:func:`mjoindices.olr_handling.iterate_noaa_interpolated_olr_chunks`
+    or with :py:func:`mjoindices.olr_handling.iterate_time_chunks` applied on data restored in memory-mapped mode by
+    :py:func:`mjoindices.olr_handling.restore_from_directory`.
+
+    See :py:func:`iterate_raw_pcs_from_olr_chunks` for details of the chunk processing.
+
+    :param olr_chunks: The OLR data as an iterable of :class:`mjoindices.olr_handling.OLRData` objects, which cover
+        consecutive periods and share the same spatial grid.
+    :param eofdata: The previously calculated DOY-dependent EOFs.
+    :param overlap: See :py:func:`iterate_raw_pcs_from_olr_chunks`.
+    :param use_quick_temporal_filter: See :py:func:`calculate_pcs_from_olr`.
+    :param dtype: See :py:func:`calculate_pcs_from_olr`.
 
+    :return: The PC time series. Normalized by the full PC time series.
+    """
+    raw_pc_chunks = list(iterate_raw_pcs_from_olr_chunks(olr_chunks, eofdata, overlap=overlap,
+                                                         use_quick_temporal_filter=use_quick_temporal_filter,
+                                                         dtype=dtype))
+    if len(raw_pc_chunks) == 0:
+        raise ValueError("No OLR data given.")
+    time = np.concatenate([chunk.time for chunk in raw_pc_chunks])
+    raw_pc1 = np.concatenate([chunk.pc1 for chunk in raw_pc_chunks])
+    raw_pc2 = np.concatenate([chunk.pc2 for chunk in raw_pc_chunks])
+    normalization_factor = 1 / np.std(raw_pc1)
+    pc1 = np.multiply(raw_pc1, normalization_factor)
+    pc2 = np.multiply(raw_pc2, normalization_factor)
+    return pc.PCData(time, pc1, pc2)
+
+
+def iterate_raw_pcs_from_olr_chunks(olr_chunks: Iterable[olr.OLRData],
+                                    eofdata: eof.EOFDataForAllDOYs,
+                                    overlap: int = 365,
+                                    use_quick_temporal_filter=False,
+                                    dtype: np.dtype = np.float64) -> Iterator[pc.PCData]:
+    """
+    Computes the raw (not normalized) PCs for OLR data given in chunks and emits them chunk by chunk.
+
+    Each chunk is interpolated onto the spatial grid of the EOFs when it arrives. The temporal filter is then applied
+    to a window, which covers the days to emit together with ``overlap`` days before and after them (as far as
+    available), so that the filtered values are hardly affected by the edges of the window. Hence, the PCs for the
+    days of a chunk are emitted, as soon as ``overlap`` further days have arrived. The PCs of the remaining days are
+    emitted after the last chunk.
+
+    The results agree with those of :py:func:`calculate_pcs_from_olr` up to small deviations, which decrease with
+    increasing overlap. Since the temporal filter only retains periods of at most 96 days, an overlap of one year is
+    usually sufficient.
+
+    :param olr_chunks: The OLR data as an iterable of :class:`mjoindices.olr_handling.OLRData` objects, which cover
+        consecutive days and share the same spatial grid.
+    :param eofdata: The previously calculated DOY-dependent EOFs.
+    :param overlap: The number of days before and after the emitted days, which are included in the filter window.
+    :param use_quick_temporal_filter: See :py:func:`calculate_pcs_from_olr`.
+    :param dtype: See :py:func:`calculate_pcs_from_olr`.
+
+    :return: A generator of the raw PCs as :class:`mjoindices.principal_components.PCData`, one object for each
+        processed window.
+    """
+    if overlap < 0:
+        raise ValueError("overlap must not be negative.")
+    buffer_olr = np.empty((0, eofdata.lat.size, eofdata.long.size), dtype=dtype)
+    buffer_time = np.empty(0, dtype="datetime64[ns]")
+    # index of the first day in the buffer, for which the PCs have not been emitted yet
+    pending = 0
+    reference_chunk = None
+    for chunk in olr_chunks:
+        if chunk.time.size == 0:
+            continue
+        if reference_chunk is None:
+            reference_chunk = chunk
+        elif not (np.array_equal(chunk.lat, reference_chunk.lat) and np.array_equal(chunk.long, reference_chunk.long)):
+            raise ValueError("Spatial grid of OLR chunk starting on %s differs from that of the first chunk."
+                             % str(chunk.time[0]))
+        expected_times = chunk.time if buffer_time.size == 0 else np.concatenate((buffer_time[-1:], chunk.time))
+        if not np.all(np.diff(expected_times) == np.timedelta64(1, "D")):
+            raise ValueError("OLR chunk starting on %s does not consist of consecutive days or does not follow the "
+                             "previous chunk." % str(chunk.time[0]))
+
+        resampled_chunk = olr.interpolate_spatial_grid(chunk, eofdata.lat, eofdata.long, dtype=dtype)
+        buffer_olr = np.concatenate((buffer_olr, resampled_chunk.olr), axis=0)
+        buffer_time = np.concatenate((buffer_time, resampled_chunk.time))
+
+        stop = buffer_time.size - overlap
+        if stop > pending:
+            yield _calc_raw_pcs_for_buffer_range(buffer_olr, buffer_time, pending, stop, overlap, eofdata,
+                                                 use_quick_temporal_filter, dtype)
+            # keep only the days needed as left context for the next window
+            keep_start = max(0, stop - overlap)
+            buffer_olr = buffer_olr[keep_start:]
+            buffer_time = buffer_time[keep_start:]
+            pending = stop - keep_start
+
+    if pending < buffer_time.size:
+        yield _calc_raw_pcs_for_buffer_range(buffer_olr, buffer_time, pending, buffer_time.size, overlap, eofdata,
+                                             use_quick_temporal_filter, dtype)
+
+
+def _calc_raw_pcs_for_buffer_range(buffer_olr: np.ndarray, buffer_time: np.ndarray, start: int, stop: int,
+                                   overlap: int, eofdata: eof.EOFDataForAllDOYs, use_quick_temporal_filter: bool,
+                                   dtype: np.dtype) -> pc.PCData:
+    """
+    Filters the buffered OLR data around the days between start and stop and computes the raw PCs for these days.
+    """
+    window_start = max(0, start - overlap)
+    window_stop = min(buffer_time.size, stop + overlap)
+    window = olr.OLRData(buffer_olr[window_start:window_stop], buffer_time[window_start:window_stop],
+                         eofdata.lat, eofdata.long, copy_data=False)
+    if use_quick_temporal_filter:
+        filtered_window = qfilter.filter_olr_for_mjo_pc_calculation_1d_spectral_smoothing(window, dtype=dtype)
+    else:
+        filtered_window = wkfilter.filter_olr_for_mjo_pc_calculation(window, dtype=dtype)
+    inds = np.s_[start - window_start:stop - window_start]
+    filtered_days = olr.OLRData(filtered_window.get_olr_block(np.s_[inds, :, :]), filtered_window.time[inds],
+                                eofdata.lat, eofdata.long, copy_data=False)
+    return regress_3dim_data_onto_eofs(filtered_days, eofdata, dtype=dtype)
+
+
+def calculate_pcs_from_olr_for_multiple_eofs(olrdata: olr.OLRData,
+                                             eof_sets: Mapping[str, eof.EOFDataForAllDOYs],
+                                             period_start: np.datetime64,
+                                             period_end: np.datetime64,
+                                             use_quick_temporal_filter=False,
+                                             dtype: np.dtype = np.float64) -> Dict[str, pc.PCData]:
+    """
+    Computes the PCs of the same OLR data with respect to several sets of EOFs, e.g., to compare different
+    post-processing variants, training periods, or the original EOFs.
+
+    For each set of EOFs, the result is the same as that of :py:func:`calculate_pcs_from_olr` (up to rounding errors).
+    However, the restriction, interpolation, and temporal filtering of the OLR data is done only once. The filtered
+    data is projected onto all EOF sets together latitude by latitude (see ``fused_projection`` of
+    :py:func:`calculate_pcs_from_olr`).
+
+    :param olrdata: The OLR dataset. The spatial grid must fit to that of the EOFs.
+    :param eof_sets: The DOY-dependent EOFs as dictionary with arbitrary keys, e.g., names of the variants. All sets
+        must share the same spatial grid.
+    :param period_start: See :py:func:`calculate_pcs_from_olr`.
+    :param period_end: See :py:func:`calculate_pcs_from_olr`.
+    :param use_quick_temporal_filter: See :py:func:`calculate_pcs_from_olr`.
+    :param dtype: See :py:func:`calculate_pcs_from_olr`.
+
+    :return: Dictionary of the normalized PCs with the same keys as ``eof_sets``.
+    """
+    if len(eof_sets) == 0:
+        raise ValueError("No EOFs given.")
+    names = list(eof_sets.keys())
+    reference_eofs = eof_sets[names[0]]
+    for name in names[1:]:
+        if not (np.array_equal(eof_sets[name].lat, reference_eofs.lat)
+                and np.array_equal(eof_sets[name].long, reference_eofs.long)):
+            raise ValueError("Spatial grid of EOFs %s differs from that of EOFs %s." % (name, names[0]))
+
+    resticted_olr_data = olr.restrict_time_coverage(olrdata, period_start, period_end)
+    resampled_olr_data = olr.interpolate_spatial_grid(resticted_olr_data, reference_eofs.lat, reference_eofs.long,
+                                                      dtype=dtype)
+    if use_quick_temporal_filter:
+        filtered_latitudes = qfilter.filter_olr_for_mjo_pc_calculation_1d_spectral_smoothing_latitudewise(
+            resampled_olr_data, dtype=dtype)
+    else:
+        filtered_latitudes = wkfilter.filter_olr_for_mjo_pc_calculation_latitudewise(resampled_olr_data, dtype=dtype)
+    raw_pcs = _project_latitudes_onto_eof_sets(filtered_latitudes, resampled_olr_data.time,
+                                               [eof_sets[name] for name in names], dtype=dtype)
+
+    result = {}
+    for iset, name in enumerate(names):
+        normalization_factor = 1 / np.std(raw_pcs[:, iset, 0])
+        pc1 = np.multiply(raw_pcs[:, iset, 0], normalization_factor)
+        pc2 = np.multiply(raw_pcs[:, iset, 1], normalization_factor)
+        result[name] = pc.PCData(resampled_olr_data.time, pc1, pc2)
+    return result
+
+
+def calculate_pcs_from_olr_ensemble(members: Union[Sequence[olr.OLRData], np.ndarray],
+                                    eofdata: eof.EOFDataForAllDOYs,
+                                    time: np.ndarray = None,
+                                    lat: np.ndarray = None,
+                                    long: np.ndarray = None,
+                                    period_start: np.datetime64 = None,
+                                    period_end: np.datetime64 = None,
+                                    use_quick_temporal_filter=False,
+                                    normalization_factor: float = None,
+                                    dtype: np.dtype = np.float64,
+                                    max_workers: int = 1) -> List[pc.PCData]:
+    """
+    Computes the PCs for several ensemble members (e.g., of reforecasts or perturbed-physics runs), which share the
+    same time and spatial grids.
+
+    For each member, the result is the same as that of :py:func:`calculate_pcs_from_olr` (up to rounding errors).
+    However, the precomputations (DOYs, interpolation weights, filter masks, and the projection operators of the EOFs)
+    are done only once for all members. For the quick temporal filter, the data of all members and longitudes of one
+    latitude is filtered in one batched FFT. The filtered data is directly projected onto the EOFs latitude by latitude
+    (see ``fused_projection`` of :py:func:`calculate_pcs_from_olr`).
+
+    Memory usage: The members are read (and decoded, if packed) one after another and directly interpolated onto the
+    grid of the EOFs. Hence, besides the given members, the interpolated data of all members is kept in memory at once
+    (in the precision ``dtype``), which is needed for the batched filtering. If ``max_workers`` is larger than 1, the
+    members are additionally pickled group by group and sent to the worker processes, which temporarily duplicates their
+    OLR data (memory-mapped members are copied as well). Process the ensemble in several calls, if this does not fit into
+    memory.
+
+    :param members: The OLR data of the members, either as list of :class:`mjoindices.olr_handling.OLRData` objects
+        (which must have identical time and spatial grids) or as 4-dim array with the dimensions member, time,
+        latitude, and longitude. In the latter case, the grids have to be given by ``time``, ``lat``, and ``long``.
+    :param eofdata: The previously calculated DOY-dependent EOFs.
+    :param time: The time grid, if ``members`` is given as array.
+    :param lat: The latitude grid, if ``members`` is given as array.
+    :param long: The longitude grid, if ``members`` is given as array.
+    :param period_start: If given, only the data from this date on is used.
+    :param period_end: If given, only the data up to this date is used.
+    :param use_quick_temporal_filter: See :py:func:`calculate_pcs_from_olr`.
+    :param normalization_factor: If ``None``, the PCs of each member are normalized by the standard deviation of
+        their own PC1, like in :py:func:`calculate_pcs_from_olr`. Otherwise, the raw PCs of all members are multiplied
+        by the given factor, which is reasonable, e.g., for short forecasts.
+    :param dtype: See :py:func:`calculate_pcs_from_olr`.
+    :param max_workers: The number of processes, across which the members are distributed. If 1, all members are
+        processed in the current process.
+
+    :return: The PCs of the members as list (in the order of the members).
+
+    :raises: :py:class:`ValueError` if no OLR data is found for the specified period.
+    """
+    if isinstance(members, np.ndarray):
+        if time is None or lat is None or long is None:
+            raise ValueError("The time, latitude, and longitude grids have to be given for an ensemble array.")
+        if members.ndim != 4 or members.shape[1:] != (time.size, lat.size, long.size):
+            raise ValueError("The ensemble array must have the shape (number of members, time.size, lat.size, "
+                             "long.size).")
+    else:
+        if len(members) == 0:
+            raise ValueError("No ensemble members given.")
+        time, lat, long = members[0].time, members[0].lat, members[0].long
+        for member in members[1:]:
+            if not (np.array_equal(member.time, time) and np.array_equal(member.lat, lat)
+                    and np.array_equal(member.long, long)):
+                raise ValueError("All ensemble members must have the same time and spatial grids.")
+
+    time_inds = np.ones(time.size, dtype=bool)
+    if period_start is not None:
+        time_inds &= time >= period_start
+    if period_end is not None:
+        time_inds &= time <= period_end
+    if not np.any(time_inds):
+        raise ValueError("No OLR data within specified period found. Data covers the period from %s to %s."
+                         % (str(time[0]), str(time[-1])))
+    time_index = slice(None) if np.all(time_inds) else time_inds
+    time = time[time_inds]
+
+    no_members = len(members)
+    if max_workers == 1 or no_members == 1:
+        raw_pcs = _calc_raw_pcs_for_ensemble(members, time_index, time, lat, long, eofdata, use_quick_temporal_filter,
+                                             dtype)
+    else:
+        member_groups = [inds for inds in np.array_split(np.arange(no_members), max_workers) if inds.size > 0]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_calc_raw_pcs_for_ensemble,
+                                       members[inds] if isinstance(members, np.ndarray) else
+                                       [members[i] for i in inds],
+                                       time_index, time, lat, long, eofdata, use_quick_temporal_filter, dtype)
+                       for inds in member_groups]
+            raw_pcs = np.concatenate([future.result() for future in futures])
+
+    result = []
+    for member_raw_pcs in raw_pcs:
+        factor = 1 / np.std(member_raw_pcs[:, 0]) if normalization_factor is None else normalization_factor
+        pc1 = np.multiply(member_raw_pcs[:, 0], factor)
+        pc2 = np.multiply(member_raw_pcs[:, 1], factor)
+        result.append(pc.PCData(time, pc1, pc2))
+    return result
 
-def regress_3dim_data_onto_eofs(data: object, eofdata: eof.EOFDataForAllDOYs) -> pc.PCData:
+
+def _calc_raw_pcs_for_ensemble(members: Union[Sequence[olr.OLRData], np.ndarray], time_index: object,
+                               time: np.ndarray, lat: np.ndarray, long: np.ndarray, eofdata: eof.EOFDataForAllDOYs,
+                               use_quick_temporal_filter: bool, dtype: np.dtype) -> np.ndarray:
+    """
+    Computes the raw PCs of all members of an ensemble.
+
+    :param members: The members as list of :class:`mjoindices.olr_handling.OLRData` objects or as 4-dim array.
+    :param time_index: The index of the selected days along the time axis of the members.
+    :param time: The time grid of the selected days.
+
+    :return: The raw PCs as array with the dimensions member, time, and PC.
+    """
+    resampled_ensemble = np.empty((len(members), time.size, eofdata.lat.size, eofdata.long.size), dtype=dtype)
+    for imember, member in enumerate(members):
+        # only the selected days of one member are decoded at a time
+        if isinstance(member, olr.OLRData):
+            member_olr = member.get_olr_block(np.s_[time_index, :, :])
+        else:
+            member_olr = member[time_index]
+        # the interpolation weights are cached, so that they are computed only for the first member
+        resampled_ensemble[imember] = olr.interpolate_spatial_grid(
+            olr.OLRData(member_olr, time, lat, long, copy_data=False), eofdata.lat, eofdata.long, dtype=dtype).olr
+    if use_quick_temporal_filter:
+        filtered_latitudes = qfilter.filter_olr_ensemble_for_mjo_pc_calculation_1d_spectral_smoothing_latitudewise(
+            resampled_ensemble, time, dtype=dtype)
+    else:
+        filtered_latitudes = wkfilter.filter_olr_ensemble_for_mjo_pc_calculation_latitudewise(resampled_ensemble, time,
+                                                                                             dtype=dtype)
+    return _project_latitudes_onto_eofs(filtered_latitudes, time, eofdata, dtype=dtype)
+
+
+def regress_3dim_data_onto_eofs(data: object, eofdata: eof.EOFDataForAllDOYs,
+                                dtype: np.dtype = np.float64) -> pc.PCData:
     """
     Finds time-dependent coefficients w.r.t the DOY-dependent EOF basis for time-dependent spatially resolved data.
 
@@ -436,6 +1240,7 @@ def regress_3dim_data_onto_eofs(data: object, eofdata: eof.EOFDataForAllDOYs) ->
     :param data: The data used to compute the coefficients. Should be an object of class
         :class:`mjoindices.olr_handling.OLRData` or of similar structure.
     :param eofdata: The DOY-dependent pairs of EOFs, as computed by, e.g., :func:`calc_eofs_from_olr`
+    :param dtype: The floating point precision of the regression and of the resulting PCs.
 
     :return: The time-dependent PCs as :class:`mjoindices.principal_components.PCData`
     """
@@ -443,22 +1248,89 @@ def regress_3dim_data_onto_eofs(data: object, eofdata: eof.EOFDataForAllDOYs) ->
         raise ValueError("Latitude grid of EOFs and OLR is not equal.")
     if not np.all(data.long == eofdata.long):
         raise ValueError("Longitude grid of EOFs and OLR is not equal.")
-    pc1 = np.empty(data.time.size)
-    pc2 = np.empty(data.time.size)
+    pc1 = np.empty(data.time.size, dtype=dtype)
+    pc2 = np.empty(data.time.size, dtype=dtype)
 
     for idx, val in enumerate(data.time):
         day = val
         olr_singleday = data.get_olr_for_date(day)
         doy = tools.calc_day_of_year(day, eofdata.no_leap_years)
         (pc1_single, pc2_single) = regress_vector_onto_eofs(
-            eofdata.eofdata_for_doy(doy).reshape_to_vector(olr_singleday),
-            eofdata.eof1vector_for_doy(doy),
-            eofdata.eof2vector_for_doy(doy))
+            eofdata.eofdata_for_doy(doy).reshape_to_vector(olr_singleday).astype(dtype, copy=False),
+            eofdata.eof1vector_for_doy(doy).astype(dtype, copy=False),
+            eofdata.eof2vector_for_doy(doy).astype(dtype, copy=False))
         pc1[idx] = pc1_single
         pc2[idx] = pc2_single
     return pc.PCData(data.time, pc1, pc2)
 
 
+def _regress_latitudes_onto_eofs(filtered_latitudes: Iterable[Tuple[int, np.ndarray]], time: np.ndarray,
+                                 eofdata: eof.EOFDataForAllDOYs, dtype: np.dtype = np.float64) -> pc.PCData:
+    """
+    Computes the PCs from data given latitude by latitude, without assembling the complete data cube.
+
+    The PCs of each day are the least-squares coefficients with respect to the EOFs of the corresponding DOY, i.e.
+    the product of the pseudo-inverse of the EOF matrix with the data vector, which is also computed by
+    :py:func:`regress_vector_onto_eofs`. Since the product is a sum over all grid points, the contribution of each
+    latitude can be accumulated separately.
+
+    :param filtered_latitudes: Iterable of tuples of the latitude index and the data of this latitude (2-dim array with
+        the time as first and the longitude as second dimension).
+    :param time: The time grid of the data.
+    :param eofdata: The DOY-dependent EOFs.
+    :param dtype: The floating point precision of the regression and of the resulting PCs.
+
+    :return: The PCs.
+    """
+    pcs = _project_latitudes_onto_eofs(filtered_latitudes, time, eofdata, dtype=dtype)
+    return pc.PCData(time, pcs[:, 0], pcs[:, 1])
+
+
+def _project_latitudes_onto_eofs(filtered_latitudes: Iterable[Tuple[int, np.ndarray]], time: np.ndarray,
+                                 eofdata: eof.EOFDataForAllDOYs, dtype: np.dtype = np.float64) -> np.ndarray:
+    """
+    Accumulates the PCs from data given latitude by latitude as described for :py:func:`_regress_latitudes_onto_eofs`.
+
+    The data of each latitude may have further leading dimensions (e.g., ensemble members) before the time and
+    longitude dimensions, which are kept in the result.
+
+    :return: The PCs as array with the (optional) leading dimensions, the time, and the two PCs as last dimension.
+    """
+    return _project_latitudes_onto_eof_sets(filtered_latitudes, time, [eofdata], dtype=dtype)[..., 0, :]
+
+
+def _project_latitudes_onto_eof_sets(filtered_latitudes: Iterable[Tuple[int, np.ndarray]], time: np.ndarray,
+                                     eof_sets: Sequence[eof.EOFDataForAllDOYs],
+                                     dtype: np.dtype = np.float64) -> np.ndarray:
+    """
+    Accumulates the PCs with respect to several EOF sets on the same grid from data given latitude by latitude.
+
+    For each latitude, the projection operators of all EOF sets for the DOYs of all days are gathered into one array,
+    so that the data is projected onto all sets in one matrix product.
+
+    :return: The PCs as array with the (optional) leading dimensions of the data, the time, the EOF set, and the two
+        PCs as last dimension.
+    """
+    projection_operators = []
+    doy_inds = []
+    for eofdata in eof_sets:
+        eof_matrices = np.stack((eofdata.eof1vectors, eofdata.eof2vectors), axis=-1)
+        projection_operators.append(np.linalg.pinv(eof_matrices).astype(dtype, copy=False).reshape(
+            (eof_matrices.shape[0], 2, eofdata.lat.size, eofdata.long.size)))
+        doy_inds.append(tools.calc_day_of_year(time, eofdata.no_leap_years).astype(int) - 1)
+    pcs = None
+    for ilat, data_for_lat in filtered_latitudes:
+        # dimensions time, EOF set * 2, longitude
+        operators_for_lat = np.concatenate([operators[inds, :, ilat, :]
+                                            for operators, inds in zip(projection_operators, doy_inds)], axis=1)
+        contribution = np.einsum("...tl,tkl->...tk", data_for_lat, operators_for_lat)
+        if pcs is None:
+            pcs = contribution
+        else:
+            pcs += contribution
+    return pcs.reshape(pcs.shape[:-1] + (len(eof_sets), 2))
+
+
 def regress_vector_onto_eofs(vector: np.ndarray, eof1: np.ndarray, eof2: np.ndarray) -> Tuple[float, float]:
     """
     Helper method that finds the coefficients of the given vector with respect to the given basis of 2 EOFs.
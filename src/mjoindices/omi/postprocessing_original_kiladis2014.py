@@ -36,11 +36,11 @@ from pathlib import Path
 from typing import Tuple
 import os.path
 import inspect
+import functools
 
 import numpy as np
 import warnings
 import importlib
-import scipy.interpolate
 
 import mjoindices.empirical_orthogonal_functions as eof
 import mjoindices.olr_handling as olr
@@ -96,69 +96,108 @@ def correct_spontaneous_sign_changes_in_eof_series(eofs: eof.EOFDataForAllDOYs,
 
     :return: The EOFs with aligned signs.
     """
-    switched_eofs = []
+    eof1vectors = eofs.eof1vectors
+    eof2vectors = eofs.eof2vectors
     if doy1reference is True:
-        reference_path = Path(os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))) / "sign_reference"
-        reference_eofs = eof.load_original_eofs_for_doy(reference_path, 1)
-        if not reference_eofs.lat.size == eofs.lat.size \
-                or not reference_eofs.long.size == eofs.long.size \
-                or not np.all(reference_eofs.lat == eofs.lat) \
-                or not np.all(reference_eofs.long == eofs.long):
-            warnings.warn("References for the sign of the EOFs for DOY1 have to be interpolated to spatial grid of the"
-                          " target EOFs. Treat results with caution.")
-            f1 = scipy.interpolate.interp2d(reference_eofs.long, reference_eofs.lat, reference_eofs.eof1map,
-                                            kind='linear')
-            eof1map_interpol = f1(eofs.long, eofs.lat)
-            f2 = scipy.interpolate.interp2d(reference_eofs.long, reference_eofs.lat, reference_eofs.eof2map,
-                                            kind='linear')
-            eof2map_interpol = f2(eofs.long, eofs.lat)
-            reference_eofs = eof.EOFData(eofs.lat, eofs.long, eof1map_interpol, eof2map_interpol)
-        corrected_doy1 = _correct_spontaneous_sign_change_of_individual_eof(reference_eofs, eofs.eofdata_for_doy(1))
+        reference_eofs = _get_doy1_sign_reference(eofs.lat, eofs.long)
+        # the target is only switched if the signs are clearly different
+        doy1_signs = (-1 if _sign_relation(reference_eofs.eof1vector, eof1vectors[0, :]) == -1 else 1,
+                      -1 if _sign_relation(reference_eofs.eof2vector, eof2vectors[0, :]) == -1 else 1)
     else:
-        corrected_doy1 = eofs.eofdata_for_doy(1)
-    switched_eofs.append(corrected_doy1)
-    previous_eof = corrected_doy1
-    for doy in tools.doy_list(eofs.no_leap_years)[1:]:
-        corrected_eof = _correct_spontaneous_sign_change_of_individual_eof(previous_eof, eofs.eofdata_for_doy(doy))
-        switched_eofs.append(corrected_eof)
-        previous_eof = corrected_eof
-    return eof.EOFDataForAllDOYs(switched_eofs, eofs.no_leap_years)
+        doy1_signs = (1, 1)
+
+    switched_vectors = []
+    for vectors, doy1_sign in zip((eof1vectors, eof2vectors), doy1_signs):
+        # The sign relations between all consecutive DOYs are computed at once. Since the sign of each DOY is aligned
+        # with the already aligned previous DOY, the resulting sign factors are the cumulative products of these
+        # relations.
+        relations = _sign_relation(vectors[:-1, :], vectors[1:, :])
+        signs = np.empty(vectors.shape[0], dtype=vectors.dtype)
+        signs[0] = doy1_sign
+        for idx in range(1, signs.size):
+            if relations[idx - 1] == 0:
+                # undecided relation: the target is not switched
+                signs[idx] = 1
+            else:
+                signs[idx] = signs[idx - 1] * relations[idx - 1]
+        switched_vectors.append(signs[:, np.newaxis] * vectors)
+    return eof.EOFDataForAllDOYs.from_arrays(eofs.lat, eofs.long, switched_vectors[0], switched_vectors[1],
+                                             eofs.no_leap_years,
+                                             explained_variances=eofs.explained_variances,
+                                             eigenvalues=eofs.eigenvalues,
+                                             no_observations=eofs.no_observations)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_doy1_sign_reference() -> eof.EOFData:
+    """
+    Loads the EOFs of DOY 1 of the original calculation by :ref:`refKiladis2014`, which are distributed with this
+    package. The files are read only once per process.
+    """
+    reference_path = Path(os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))) / "sign_reference"
+    return eof.load_original_eofs_for_doy(reference_path, 1)
+
 
+@functools.lru_cache(maxsize=16)
+def _interpolate_doy1_sign_reference(lat: tuple, long: tuple) -> eof.EOFData:
+    """
+    Interpolates the reference EOFs of DOY 1 onto the given grid. The result is cached for each grid.
+    """
+    reference_eofs = _load_doy1_sign_reference()
+    lat = np.array(lat)
+    long = np.array(long)
+    eofmaps_interpol = tools.regrid_bilinear(np.array([reference_eofs.eof1map, reference_eofs.eof2map]),
+                                             reference_eofs.lat, reference_eofs.long, lat, long,
+                                             clamp_to_source_grid=True)
+    return eof.EOFData(lat, long, eofmaps_interpol[0], eofmaps_interpol[1])
 
 
-def _correct_spontaneous_sign_change_of_individual_eof(reference: eof.EOFData, target=eof.EOFData) -> eof.EOFData:
+def _get_doy1_sign_reference(lat: np.ndarray, long: np.ndarray) -> eof.EOFData:
     """
-    Switches the sign of a particular pair of EOFs (for a particular DOY) if necessary, so that is aligned with the
-    reference.
+    Returns the reference EOFs of DOY 1 on the given grid.
+    """
+    reference_eofs = _load_doy1_sign_reference()
+    if not reference_eofs.lat.size == lat.size \
+            or not reference_eofs.long.size == long.size \
+            or not np.all(reference_eofs.lat == lat) \
+            or not np.all(reference_eofs.long == long):
+        warnings.warn("References for the sign of the EOFs for DOY1 have to be interpolated to spatial grid of the"
+                      " target EOFs. Treat results with caution.")
+        reference_eofs = _interpolate_doy1_sign_reference(tuple(np.asarray(lat, dtype=float)),
+                                                          tuple(np.asarray(long, dtype=float)))
+    return reference_eofs
+
+
+def _sign_relation(reference: np.ndarray, target: np.ndarray) -> np.ndarray:
+    """
+    Determines whether the sign of target EOF vectors has to be switched to align them with reference vectors.
+
+    The sign is considered as different if the mean absolute value of the sum of both vectors is lower than the mean
+    absolute value of their difference.
 
     Note that the signs of the EOFs are not uniquely defined by the PCA. Hence, the sign may jump from one DOY to another,
     which can be improved using this function. As long as this step is performed before computing the PCs, it will not
     change the overall result.
 
-    :param reference: The reference-EOFs. This is usually the EOF pair of the previous DOY.
-    :param target: The EOFs of which the signs should be switched
+    :param reference: The reference vectors (1d or one vector per row).
+    :param target: The target vectors of the same shape.
 
-    :return: The target EOFs with aligned signs.
+    :return: -1 where the signs are different, 1 where they are equal, and 0 where both criteria are equal (the target
+        is not switched in this case).
     """
-    if (np.mean(np.abs(target.eof1vector + reference.eof1vector))
-            < np.mean(np.abs(
-                target.eof1vector - reference.eof1vector))):  # if abs(sum) is lower than abs(diff), than the signs are different...
-        eof1_switched = -1 * target.eof1vector
-    else:
-        eof1_switched = target.eof1vector
-    if (np.mean(np.abs(target.eof2vector + reference.eof2vector))
-            < np.mean(np.abs(
-                target.eof2vector - reference.eof2vector))):  # if abs(sum) is lower than abs(diff), than the signs are different...
-        eof2_switched = -1 * target.eof2vector
-    else:
-        eof2_switched = target.eof2vector
-    return eof.EOFData(target.lat,
-                       target.long,
-                       eof1_switched,
-                       eof2_switched,
-                       eigenvalues=target.eigenvalues,
-                       explained_variances=target.explained_variances,
-                       no_observations=target.no_observations)
+    reference_rows = reference.reshape(-1, reference.shape[-1])
+    target_rows = target.reshape(-1, target.shape[-1])
+    mean_abs_sum = np.empty(reference_rows.shape[0])
+    mean_abs_diff = np.empty(reference_rows.shape[0])
+    # blocks of a few vectors keep the temporary arrays small
+    block_length = 16
+    for start_idx in range(0, reference_rows.shape[0], block_length):
+        block = np.s_[start_idx:start_idx + block_length]
+        # if abs(sum) is lower than abs(diff), than the signs are different...
+        mean_abs_sum[block] = np.mean(np.abs(target_rows[block] + reference_rows[block]), axis=-1)
+        mean_abs_diff[block] = np.mean(np.abs(target_rows[block] - reference_rows[block]), axis=-1)
+    relation = np.where(mean_abs_sum < mean_abs_diff, -1, np.where(mean_abs_sum > mean_abs_diff, 1, 0))
+    return relation.reshape(reference.shape[:-1])
 
 
 def interpolate_eofs_between_doys(eofs: eof.EOFDataForAllDOYs, start_doy: int = 293,
@@ -186,31 +225,21 @@ def interpolate_eofs_between_doys(eofs: eof.EOFDataForAllDOYs, start_doy: int =
     doys = tools.doy_list(eofs.no_leap_years)
     start_idx = start_doy - 1
     end_idx = end_doy - 1
-    eof_len = eofs.lat.size * eofs.long.size
-    eofs1 = np.empty((doys.size, eof_len))
-    eofs2 = np.empty((doys.size, eof_len))
-    # Todo: Maybe this could be solved more efficiently
-    # by using internal numpy functions for multidimenasional operations
-    for (idx, doy) in enumerate(doys):
-        eofs1[idx, :] = eofs.eof1vector_for_doy(doy)
-        eofs2[idx, :] = eofs.eof2vector_for_doy(doy)
-
-    for i in range(0, eof_len):
-        eofs1[start_idx + 1:end_idx - 1, i] = np.interp(doys[start_idx + 1:end_idx - 1],
-                                                        [doys[start_idx], doys[end_idx]],
-                                                        [eofs1[start_idx, i], eofs1[end_idx, i]])
-        eofs2[start_idx + 1:end_idx - 1, i] = np.interp(doys[start_idx + 1:end_idx - 1],
-                                                        [doys[start_idx], doys[end_idx]],
-                                                        [eofs2[start_idx, i], eofs2[end_idx, i]])
-    interpolated_eofs = []
-    for (idx, doy) in enumerate(doys):
-        orig_eof = eofs.eofdata_for_doy(doy)
-        interpolated_eofs.append(eof.EOFData(orig_eof.lat, orig_eof.long, np.squeeze(eofs1[idx, :]),
-                                             np.squeeze(eofs2[idx, :]),
-                                             explained_variances=orig_eof.explained_variances,
-                                             eigenvalues=orig_eof.eigenvalues, no_observations=orig_eof.no_observations)
-                                 )
-    return eof.EOFDataForAllDOYs(interpolated_eofs, no_leap_years=eofs.no_leap_years)
+    eofs1 = np.array(eofs.eof1vectors, dtype=float)
+    eofs2 = np.array(eofs.eof2vectors, dtype=float)
+
+    # Linear interpolation of all grid points at once. The arithmetic is the same as that of np.interp, which was
+    # formerly applied to each grid point separately.
+    interp_doys = doys[start_idx + 1:end_idx - 1].astype(float)[:, np.newaxis]
+    doy_distance = float(doys[end_idx] - doys[start_idx])
+    for eofs_all in (eofs1, eofs2):
+        slope = (eofs_all[end_idx, :] - eofs_all[start_idx, :]) / doy_distance
+        eofs_all[start_idx + 1:end_idx - 1, :] = slope * (interp_doys - doys[start_idx]) + eofs_all[start_idx, :]
+
+    return eof.EOFDataForAllDOYs.from_arrays(eofs.lat, eofs.long, eofs1, eofs2, no_leap_years=eofs.no_leap_years,
+                                             explained_variances=eofs.explained_variances,
+                                             eigenvalues=eofs.eigenvalues,
+                                             no_observations=eofs.no_observations)
 
 
 
@@ -23,7 +23,6 @@ import importlib
 
 import mjoindices.empirical_orthogonal_functions as eof
 import mjoindices.omi.postprocessing_original_kiladis2014 as pp_kil2014
-import mjoindices.tools as tools
 
 
 def post_process_eofs_rotation(eofdata: eof.EOFDataForAllDOYs, sign_doy1reference: bool = True) -> eof.EOFDataForAllDOYs:
@@ -105,38 +104,47 @@ def calculate_angle_from_discontinuity(orig_eofs: eof.EOFDataForAllDOYs):
 
     """
 
-    list_of_doys = tools.doy_list(orig_eofs.no_leap_years)
-    doy1 = orig_eofs.eofdata_for_doy(1)
+    eof1vectors = orig_eofs.eof1vectors
+    eof2vectors = orig_eofs.eof2vectors
+    ndoys = eof1vectors.shape[0]
 
-    ndoys = len(list_of_doys)
-    
     # set DOY1 initialization
-    rots = np.array([doy1.eof1vector, doy1.eof2vector])
+    rots = np.array([eof1vectors[0, :], eof2vectors[0, :]])
 
     # project onto previous day
-    for d in list_of_doys:
-        if d+1 > ndoys: # for last day in cycle, return to January 1
-            doyn = orig_eofs.eofdata_for_doy(1)
-        else:
-            doyn = orig_eofs.eofdata_for_doy(d+1)
-
-        B = np.array([doyn.eof1vector, doyn.eof2vector]).T 
-        A = np.array([rots[0,:], rots[1,:]]).T
-    
-        rots = np.matmul(np.matmul(B, B.T),A).T
-    
+    for idx in range(1, ndoys + 1):
+        # for last day in cycle, return to January 1
+        basis = np.array([eof1vectors[idx % ndoys, :], eof2vectors[idx % ndoys, :]])
+        rots = _project_onto_basis(rots, basis)
+
     # calculate discontinuity between Jan 1 and Jan 1 at end of rotation cycle
-    discont = angle_btwn_vectors(doy1.eof1vector, rots[0,:])
+    discont = angle_btwn_vectors(eof1vectors[0, :], rots[0, :])
 
     # determine whether to rotate clockwise or counterclockwise, based on angle of E1 from projected
     # E2 and angle of E2 from projected E1
-    cross_angle = np.dot(doy1.eof1vector, rots[1,:])/(np.linalg.norm(doy1.eof1vector)*np.linalg.norm(rots[1,:]))
+    cross_angle = np.dot(eof1vectors[0, :], rots[1, :]) / (np.linalg.norm(eof1vectors[0, :]) * np.linalg.norm(rots[1, :]))
     if cross_angle <= 0:
         return -discont/ndoys
     else: 
         return discont/ndoys
 
 
+def _project_onto_basis(vectors: np.ndarray, basis: np.ndarray) -> np.ndarray:
+    """
+    Projects vectors onto the space spanned by an orthonormal basis.
+
+    The result corresponds to :math:`(B B^T A)^T` with the vectors :math:`A` and the basis :math:`B` as columns,
+    but the evaluation order :math:`(A^T B) B^T` avoids the construction of the large projection matrix
+    :math:`B B^T` (M x M for vectors of length M).
+
+    :param vectors: The vectors as rows (2 x M).
+    :param basis: The orthonormal basis vectors as rows (2 x M).
+
+    :return: The projected vectors as rows (2 x M).
+    """
+    return np.matmul(np.matmul(vectors, basis.T), basis)
+
+
 def rotate_each_eof_by_delta(orig_eofs: eof.EOFDataForAllDOYs, delta: float) -> eof.EOFDataForAllDOYs:
     """
     Use delta calculated by optimization function to rotate original EOFs by delta.
@@ -153,33 +161,32 @@ def rotate_each_eof_by_delta(orig_eofs: eof.EOFDataForAllDOYs, delta: float) ->
 
     R = rotation_matrix(delta)
 
-    doy1 = orig_eofs.eofdata_for_doy(1)   
-    list_of_doys = tools.doy_list(orig_eofs.no_leap_years)
-    
-    eofdata_rotated = []
-    eofdata_rotated.append(doy1) # first doy is unchanged
+    eof1vectors = orig_eofs.eof1vectors
+    eof2vectors = orig_eofs.eof2vectors
+
+    eofs1_rotated = np.empty(eof1vectors.shape)
+    eofs2_rotated = np.empty(eof2vectors.shape)
+    # first doy is unchanged
+    eofs1_rotated[0, :] = eof1vectors[0, :]
+    eofs2_rotated[0, :] = eof2vectors[0, :]
 
     # set DOY1 initialization
-    rots = np.array([doy1.eof1vector, doy1.eof2vector])
+    rots = np.array([eof1vectors[0, :], eof2vectors[0, :]])
 
     # project onto previous day and rotate 
-    for d in list_of_doys[1:]:
-        doyn = orig_eofs.eofdata_for_doy(d)
-
-        B = np.array([doyn.eof1vector, doyn.eof2vector]).T 
-        A = np.array([rots[0,:], rots[1,:]]).T
-    
-        rots = np.matmul(np.matmul(np.matmul(B, B.T),A),R).T
+    for idx in range(1, eof1vectors.shape[0]):
+        basis = np.array([eof1vectors[idx, :], eof2vectors[idx, :]])
+        # the rotation of the column vectors from the right by R corresponds to R^T applied from the left to the rows
+        rots = np.matmul(R.T, _project_onto_basis(rots, basis))
 
-        # create new EOFData variable for rotated EOFs
-        eofdata_rotated.append(eof.EOFData(doyn.lat, doyn.long, 
-                                np.squeeze(rots[0,:]), 
-                                np.squeeze(rots[1,:]),
-                                explained_variances=doyn.explained_variances,
-                                eigenvalues=doyn.eigenvalues,
-                                no_observations=doyn.no_observations))
+        eofs1_rotated[idx, :] = rots[0, :]
+        eofs2_rotated[idx, :] = rots[1, :]
 
-    return eof.EOFDataForAllDOYs(eofdata_rotated, orig_eofs.no_leap_years)
+    return eof.EOFDataForAllDOYs.from_arrays(orig_eofs.lat, orig_eofs.long, eofs1_rotated, eofs2_rotated,
+                                             orig_eofs.no_leap_years,
+                                             explained_variances=orig_eofs.explained_variances,
+                                             eigenvalues=orig_eofs.eigenvalues,
+                                             no_observations=orig_eofs.no_observations)
 
 
 def normalize_eofs(orig_eofs: eof.EOFDataForAllDOYs) -> eof.EOFDataForAllDOYs:
@@ -191,25 +198,16 @@ def normalize_eofs(orig_eofs: eof.EOFDataForAllDOYs) -> eof.EOFDataForAllDOYs:
     :return: normalized EOFdata for all days.
     """
 
-    list_of_doys = tools.doy_list(orig_eofs.no_leap_years)
+    eof1vectors = orig_eofs.eof1vectors
+    eof2vectors = orig_eofs.eof2vectors
+    eofs1_normalized = eof1vectors / np.linalg.norm(eof1vectors, axis=1, keepdims=True)
+    eofs2_normalized = eof2vectors / np.linalg.norm(eof2vectors, axis=1, keepdims=True)
 
-    eofdata_normalized = []
-
-    for d in list_of_doys:
-
-        doyn = orig_eofs.eofdata_for_doy(d)
-        eof1_norm = doyn.eof1vector/np.linalg.norm(doyn.eof1vector)
-        eof2_norm = doyn.eof2vector/np.linalg.norm(doyn.eof2vector) 
-
-       # create new EOFData variable for rotated EOFs
-        eofdata_normalized.append(eof.EOFData(doyn.lat, doyn.long, 
-                                            np.squeeze(eof1_norm), 
-                                            np.squeeze(eof2_norm),
-                                            explained_variances=doyn.explained_variances,
-                                            eigenvalues=doyn.eigenvalues,
-                                            no_observations=doyn.no_observations)) 
-
-    return eof.EOFDataForAllDOYs(eofdata_normalized, orig_eofs.no_leap_years) 
+    return eof.EOFDataForAllDOYs.from_arrays(orig_eofs.lat, orig_eofs.long, eofs1_normalized, eofs2_normalized,
+                                             orig_eofs.no_leap_years,
+                                             explained_variances=orig_eofs.explained_variances,
+                                             eigenvalues=orig_eofs.eigenvalues,
+                                             no_observations=orig_eofs.no_observations)
 
 
 def angle_between_eofs(reference: eof.EOFData, target=eof.EOFData):
@@ -232,11 +230,15 @@ def angle_btwn_vectors(vector1, vector2):
     """
     Calculates the angle between vectors, :math:`theta = arccos(t . r / (||r||*||t||))`.
 
+    Both arguments may also be 2d arrays, which contain one vector per row (e.g., the EOF1 vectors of all DOYs, as
+    returned by :py:attr:`~mjoindices.empirical_orthogonal_functions.EOFDataForAllDOYs.eof1vectors`). In this case,
+    the angles are calculated row by row.
+
     :param vector1: 1d vector, generally corresponding to EOF1 or 2 from some DOY
     :param vector2: 1d vector, generally corresponding to EOF1 or 2 from a different DOY
 
-    :return: scalar angle between vectors 1 and 2, in radians. 
+    :return: scalar angle between vectors 1 and 2, in radians (or 1d array of angles for 2d arguments).
     """
 
-    return np.arccos(np.clip(np.dot(vector1, vector2)
-                             /(np.linalg.norm(vector1)*np.linalg.norm(vector2)),-1.,1.))
+    return np.arccos(np.clip(np.einsum("...i,...i->...", vector1, vector2)
+                             /(np.linalg.norm(vector1, axis=-1)*np.linalg.norm(vector2, axis=-1)),-1.,1.))
@@ -30,6 +30,8 @@ Hence, there is usually no need for the users of the mjoindices package to call
 Instead, they probably want to use the module :py:mod:`mjoindices.omi.omi_calculator` directly.
 """
 
+import typing
+
 import numpy as np
 import scipy
 import scipy.fftpack
@@ -37,55 +39,116 @@ import scipy.fftpack
 import mjoindices.olr_handling as olr
 
 
-def filter_olr_for_mjo_pc_calculation_1d_spectral_smoothing(olrdata: olr.OLRData) -> olr.OLRData:
+def filter_olr_for_mjo_pc_calculation_1d_spectral_smoothing(olrdata: olr.OLRData,
+                                                            dtype: np.dtype = np.float64) -> olr.OLRData:
     """
     Filters OLR data temporally using a 1d Fourier transform filter.
 
     The temporal filtering constants are chosen to meet the values in the description by :ref:`refKiladis2014`.
 
     :param olrdata: The original OLR data
+    :param dtype: The floating point precision of the filtering. See :py:func:`filter_olr_temporally_1d_spectral_smoothing`.
 
     :return: The filtered OLR.
     """
-    return filter_olr_temporally_1d_spectral_smoothing(olrdata, 20., 96.)
+    return filter_olr_temporally_1d_spectral_smoothing(olrdata, 20., 96., dtype=dtype)
+
+
+def filter_olr_for_mjo_pc_calculation_1d_spectral_smoothing_latitudewise(
+        olrdata: olr.OLRData, dtype: np.dtype = np.float64) -> typing.Iterator[typing.Tuple[int, np.ndarray]]:
+    """
+    Filters OLR data like :py:func:`filter_olr_for_mjo_pc_calculation_1d_spectral_smoothing`, but emits the filtered
+    data latitude by latitude instead of returning the complete filtered data cube.
 
+    :param olrdata: The original OLR data
+    :param dtype: The floating point precision of the filtering. See :py:func:`filter_olr_temporally_1d_spectral_smoothing`.
 
-def filter_olr_temporally_1d_spectral_smoothing(olrdata: olr.OLRData, period_min: float, period_max: float) -> olr.OLRData:
+    :return: A generator of tuples of the latitude index and the filtered OLR data for this latitude (2-dim array with
+        the time as first and the longitude as second dimension).
+    """
+    return _filter_latitudes_1d_spectral_smoothing(olrdata, 20., 96., dtype=dtype)
+
+
+def filter_olr_ensemble_for_mjo_pc_calculation_1d_spectral_smoothing_latitudewise(
+        olr_ensemble: np.ndarray, time: np.ndarray,
+        dtype: np.dtype = np.float64) -> typing.Iterator[typing.Tuple[int, np.ndarray]]:
+    """
+    Filters the OLR data of several ensemble members like
+    :py:func:`filter_olr_for_mjo_pc_calculation_1d_spectral_smoothing` and emits the filtered data latitude by latitude.
+
+    For each latitude, the time series of all members and longitudes are transformed together in one batched FFT.
+
+    :param olr_ensemble: The OLR data of all members as 4-dim array with the dimensions member, time, latitude, and
+        longitude.
+    :param time: The time grid of the data.
+    :param dtype: The floating point precision of the filtering. See :py:func:`filter_olr_temporally_1d_spectral_smoothing`.
+
+    :return: A generator of tuples of the latitude index and the filtered OLR data of all members for this latitude
+        (3-dim array with the dimensions member, time, and longitude).
+    """
+    time_spacing = (time[1] - time[0]).astype('timedelta64[s]') / np.timedelta64(1, 'D')  # time spacing in days
+    for idx_lat in range(0, olr_ensemble.shape[2]):
+        # dimensions member, longitude, time, so that the time is the last (contiguous) axis
+        olr_for_lat = np.ascontiguousarray(np.swapaxes(olr_ensemble[:, :, idx_lat, :], 1, 2), dtype=dtype)
+        filtered_for_lat = _perform_spectral_smoothing(olr_for_lat, time_spacing, 20., 96.)
+        yield idx_lat, np.swapaxes(filtered_for_lat, 1, 2).astype(dtype, copy=False)
+
+
+def filter_olr_temporally_1d_spectral_smoothing(olrdata: olr.OLRData, period_min: float, period_max: float,
+                                                dtype: np.dtype = np.float64) -> olr.OLRData:
     """
     Filters OLR data temporally using a 1d Fourier transform filter.
 
     :param olrdata: The original OLR data
     :param period_min: Temporal filter constant: Only greater periods (in days) remain in the data.
     :param period_max: Temporal filter constant: Only lower periods (in days) remain in the data.
+    :param dtype: The floating point precision of the filtering and of the returned data, either ``np.float64``
+        (default) or ``np.float32``.
 
     :return: The filtered OLR.
     """
-    filteredOLR = np.empty(olrdata.olr.shape)
-    time_spacing = (olrdata.time[1] - olrdata.time[0]).astype('timedelta64[s]') / np.timedelta64(1, 'D')  # time spacing in days
-    for idx_lat in range(0, olrdata.olr.shape[1]):
-        for idx_lon in range(0, olrdata.olr.shape[2]):
-            tempolr = np.squeeze(olrdata.olr[:, idx_lat, idx_lon])
-            filteredOLR[:, idx_lat, idx_lon] = _perform_spectral_smoothing(tempolr, time_spacing, period_min, period_max)
+    filteredOLR = np.empty((olrdata.time.size, olrdata.lat.size, olrdata.long.size), dtype=dtype)
+    for idx_lat, filtered_for_lat in _filter_latitudes_1d_spectral_smoothing(olrdata, period_min, period_max,
+                                                                             dtype=dtype):
+        filteredOLR[:, idx_lat, :] = filtered_for_lat
     return olr.OLRData(filteredOLR, olrdata.time, olrdata.lat, olrdata.long)
 
 
+def _filter_latitudes_1d_spectral_smoothing(olrdata: olr.OLRData, period_min: float, period_max: float,
+                                            dtype: np.dtype = np.float64
+                                            ) -> typing.Iterator[typing.Tuple[int, np.ndarray]]:
+    """
+    Performs the filtering of :py:func:`filter_olr_temporally_1d_spectral_smoothing` for one latitude after another
+    and emits the latitude index together with the filtered data of this latitude.
+    """
+    time_spacing = (olrdata.time[1] - olrdata.time[0]).astype('timedelta64[s]') / np.timedelta64(1, 'D')  # time spacing in days
+    for idx_lat in range(0, olrdata.lat.size):
+        # decode packed data only for one latitude at a time
+        olr_for_lat = olrdata.get_olr_block(np.s_[:, idx_lat, :]).astype(dtype, copy=False)
+        # all longitudes are transformed at once, with the time as last (contiguous) axis
+        filtered_for_lat = _perform_spectral_smoothing(np.ascontiguousarray(olr_for_lat.T), time_spacing, period_min,
+                                                       period_max)
+        yield idx_lat, filtered_for_lat.T.astype(dtype, copy=False)
+
+
 def _perform_spectral_smoothing(y, dt, lower_cutoff, higher_cutoff):
     """
     Applies a 1d Fourier Transform filter to the vector y.
 
-    :param y: The data to filter
+    :param y: The data to filter. If y has more than one dimension, each vector along the last axis is filtered
+        separately.
     :param dt: The spacing of the data
     :param lower_cutoff: Filter constant: Only greater periods (same units as dt) remain in the data.
     :param higher_cutoff: Filter constant: Only lower periods (same units as dt) remain in the data.
 
     :return: The filtered vector
     """
-    N = y.size
+    N = y.shape[-1]
     w = scipy.fftpack.rfft(y)
     f = scipy.fftpack.rfftfreq(N, dt)
     P = 1 / f
     w2 = w.copy()
-    w2[P < lower_cutoff] = 0
-    w2[P > higher_cutoff] = 0
+    w2[..., P < lower_cutoff] = 0
+    w2[..., P > higher_cutoff] = 0
     y2 = scipy.fftpack.irfft(w2)
     return y2
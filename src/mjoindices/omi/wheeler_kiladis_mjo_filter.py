@@ -31,12 +31,16 @@ Instead, they probably want to use the module :py:mod:`mjoindices.omi.omi_calcul
 The complete algorithm is described by :ref:`refKiladis2014`
 """
 
+import functools
+import typing
+
 import matplotlib.pyplot as plt
 import numpy as np
+import scipy.fft
 import mjoindices.olr_handling as olr
 
 
-def filter_olr_for_mjo_pc_calculation(olrdata: olr.OLRData, do_plot: bool = False):
+def filter_olr_for_mjo_pc_calculation(olrdata: olr.OLRData, do_plot: bool = False, dtype: np.dtype = np.float64):
     """
     Filters OLR data temporally with a bandwidth particularly selected for the PC calculation.
 
@@ -46,14 +50,67 @@ def filter_olr_for_mjo_pc_calculation(olrdata: olr.OLRData, do_plot: bool = Fals
 
     :param olrdata: The original OLR data.
     :param do_plot: If ``True``, diagnosis plots will be generated.
+    :param dtype: The floating point precision of the filtering. See :py:func:`filter_olr_temporally_and_longitudinally`.
 
     :return: The filtered OLR.
     """
-    return filter_olr_temporally(olrdata, 20., 96., do_plot=do_plot)
+    return filter_olr_temporally(olrdata, 20., 96., do_plot=do_plot, dtype=dtype)
+
+
+def filter_olr_for_mjo_pc_calculation_latitudewise(olrdata: olr.OLRData, dtype: np.dtype = np.float64
+                                                   ) -> typing.Iterator[typing.Tuple[int, np.ndarray]]:
+    """
+    Filters OLR data like :py:func:`filter_olr_for_mjo_pc_calculation`, but emits the filtered data latitude by
+    latitude instead of returning the complete filtered data cube.
+
+    Since the filter works on each latitude independently, only the filtered data of one latitude has to be held in
+    memory at a time, if the caller processes and discards the emitted data immediately.
+
+    :param olrdata: The original OLR data.
+    :param dtype: The floating point precision of the filtering. See :py:func:`filter_olr_temporally_and_longitudinally`.
+
+    :return: A generator of tuples of the latitude index and the filtered OLR data for this latitude (2-dim array with
+        the time as first and the longitude as second dimension).
+    """
+    print("Smooth data temporally and longitudinally...")
+    return _filter_latitudes_temporally_and_longitudinally(olrdata, 20., 96., -720., 720, do_plot=False, dtype=dtype)
+
+
+def filter_olr_ensemble_for_mjo_pc_calculation_latitudewise(olr_ensemble: np.ndarray, time: np.ndarray,
+                                                            dtype: np.dtype = np.float64
+                                                            ) -> typing.Iterator[typing.Tuple[int, np.ndarray]]:
+    """
+    Filters the OLR data of several ensemble members like :py:func:`filter_olr_for_mjo_pc_calculation` and emits the
+    filtered data latitude by latitude.
+
+    The filter mask of the Fourier spectrum is computed only once and shared by all members and latitudes. The members
+    are transformed one after another, since the zero-padded spectrum of a single member and latitude already requires
+    several hundred megabytes for typical longitude grids.
+
+    :param olr_ensemble: The OLR data of all members as 4-dim array with the dimensions member, time, latitude, and
+        longitude.
+    :param time: The time grid of the data.
+    :param dtype: The floating point precision of the filtering. See :py:func:`filter_olr_temporally_and_longitudinally`.
+
+    :return: A generator of tuples of the latitude index and the filtered OLR data of all members for this latitude
+        (3-dim array with the dimensions member, time, and longitude).
+    """
+    print("Smooth data of ensemble temporally and longitudinally...")
+    time_spacing = (time[1] - time[0]).astype('timedelta64[s]') / np.timedelta64(1, 'D')  # time spacing in days
+    no_members, no_times, no_lats, no_longs = olr_ensemble.shape
+    for ilat in range(0, no_lats):
+        filtered_data = np.empty((no_members, no_times, no_longs), dtype=dtype)
+        for imember in range(0, no_members):
+            # The filter works in place on the slice, hence a copy is used, so that the input data is not modified.
+            dataslice = np.array(olr_ensemble[imember, :, ilat, :], dtype=dtype)
+            filtered_data[imember, :, :] = WKFilter().perform_2dim_spectral_filtering(dataslice, time_spacing, 20., 96.,
+                                                                                      -720., 720, dtype=dtype)
+        yield ilat, filtered_data
 
 
 # Implicitly tested for special conditions with specific caller functions
-def filter_olr_temporally(olrdata: olr.OLRData, period_min: float, period_max: float, do_plot: bool = False):
+def filter_olr_temporally(olrdata: olr.OLRData, period_min: float, period_max: float, do_plot: bool = False,
+                          dtype: np.dtype = np.float64):
     """
     Filters OLR data temporally.
 
@@ -67,13 +124,16 @@ def filter_olr_temporally(olrdata: olr.OLRData, period_min: float, period_max: f
     :param period_min: Temporal filter constant: Only greater periods (in days) remain in the data.
     :param period_max: Temporal filter constant: Only lower periods (in days) remain in the data.
     :param do_plot: If ``True``, diagnosis plots will be generated.
+    :param dtype: The floating point precision of the filtering. See :py:func:`filter_olr_temporally_and_longitudinally`.
 
     :return: The filtered OLR.
     """
-    return filter_olr_temporally_and_longitudinally(olrdata, period_min, period_max, -720., 720, do_plot=do_plot)
+    return filter_olr_temporally_and_longitudinally(olrdata, period_min, period_max, -720., 720, do_plot=do_plot,
+                                                    dtype=dtype)
 
 
-def filter_olr_for_mjo_eof_calculation(olrdata: olr.OLRData, do_plot: bool = False) -> olr.OLRData:
+def filter_olr_for_mjo_eof_calculation(olrdata: olr.OLRData, do_plot: bool = False,
+                                       dtype: np.dtype = np.float64) -> olr.OLRData:
     """
     Filters OLR data temporally and longitudinally with a bandwidth particularly selected for the EOF calculation.
 
@@ -81,10 +141,11 @@ def filter_olr_for_mjo_eof_calculation(olrdata: olr.OLRData, do_plot: bool = Fal
 
     :param olrdata: The original OLR data
     :param do_plot: If ``True``, diagnosis plots will be generated.
+    :param dtype: The floating point precision of the filtering. See :py:func:`filter_olr_temporally_and_longitudinally`.
 
     :return: The filtered OLR data.
     """
-    return filter_olr_temporally_and_longitudinally(olrdata, 30., 96., 0., 720, do_plot=do_plot)
+    return filter_olr_temporally_and_longitudinally(olrdata, 30., 96., 0., 720, do_plot=do_plot, dtype=dtype)
 
 
 # Implicitly tested for special conditions with specific caller functions
@@ -93,7 +154,8 @@ def filter_olr_temporally_and_longitudinally(olrdata: olr.OLRData,
                                              period_max: float,
                                              wn_min: float,
                                              wn_max: float,
-                                             do_plot: bool=False) -> olr.OLRData:
+                                             do_plot: bool=False,
+                                             dtype: np.dtype = np.float64) -> olr.OLRData:
     """
     Performs a temporal and longitudinal bandpass filtering of the OLR data with configurable filtering thresholds.
 
@@ -105,22 +167,43 @@ def filter_olr_temporally_and_longitudinally(olrdata: olr.OLRData,
     :param wn_min: Longitudinal filter constant: Only greater wave numbers (in cycles per globe) remain in the data.
     :param wn_max:  Longitudinal filter constant: Only lower wave numbers (in cycles per globe) remain in the data.
     :param do_plot: If ``True``, diagnosis plots will be generated.
+    :param dtype: The floating point precision of the filtering and of the returned data, either ``np.float64``
+        (default) or ``np.float32``. With ``np.float32``, the zero-padded data and the Fourier spectra need only half
+        of the memory and the FFTs are faster. For OLR data, the filtered values deviate from the float64 results by
+        less than about 1e-3 W/m^2, which is one order of magnitude below the resolution of the NOAA OLR data.
 
     :return: The filtered OLR.
     """
     print("Smooth data temporally and longitudinally...")
-    filtered_olr = np.empty(olrdata.olr.shape)
+    filtered_olr = np.empty((olrdata.time.size, olrdata.lat.size, olrdata.long.size), dtype=dtype)
 
+    for ilat, filtered_data in _filter_latitudes_temporally_and_longitudinally(olrdata, period_min, period_max,
+                                                                               wn_min, wn_max, do_plot=do_plot,
+                                                                               dtype=dtype):
+        filtered_olr[:, ilat, :] = filtered_data
+
+    return olr.OLRData(filtered_olr, olrdata.time, olrdata.lat, olrdata.long)
+
+
+def _filter_latitudes_temporally_and_longitudinally(olrdata: olr.OLRData, period_min: float, period_max: float,
+                                                    wn_min: float, wn_max: float, do_plot: bool = False,
+                                                    dtype: np.dtype = np.float64
+                                                    ) -> typing.Iterator[typing.Tuple[int, np.ndarray]]:
+    """
+    Performs the filtering of :py:func:`filter_olr_temporally_and_longitudinally` for one latitude after another and
+    emits the latitude index together with the filtered data of this latitude.
+    """
     for ilat, lat in enumerate(olrdata.lat):
         print("Filtering for latitude: ", lat)
         time_spacing = (olrdata.time[1] - olrdata.time[0]).astype('timedelta64[s]') / np.timedelta64(1, 'D')  # time spacing in days
-        dataslice = np.squeeze(olrdata.olr[:, ilat, :])
+        # for packed data, only the slice of this latitude is decoded
+        # The filter works in place on the slice, hence a copy is used, so that the input data is not modified.
+        dataslice = np.array(np.squeeze(olrdata.get_olr_block(np.s_[:, ilat, :])), dtype=dtype)
         wkfilter = WKFilter()
         filtered_data = wkfilter.perform_2dim_spectral_filtering(dataslice, time_spacing, period_min, period_max, wn_min,
-                                                                 wn_max, do_plot=do_plot, save_debug=False)
-        filtered_olr[:, ilat, :] = filtered_data
-
-    return olr.OLRData(filtered_olr, olrdata.time, olrdata.lat, olrdata.long)
+                                                                 wn_max, do_plot=do_plot, save_debug=False,
+                                                                 dtype=dtype)
+        yield ilat, filtered_data
 
 
 def detrend_vector(data: np.ndarray) -> np.ndarray:
@@ -162,6 +245,107 @@ def taper_vector_to_zero(data: np.ndarray, window_length: int) -> np.ndarray:
     return result
 
 
+@functools.lru_cache(maxsize=4)
+def _kiladis_frequency_axis(nt: int, dataperday: float) -> np.ndarray:
+    """
+    Calculates the frequency grid of the reordered spectrum in accordance with the Kiladis code.
+
+    The result is cached and read-only, since it only depends on the number of (zero-padded) time steps and the
+    temporal resolution.
+    """
+    inds = np.arange(0, nt)
+    freq_axis = np.where(inds <= nt / 2, inds * dataperday / nt, -1 * (nt - inds) * dataperday / nt)
+    # the following code based on scipy function produces qualitatively the same grid.
+    # However, numerical differences seem to have larger effect for the filtering step.
+    # freq_axis = np.fft.fftfreq(nt, d=time_spacing)
+    # freq_axis = np.fft.fftshift(freq_axis)
+    # freq_axis = np.roll(freq_axis, int(nt/2))
+    freq_axis.flags.writeable = False
+    return freq_axis
+
+
+@functools.lru_cache(maxsize=4)
+def _kiladis_wavenumber_axis(nl: int) -> np.ndarray:
+    """
+    Calculates the wavenumber grid of the reordered spectrum in accordance with the Kiladis code.
+
+    Note: to have this consistent with the time-dimension, one could write wn_axis[i_wn]= -1*i_wn*dataperglobe/nl
+    However, since data is required to cover always one globe nl will always be equal to dataperglobe.
+    The sign is not consistent with the time dimension, which is for reasons of consistency with the original Kiladis
+    implementation.
+    """
+    inds = np.arange(0, nl)
+    wn_axis = np.where(inds <= nl / 2, -1 * inds, nl - inds).astype(float)
+    # the following code based on scipy function produces qualitatively the same grid.
+    # However, numerical differences seem to have larger effect for the filtering step.
+    # wn_axis = np.fft.fftfreq(nl, d=dy)
+    # wn_axis = np.fft.fftshift(wn_axis)  #identical with  wn_axis=np.arange(-int(nlong/2), int(nlong/2),1.)
+    # wn_axis = -1 *wn_axis
+    # wn_axis = np.roll(wn_axis, int(nl/2))
+    wn_axis.flags.writeable = False
+    return wn_axis
+
+
+def _reorder_spectrum_to_kiladis(spectrum: np.ndarray) -> np.ndarray:
+    """
+    Reorders a 2-dim Fourier spectrum from the numpy ordering to the ordering of the original Kiladis code.
+    """
+    nt, nl = spectrum.shape
+    spectrum = np.fft.fftshift(spectrum, axes=(0, 1))
+    spectrum = np.roll(spectrum, int(nt / 2), axis=0)
+    return np.roll(spectrum, int(nl / 2), axis=1)
+
+
+def _reorder_spectrum_from_kiladis(spectrum: np.ndarray) -> np.ndarray:
+    """
+    Reorders a 2-dim Fourier spectrum from the ordering of the original Kiladis code back to the numpy ordering.
+    """
+    nt, nl = spectrum.shape
+    spectrum = np.roll(spectrum, -int(nt / 2), axis=0)
+    spectrum = np.roll(spectrum, -int(nl / 2), axis=1)
+    return np.fft.ifftshift(spectrum, axes=(0, 1))
+
+
+@functools.lru_cache(maxsize=4)
+def _spectral_filter_removal_mask(nt: int, nl: int, dataperday: float, freq_min: float, freq_max: float,
+                                  wn_min: float, wn_max: float) -> typing.Tuple[np.ndarray, int]:
+    """
+    Determines the elements of the Fourier spectrum, which are removed by the filter.
+
+    The filter condition is evaluated on the reordered spectrum like in the original Kiladis code for the non-negative
+    frequencies. Elements, which do not fulfill the condition, are removed together with their mirrored elements of the
+    negative frequencies. The mask is cached and read-only, since it only depends on the shape of the spectrum and the
+    filter constants.
+
+    :return: Tuple of the boolean mask in the numpy ordering of the spectrum (``True`` for removed elements) and the
+        number of retained elements with non-negative frequencies.
+    """
+    # ## name filter boundaries like in Kiladis Fortran Code
+    f1 = freq_min
+    f2 = freq_min
+    f3 = freq_max
+    f4 = freq_max
+    s1 = wn_min
+    s2 = wn_max
+    s3 = wn_min
+    s4 = wn_max
+
+    no_nonnegative_freqs = int(nt / 2) + 1
+    ff = _kiladis_frequency_axis(nt, dataperday)[:no_nonnegative_freqs, np.newaxis]
+    ss = _kiladis_wavenumber_axis(nl)[np.newaxis, :]
+    retained = ((ff >= ((ss * (f1 - f2) + f2 * s1 - f1 * s2) / (s1 - s2))) &
+                (ff <= ((ss * (f3 - f4) + f4 * s3 - f3 * s4) / (s3 - s4))) &
+                (ss >= ((ff * (s3 - s1) - f1 * s3 + f3 * s1) / (f3 - f1))) &
+                (ss <= ((ff * (s4 - s2) - f2 * s4 + f4 * s2) / (f4 - f2))))
+    removed = np.zeros((nt, nl), dtype=bool)
+    removed[:no_nonnegative_freqs, :] = ~retained
+    # mirrored elements (-f, -wn), i.e. the indices (nt - i_f, nl - i_wn), for which an index of nt or nl means 0
+    removed_f, removed_wn = np.nonzero(~retained)
+    removed[(nt - removed_f) % nt, (nl - removed_wn) % nl] = True
+    removed = _reorder_spectrum_from_kiladis(removed)
+    removed.flags.writeable = False
+    return removed, int(np.count_nonzero(retained))
+
 class WKFilter:
     """
     This class contains the major Wheeler-Kiladis-Filtering functionality.
@@ -188,7 +372,8 @@ class WKFilter:
                                         wn_min: float,
                                         wn_max: float,
                                         do_plot: bool = False,
-                                        save_debug: bool = False) -> np.ndarray:
+                                        save_debug: bool = False,
+                                        dtype: np.dtype = np.float64) -> np.ndarray:
         """
         Bandpass-filters OLR data in time- and longitude-direction according to
         the original Kiladis algorithm.
@@ -216,6 +401,8 @@ class WKFilter:
         :param do_plot: If ``True``, diagnosis plots will be generated.
         :param save_debug: If ``True``, some variables will be filled with values of intermediate processing steps
             for debugging purposes.
+        :param dtype: The floating point precision of the zero-padded data, either ``np.float64`` (default) or
+            ``np.float32``. The Fourier spectrum has the corresponding complex precision.
 
         :return: The filtered data.
         """
@@ -256,7 +443,7 @@ class WKFilter:
         if orig_nt > nt:
             raise ValueError('Time series is longer than hard-coded value for zero-padding!')
 
-        data = np.zeros([nt, nl])
+        data = np.zeros([nt, nl], dtype=dtype)
         data[0:orig_nt, :] = orig_data
 
         # ######################## Tapering to zero ########################
@@ -269,46 +456,22 @@ class WKFilter:
             self.DebugPreprocessedOLR = np.copy(data)
 
         # ########################## Forward Fourier transform ############
-        fourier_fft = np.fft.fft2(data)
-        # reordering of spectrum is done to be consistent with the original kiladis ordering.
-        fourier_fft = np.fft.fftshift(fourier_fft, axes=(0, 1))
-        fourier_fft = np.roll(fourier_fft, int(nt / 2), axis=0)
-        fourier_fft = np.roll(fourier_fft, int(nl / 2), axis=1)
-
-        # ## Calculation of the frequency grid in accordance with Kiladis code
-        freq_axis = np.zeros(nt)
-        for i_f in range(0, nt):
-            if (i_f <= nt / 2):
-                freq_axis[i_f] = i_f * dataperday / nt
-            else:
-                freq_axis[i_f] = -1 * (nt - i_f) * dataperday / nt
-        # the following code based on scipy function produces qualitatively the same grid.
-        # However, numerical differences seem to have larger effect for the filtering step.
-        # freq_axis = np.fft.fftfreq(nt, d=time_spacing)
-        # freq_axis = np.fft.fftshift(freq_axis)
-        # freq_axis = np.roll(freq_axis, int(nt/2))
-
-        # ## Calculation of the wavenumber grid in accordance with Kiladis code
-        wn_axis = np.zeros(nl)
-        for i_wn in range(0, nl):
-            if i_wn <= nl / 2:
-                wn_axis[i_wn] = -1 * i_wn
-                # note: to have this consistent with the time-dimension, one could write wn_axis[i_wn]= -1*i_wn*dataperglobe/nl
-                # However, since data is required to cover always one globe nl will always be equal to dataperglobe
-                # The sign is not consistent with the time dimension, which is for reasons of consitency with the original Kiladis implementation
-            else:
-                wn_axis[i_wn] = nl - i_wn
-        # the following code based on scipy function produces qualitatively the same grid.
-        # However, numerical differences seem to have larger effect for the filtering step.
-        # wn_axis = np.fft.fftfreq(nl, d=dy)
-        # wn_axis = np.fft.fftshift(wn_axis)  #identical with  wn_axis=np.arange(-int(nlong/2), int(nlong/2),1.)
-        # wn_axis = -1 *wn_axis
-        # wn_axis = np.roll(wn_axis, int(nl/2))
+        # numpy.fft always computes in double precision, whereas scipy.fft keeps single precision.
+        # numpy.fft is kept for double precision to reproduce the reference results exactly.
+        fft_module = np.fft if np.dtype(dtype) == np.float64 else scipy.fft
+        fourier_fft = fft_module.fft2(data)
+        # The filter is defined on the spectrum reordered to be consistent with the original kiladis ordering.
+        # Since the reordering is a pure permutation, the filter mask is applied to the spectrum in the original
+        # numpy ordering instead, which avoids copying the large spectrum forth and back. The reordered spectra are
+        # only created for debugging and plotting.
+
+        freq_axis = _kiladis_frequency_axis(nt, dataperday)
+        wn_axis = _kiladis_wavenumber_axis(nl)
 
         if save_debug:
             self.DebugFreqAxis = np.copy(freq_axis)
             self.DebugWNAxis = np.copy(wn_axis)
-            self.DebugOriginalFourierSpectrum = np.copy(fourier_fft)
+            self.DebugOriginalFourierSpectrum = _reorder_spectrum_to_kiladis(fourier_fft)
 
         if do_plot:
             fig = plt.figure("WK_Filter_perform2dimSpectralSmoothing_freqAxis", clear=True)
@@ -320,67 +483,27 @@ class WKFilter:
             plt.title("Calc wn axis")
 
             fig = plt.figure("WK_Filter_perform2dimSpectralSmoothing_Spectrum", clear=True)
-            plt.contourf(wn_axis, freq_axis, np.squeeze(fourier_fft))
+            plt.contourf(wn_axis, freq_axis, np.squeeze(_reorder_spectrum_to_kiladis(fourier_fft)))
             plt.colorbar()
             plt.title("Fourier Transformation")
 
         # ################### Filtering of the Fourier Spectrum #############
-        # ## name filter boundaries like in Kiladis Fortran Code
-        f1 = freq_min
-        f2 = freq_min
-        f3 = freq_max
-        f4 = freq_max
-        s1 = wn_min
-        s2 = wn_max
-        s3 = wn_min
-        s4 = wn_max
-
-        # ### Very similar to original Kiladis Code
+        removal_mask, count = _spectral_filter_removal_mask(nt, nl, dataperday, freq_min, freq_max, wn_min, wn_max)
         fourier_fft_filtered = fourier_fft
-        count = 0
-        for i_f in range(0, int(nt / 2) + 1):
-            for i_wn in range(0, nl):
-                ff = freq_axis[i_f]
-                ss = wn_axis[i_wn]
-                if ((ff >= ((ss * (f1 - f2) + f2 * s1 - f1 * s2) / (s1 - s2))) and
-                        (ff <= ((ss * (f3 - f4) + f4 * s3 - f3 * s4) / (s3 - s4))) and
-                        (ss >= ((ff * (s3 - s1) - f1 * s3 + f3 * s1) / (f3 - f1))) and
-                        (ss <= ((ff * (s4 - s2) - f2 * s4 + f4 * s2) / (f4 - f2)))):
-                    count = count + 1
-                else:
-                    fourier_fft_filtered[i_f, i_wn] = 0
-                    if i_wn == 0 and i_f == 0:
-                        pass
-                    elif i_wn == 0:
-                        ind_f = nt - i_f
-                        if (ind_f < nt):
-                            fourier_fft_filtered[ind_f, i_wn] = 0
-                    elif i_f == 0:
-                        ind_wn = nl - i_wn
-                        if ind_wn < nl:
-                            fourier_fft_filtered[i_f, ind_wn] = 0
-                    else:
-                        ind_f = nt - i_f
-                        ind_wn = nl - i_wn
-                        if ind_f < nt and ind_wn < nl:
-                            fourier_fft_filtered[ind_f, ind_wn] = 0
+        fourier_fft_filtered[removal_mask] = 0
         if save_debug:
-            self.DebugFilteredFourierSpectrum = np.copy(fourier_fft_filtered)
+            self.DebugFilteredFourierSpectrum = _reorder_spectrum_to_kiladis(fourier_fft_filtered)
             self.DebugNoElementsInFilteredSpectrum = count
 
         if do_plot:
             fig = plt.figure("WK_Filter_perform2dimSpectralSmoothing_FilteredSpectrum", clear=True)
-            plt.contourf(wn_axis, freq_axis, np.squeeze(fourier_fft_filtered))
+            plt.contourf(wn_axis, freq_axis, np.squeeze(_reorder_spectrum_to_kiladis(fourier_fft_filtered)))
             plt.colorbar()
             plt.title("Filtered Fourier Transformation")
             print("Number of elements in filtered spectrum: ", count)
 
         # ############################ FFT Backward transformation ############
-        # #reorder spectrum back from kiladis ordering to python ordering
-        fourier_fft_filtered = np.roll(fourier_fft_filtered, -int(nt / 2), axis=0)
-        fourier_fft_filtered = np.roll(fourier_fft_filtered, -int(nl / 2), axis=1)
-        fourier_fft_filtered = np.fft.ifftshift(fourier_fft_filtered, axes=(0, 1))
-        filtered_olr = np.fft.ifft2(fourier_fft_filtered)
+        filtered_olr = fft_module.ifft2(fourier_fft_filtered)
         filtered_olr = np.real(filtered_olr)
 
         # ############################# remove zero padding elements ##########
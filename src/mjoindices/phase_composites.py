@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2019 Christoph G. Hoffmann. All rights reserved.
+
+# This file is part of mjoindices
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Contact: christoph.hoffmann@uni-greifswald.de
+
+
+"""
+Composites of OLR or other fields for the MJO phases and seasons.
+
+The composites are built by :class:`PhaseCompositeAccumulator` in a single pass over the data. For each combination
+of season and phase, the accumulator only keeps the sum, the sum of squares and the number of days. Hence, the data
+can be processed in chunks, e.g., from a memory-mapped OLR record (see
+:py:func:`mjoindices.olr_handling.restore_from_directory`), which does not fit into memory.
+
+The phases are taken from the PCs (see :py:func:`mjoindices.principal_components.calc_phase`). Days with an MJO
+amplitude not exceeding a threshold are collected in the additional phase 0, in line with the active days of
+:py:func:`mjoindices.principal_components.find_mjo_events`. Days with undefined (NaN) PCs are ignored.
+
+Typical usage:
+
+.. code-block:: python
+
+    accumulator = PhaseCompositeAccumulator((olrdata.lat.size, olrdata.long.size),
+                                            seasons={"NDJFMA": (11, 12, 1, 2, 3, 4), "MJJASO": (5, 6, 7, 8, 9, 10)})
+    accumulator.add_olr(olrdata, pcs)
+    composites = accumulator.mean()  # shape: (seasons, phases 0-8, lat, long)
+"""
+
+import typing
+
+import numpy as np
+
+import mjoindices.olr_handling as olr
+import mjoindices.principal_components as pc
+
+_NO_PHASES = 9
+
+
+class PhaseCompositeAccumulator:
+    """
+    Accumulates the statistics of a field separately for each MJO phase and season.
+
+    :param field_shape: The shape of the field for a single day, e.g., (lat, long) for OLR maps.
+    :param seasons: A mapping of season names to the months (1-12) that belong to the season. The seasons must not
+        overlap. Days in months, which do not belong to any season, are ignored. If ``None``, all days are collected in
+        one season called ``"all"``.
+    :param amplitude_threshold: Days with an MJO amplitude not exceeding this threshold are assigned to phase 0.
+    """
+
+    def __init__(self, field_shape: typing.Tuple[int, ...],
+                 seasons: typing.Optional[typing.Mapping[str, typing.Sequence[int]]] = None,
+                 amplitude_threshold: float = 1.) -> None:
+        """
+        Initialization with empty statistics.
+        """
+        if seasons is None:
+            seasons = {"all": tuple(range(1, 13))}
+        self._season_names = list(seasons.keys())
+        # season index for each month, -1 for months without season
+        self._season_of_month = np.full(12, -1, dtype=int)
+        for season_index, months in enumerate(seasons.values()):
+            for month in months:
+                if month < 1 or month > 12:
+                    raise ValueError("Months of the seasons have to be in the range 1-12.")
+                if self._season_of_month[month - 1] != -1:
+                    raise ValueError("Month %i belongs to more than one season." % month)
+                self._season_of_month[month - 1] = season_index
+        self._field_shape = tuple(field_shape)
+        self._amplitude_threshold = amplitude_threshold
+        no_categories = len(self._season_names) * _NO_PHASES
+        no_values = int(np.prod(self._field_shape))
+        self._counts = np.zeros(no_categories, dtype=np.int64)
+        self._sums = np.zeros((no_categories, no_values))
+        self._sums_of_squares = np.zeros((no_categories, no_values))
+
+    @property
+    def season_names(self) -> typing.List[str]:
+        """
+        The names of the seasons in the order of the first axis of the results.
+        """
+        return self._season_names
+
+    @property
+    def counts(self) -> np.ndarray:
+        """
+        The number of days with the shape (seasons, phases). The second axis corresponds to the phases 0-8.
+        """
+        return self._counts.reshape(len(self._season_names), _NO_PHASES).copy()
+
+    def add(self, values: np.ndarray, time: np.ndarray, pcs: pc.PCData) -> None:
+        """
+        Adds the fields of several days to the statistics.
+
+        :param values: The fields with time on the first axis, i.e., with the shape (time, \\*field_shape).
+        :param time: The dates of the fields.
+        :param pcs: The PCs, from which the phase of each day is derived. All dates in ``time`` have to be covered.
+        """
+        if values.shape != (time.size,) + self._field_shape:
+            raise ValueError("Shape of the values does not fit to the time grid and the field shape.")
+        categories = self._calc_categories(time, pcs)
+        selected = categories >= 0
+        if not np.any(selected):
+            return
+        categories = categories[selected]
+        # The days are sorted by category, so that the sums of each category are computed over a contiguous block.
+        order = np.argsort(categories, kind="stable")
+        sorted_categories = categories[order]
+        block_starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_categories)) + 1))
+        block_categories = sorted_categories[block_starts]
+        sorted_values = np.reshape(values, (time.size, -1))[np.flatnonzero(selected)[order]].astype(np.float64,
+                                                                                                    copy=False)
+        self._counts += np.bincount(categories, minlength=self._counts.size)
+        self._sums[block_categories] += np.add.reduceat(sorted_values, block_starts, axis=0)
+        self._sums_of_squares[block_categories] += np.add.reduceat(np.square(sorted_values), block_starts, axis=0)
+
+    def add_olr(self, olrdata: olr.OLRData, pcs: pc.PCData, chunk_length: int = 365) -> None:
+        """
+        Adds OLR data to the statistics chunk by chunk.
+
+        Only one chunk of the OLR data is decoded or read from disk at a time.
+
+        :param olrdata: The OLR data. The field shape of the accumulator has to be (lat, long).
+        :param pcs: The PCs, from which the phase of each day is derived.
+        :param chunk_length: The number of days per chunk.
+        """
+        for chunk in olr.iterate_time_chunks(olrdata, chunk_length=chunk_length):
+            self.add(chunk.get_olr_block(np.s_[:, :, :]), chunk.time, pcs)
+
+    def merge(self, other: "PhaseCompositeAccumulator") -> None:
+        """
+        Adds the statistics of another accumulator, e.g., one that has processed another part of the record.
+
+        :param other: The other accumulator. It has to use the same field shape and seasons.
+        """
+        if (other._field_shape != self._field_shape or other._season_names != self._season_names
+                or not np.array_equal(other._season_of_month, self._season_of_month)):
+            raise ValueError("The accumulators use different field shapes or seasons.")
+        self._counts += other._counts
+        self._sums += other._sums
+        self._sums_of_squares += other._sums_of_squares
+
+    def mean(self) -> np.ndarray:
+        """
+        Calculates the composite mean.
+
+        :return: The mean with the shape (seasons, phases, \\*field_shape). The second axis corresponds to the phases
+            0-8. Categories without any day are NaN.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = self._sums / self._counts[:, np.newaxis]
+        return self._reshape_result(result)
+
+    def std(self) -> np.ndarray:
+        """
+        Calculates the sample standard deviation of the composites.
+
+        :return: The standard deviation with the same shape as :py:meth:`mean`. Categories with less than two days are
+            NaN.
+        """
+        counts = self._counts[:, np.newaxis].astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            variance = (self._sums_of_squares - np.square(self._sums) / counts) / (counts - 1)
+        variance[np.broadcast_to(counts < 2, variance.shape)] = np.nan
+        # rounding errors may lead to slightly negative variances for constant values
+        return self._reshape_result(np.sqrt(np.maximum(variance, 0.)))
+
+    def _calc_categories(self, time: np.ndarray, pcs: pc.PCData) -> np.ndarray:
+        """
+        Calculates the category index (season * 9 + phase) of each day, or -1 for days without season.
+        """
+        inds = np.searchsorted(pcs.time, time)
+        inds_in_range = np.minimum(inds, pcs.time.size - 1)
+        if pcs.time.size == 0 or not np.all(pcs.time[inds_in_range] == time):
+            raise ValueError("The PCs do not cover all dates of the values.")
+        pc1 = pcs.pc1[inds_in_range]
+        pc2 = pcs.pc2[inds_in_range]
+        amplitude = pc.calc_amplitude(pc1, pc2)
+        # days with undefined PCs are ignored
+        valid = ~np.isnan(amplitude)
+        phase = np.zeros(time.size, dtype=int)
+        active = valid & (amplitude > self._amplitude_threshold)
+        phase[active] = pc.calc_phase(pc1[active], pc2[active])
+        months = time.astype("datetime64[M]").astype(int) % 12
+        seasons = self._season_of_month[months]
+        return np.where(valid & (seasons >= 0), seasons * _NO_PHASES + phase, -1)
+
+    def _reshape_result(self, result: np.ndarray) -> np.ndarray:
+        return result.reshape((len(self._season_names), _NO_PHASES) + self._field_shape)
@@ -21,10 +21,16 @@
 
 """
 This module provides basic functionality to handle PC data, which is a basic output of the OMI calculation.
+
+Besides the storage of the PCs, the module provides the derived MJO amplitude and phase as well as the detection of
+MJO events. These functions are vectorized and also accept PCs of several ensemble members stacked along the first
+axis.
 """
 
-import datetime
+import io
+import os
 from pathlib import Path
+from typing import Optional
 
 import numpy as np
 import pandas as pd
@@ -79,6 +85,26 @@ class PCData:
         """
         return self._pc2
 
+    def calc_amplitude(self) -> np.ndarray:
+        """
+        Calculates the MJO amplitude for each day. See :func:`calc_amplitude`.
+        """
+        return calc_amplitude(self._pc1, self._pc2)
+
+    def calc_phase(self) -> np.ndarray:
+        """
+        Calculates the MJO phase (1-8) for each day. See :func:`calc_phase`.
+        """
+        return calc_phase(self._pc1, self._pc2)
+
+    def find_mjo_events(self, amplitude_threshold: float = 1., min_duration: int = 1,
+                        min_phase_propagation: Optional[float] = None) -> pd.DataFrame:
+        """
+        Detects the periods of MJO activity. See :func:`find_mjo_events`.
+        """
+        return find_mjo_events(self._time, self._pc1, self._pc2, amplitude_threshold=amplitude_threshold,
+                               min_duration=min_duration, min_phase_propagation=min_phase_propagation)
+
     def save_pcs_to_txt_file(self, filename: Path) -> None:
         """
         Saves the computed PCs to a text file.
@@ -93,6 +119,84 @@ class PCData:
         df = pd.DataFrame({"Date": self._time, "PC1": self._pc1, "PC2": self._pc2})
         df.to_csv(filename, index=False, float_format="%.5f")
 
+    def save_pcs_to_npy_file(self, filename: Path) -> None:
+        """
+        Saves the PCs to a binary numpy file.
+
+        The file contains a 1-dim structured array with the fields ``time`` (days since 1970-01-01 as 64-bit integers),
+        ``pc1``, and ``pc2``. New days can be appended later with :func:`append_pcs_to_npy_file` without rewriting
+        the existing data. The file can be loaded with :func:`mjoindices.principal_components.load_pcs_from_npy_file`.
+
+        Note that the time grid has to consist of full days.
+
+        :param filename: The full filename. Note that numpy adds the extension .npy, if not present.
+        """
+        np.save(filename, self._to_structured_array())
+
+    def append_pcs_to_npy_file(self, filename: Path) -> None:
+        """
+        Appends the PCs to a binary numpy file, which has been created with :func:`save_pcs_to_npy_file`.
+
+        Only the new data and the file header are written. If the file does not exist, it is created.
+
+        :param filename: The full filename of an existing file.
+        """
+        filename = Path(filename)
+        if not filename.exists():
+            self.save_pcs_to_npy_file(filename)
+            return
+        data = self._to_structured_array()
+        with open(filename, "r+b") as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            header_length = f.tell()
+            if dtype != _PC_FILE_DTYPE or fortran_order or len(shape) != 1:
+                raise ValueError("File %s does not contain PC data in the expected format" % str(filename))
+            if shape[0] > 0 and data.size > 0:
+                f.seek(header_length + (shape[0] - 1) * dtype.itemsize)
+                last_day = np.frombuffer(f.read(dtype.itemsize), dtype=dtype)["time"][0]
+                if data["time"][0] <= last_day:
+                    raise ValueError("The appended PCs have to start after the last date in the file.")
+            # The header with the new length is prepared first. Recent numpy versions reserve enough space in the
+            # header, so that the shape of the first axis can grow without changing the header length. Files written
+            # by older numpy versions may lack this space.
+            header = {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False,
+                      "shape": (shape[0] + data.size,)}
+            new_header = io.BytesIO()
+            if version == (1, 0):
+                np.lib.format.write_array_header_1_0(new_header, header)
+            else:
+                np.lib.format.write_array_header_2_0(new_header, header)
+            if new_header.tell() == header_length:
+                f.seek(header_length + shape[0] * dtype.itemsize)
+                f.write(data.tobytes())
+                f.truncate()
+                f.seek(0)
+                f.write(new_header.getvalue())
+                return
+        # The header does not fit, so that the complete file is rewritten. The existing file is only replaced after
+        # the new one has been written completely.
+        temp_filename = filename.with_name(filename.name + ".tmp")
+        with open(temp_filename, "wb") as f:
+            np.save(f, np.concatenate((np.load(filename), data)))
+        os.replace(temp_filename, filename)
+
+    def _to_structured_array(self) -> np.ndarray:
+        days = self._time.astype("datetime64[D]")
+        if not np.all(days == self._time):
+            raise ValueError("The time grid has to consist of full days to be saved in the binary format.")
+        data = np.empty(self._time.size, dtype=_PC_FILE_DTYPE)
+        data["time"] = days.astype(np.int64)
+        data["pc1"] = self._pc1
+        data["pc2"] = self._pc2
+        return data
+
+
+_PC_FILE_DTYPE = np.dtype([("time", "<i8"), ("pc1", "<f8"), ("pc2", "<f8")])
+
 
 def load_pcs_from_txt_file(filename: Path) -> PCData:
     """
@@ -103,8 +207,9 @@ def load_pcs_from_txt_file(filename: Path) -> PCData:
 
     :return: The PC data.
     """
-    df = pd.read_csv(filename, sep=',', parse_dates=[0], header=0)
-    dates = df.Date.values
+    df = pd.read_csv(filename, sep=',', header=0)
+    # Converting the ISO date strings with numpy is much faster than the date parsing of pandas.
+    dates = df.Date.values.astype("datetime64[ns]")
     pc1 = df.PC1.values
     pc2 = df.PC2.values
     return PCData(dates, pc1, pc2)
@@ -122,13 +227,163 @@ def load_original_pcs_from_txt_file(filename: Path) -> PCData:
 
     :return:  The original PC data.
     """
-    my_data = np.genfromtxt(filename)
-    dates_temp = []
-    for i in range(0, my_data.shape[0]):
-        dates_temp.append(
-            datetime.datetime(my_data[i, 0].astype(int), my_data[i, 1].astype(int), my_data[i, 2].astype(int)))
-    dates = np.array(dates_temp, dtype='datetime64')
+    my_data = np.loadtxt(filename, ndmin=2)
+    dates = _dates_from_year_month_day(my_data[:, 0].astype(int), my_data[:, 1].astype(int),
+                                       my_data[:, 2].astype(int)).astype("datetime64[us]")
     pc1 = np.array(my_data[:, 4])
     pc2 = np.array(my_data[:, 5])
     return PCData(dates, pc1, pc2)
 
+
+def load_pcs_from_npy_file(filename: Path) -> PCData:
+    """
+    Loads the PCs from a binary numpy file, which was previously saved with this package
+    (:func:`mjoindices.principal_components.PCData.save_pcs_to_npy_file`).
+
+    :param filename: Path to the PC file.
+
+    :return: The PC data. The time grid is given as :class:`numpy.datetime64` elements with a resolution of days.
+    """
+    data = np.load(filename)
+    if data.dtype != _PC_FILE_DTYPE:
+        raise ValueError("File %s does not contain PC data in the expected format" % str(filename))
+    return PCData(data["time"].astype("datetime64[D]"), data["pc1"], data["pc2"])
+
+
+def calc_amplitude(pc1: np.ndarray, pc2: np.ndarray) -> np.ndarray:
+    """
+    Calculates the MJO amplitude, which is the length of the vector (PC1, PC2).
+
+    :param pc1: The values of PC1. The array may have any shape, e.g., (members, time) for an ensemble.
+    :param pc2: The values of PC2 with the same shape as ``pc1``.
+
+    :return: The amplitude with the same shape as the PCs.
+    """
+    return np.hypot(pc1, pc2)
+
+
+def calc_phase(pc1: np.ndarray, pc2: np.ndarray) -> np.ndarray:
+    """
+    Calculates the MJO phase (1-8) in the convention of the RMM index of Wheeler and Hendon (2004).
+
+    Following :ref:`refKiladis2014`, the OMI PCs are mapped onto the RMM phase space by RMM1 = PC2 and RMM2 = -PC1.
+    Each of the 8 phases covers 45° of the phase angle. Phase 1 starts at the negative RMM1 axis and the phase number
+    increases counterclockwise, which corresponds to the eastward propagation of the MJO.
+
+    :param pc1: The values of PC1. The array may have any shape, e.g., (members, time) for an ensemble.
+    :param pc2: The values of PC2 with the same shape as ``pc1``.
+
+    :return: The phase as integers with the same shape as the PCs. Days with undefined (NaN) PCs get the phase 0.
+    """
+    angle = _calc_phase_angle(pc1, pc2)
+    valid = ~np.isnan(angle)
+    phase = np.zeros(angle.shape, dtype=int)
+    # an angle of exactly 180° belongs to phase 8
+    phase[valid] = np.minimum(np.floor((angle[valid] + 180.) / 45.).astype(int) + 1, 8)
+    return phase
+
+
+def find_mjo_events(time: np.ndarray, pc1: np.ndarray, pc2: np.ndarray, amplitude_threshold: float = 1.,
+                    min_duration: int = 1, min_phase_propagation: Optional[float] = None) -> pd.DataFrame:
+    """
+    Detects the periods of MJO activity, i.e., periods, in which the amplitude exceeds a threshold on consecutive days.
+    Days with undefined (NaN) PCs are treated as inactive.
+
+    The detection is based on a run-length encoding of the days above the threshold and does not loop over the days.
+    Hence, it is also suitable for long records and large ensembles.
+
+    :param time: The time grid of the PCs.
+    :param pc1: The values of PC1, either a 1-dim array of the same length as ``time`` or a 2-dim array with the
+        shape (members, time) for an ensemble.
+    :param pc2: The values of PC2 with the same shape as ``pc1``.
+    :param amplitude_threshold: The amplitude, which has to be exceeded during an event.
+    :param min_duration: The minimum number of days of an event.
+    :param min_phase_propagation: If given, only events are returned, for which the phase angle propagates at
+        least by this number of phases (45° each) in the eastward direction from the first to the last day of the
+        event. Non-integer values are allowed.
+
+    :return: A table with one row per event and the columns ``member`` (only for 2-dim PCs), ``start``, ``end``
+        (the first and the last day of the event), ``duration`` (in days), ``max_amplitude``, ``mean_amplitude``,
+        ``start_phase``, ``end_phase``, and ``phase_propagation`` (in number of phases).
+    """
+    if pc1.shape != pc2.shape:
+        raise ValueError("PC1 and PC2 must have the same shape.")
+    if pc1.ndim not in (1, 2) or pc1.shape[-1] != time.size:
+        raise ValueError("The PCs must be given as 1-dim or 2-dim arrays with time on the last axis.")
+    if min_duration < 1:
+        raise ValueError("min_duration must be positive.")
+    no_days = time.size
+    amplitude = np.atleast_2d(calc_amplitude(pc1, pc2))
+    angle = np.atleast_2d(_calc_phase_angle(pc1, pc2))
+
+    # Separate the members by an inactive day before and after each time series, so that the members can be
+    # processed as one flat array.
+    padded_amplitude = np.zeros((amplitude.shape[0], no_days + 2))
+    padded_amplitude[:, 1:-1] = np.where(np.isnan(amplitude), 0., amplitude)
+    padded_amplitude = padded_amplitude.ravel()
+    changes = np.diff((padded_amplitude > amplitude_threshold).astype(np.int8))
+    starts = np.flatnonzero(changes == 1) + 1
+    stops = np.flatnonzero(changes == -1) + 1
+    members = starts // (no_days + 2)
+    start_indices = starts % (no_days + 2) - 1
+    end_indices = stops % (no_days + 2) - 2
+    durations = stops - starts
+
+    if starts.size > 0:
+        boundaries = np.column_stack((starts, stops)).ravel()
+        max_amplitudes = np.maximum.reduceat(padded_amplitude, boundaries)[::2]
+        mean_amplitudes = np.add.reduceat(padded_amplitude, boundaries)[::2] / durations
+    else:
+        max_amplitudes = np.zeros(0)
+        mean_amplitudes = np.zeros(0)
+
+    # accumulated phase angle, which is continuous across the jumps between -180° and 180°
+    angle_steps = (np.diff(angle, axis=-1) + 180.) % 360. - 180.
+    # steps from or to days with undefined PCs do not contribute, so that they do not affect later events
+    angle_steps[np.isnan(angle_steps)] = 0.
+    unwrapped_angle = np.concatenate((np.zeros((angle.shape[0], 1)), np.cumsum(angle_steps, axis=-1)), axis=-1)
+    phase_propagation = (unwrapped_angle[members, end_indices] - unwrapped_angle[members, start_indices]) / 45.
+    phase = np.atleast_2d(calc_phase(pc1, pc2))
+
+    selection = durations >= min_duration
+    if min_phase_propagation is not None:
+        selection &= phase_propagation >= min_phase_propagation
+    events = {"member": members,
+              "start": time[start_indices],
+              "end": time[end_indices],
+              "duration": durations,
+              "max_amplitude": max_amplitudes,
+              "mean_amplitude": mean_amplitudes,
+              "start_phase": phase[members, start_indices],
+              "end_phase": phase[members, end_indices],
+              "phase_propagation": phase_propagation}
+    if pc1.ndim == 1:
+        del events["member"]
+    return pd.DataFrame({key: value[selection] for key, value in events.items()})
+
+
+def _calc_phase_angle(pc1: np.ndarray, pc2: np.ndarray) -> np.ndarray:
+    """
+    Calculates the phase angle in degrees (-180° to 180°) in the RMM phase space (RMM1 = PC2, RMM2 = -PC1).
+    """
+    return np.rad2deg(np.arctan2(-pc1, pc2))
+
+
+def _dates_from_year_month_day(years: np.ndarray, months: np.ndarray, days: np.ndarray) -> np.ndarray:
+    """
+    Converts arrays of year, month, and day numbers into an array of :class:`numpy.datetime64` dates.
+
+    :param years: The years.
+    :param months: The months (1-12).
+    :param days: The days of the month.
+
+    :return: The dates with a resolution of days.
+    """
+    first_of_month = (years - 1970).astype("datetime64[Y]").astype("datetime64[M]") + (months - 1)
+    dates = first_of_month.astype("datetime64[D]") + (days - 1)
+    # invalid months or days would spill over into neighbouring months
+    if not (np.all(dates.astype("datetime64[M]") == first_of_month)
+            and np.all(first_of_month.astype("datetime64[Y]").astype(int) + 1970 == years)):
+        raise ValueError("Invalid date found in year, month, and day values")
+    return dates
+
@@ -24,7 +24,11 @@ This module provides basic helper routines for the OMI calculation
 """
 
 import datetime as dt
+import functools
+import json
+import os
 import typing
+from pathlib import Path
 import numpy as np
 import pandas as pd
 
@@ -58,9 +62,18 @@ def calc_day_of_year(date: typing.Union[np.datetime64, np.ndarray], no_leap_year
         else:
             result = time_fragments[7]
     else:
-        result = np.empty(date.size)
-        for i, d in enumerate(date):
-            result[i] = calc_day_of_year(d, no_leap_years=no_leap_years)
+        days = np.ravel(date).astype("datetime64[D]")
+        year_starts = days.astype("datetime64[Y]")
+        if no_leap_years:
+            month_starts = days.astype("datetime64[M]")
+            month_inds = (month_starts - year_starts.astype("datetime64[M]")).astype(int)
+            days_of_month = (days - month_starts.astype("datetime64[D]")).astype(int) + 1
+            if np.any(days_of_month > np.array(day_per_mon)[month_inds]):
+                raise ValueError('Invalid date. Likely due to mismatch between input date and no_leap_years parameter')
+            doys = np.cumsum([0] + day_per_mon[:-1])[month_inds] + days_of_month
+        else:
+            doys = (days - year_starts.astype("datetime64[D]")).astype(int) + 1
+        result = doys.astype(float)
     return result
 
 
@@ -160,5 +173,118 @@ def doy_list(no_leap_years: bool = False) -> np.array:
         return np.arange(1, 367, 1)
 
 
+def regrid_bilinear(data: np.ndarray, source_lat: np.ndarray, source_long: np.ndarray, target_lat: np.ndarray,
+                    target_long: np.ndarray, clamp_to_source_grid: bool = False) -> np.ndarray:
+    """
+    Interpolates data bilinearly from one lat/long grid onto another.
+
+    The interpolation weights depend only on the grids and are cached, so that repeated calls for the same pair of
+    grids (e.g., for consecutive blocks of a long time series) only perform the weighted sums.
+
+    :param data: The data to interpolate. The last two axes have to correspond to the source latitude and longitude
+        grids. Further leading axes (e.g., time) are kept.
+    :param source_lat: The latitude grid of the data. Does not need to be sorted.
+    :param source_long: The longitude grid of the data. Does not need to be sorted.
+    :param target_lat: The target latitude grid.
+    :param target_long: The target longitude grid.
+    :param clamp_to_source_grid: If ``False``, a :py:class:`ValueError` is raised, if the target grids are not
+        completely covered by the source grids. If ``True``, target coordinates outside of the source grid are moved to
+        the nearest boundary of the source grid (i.e., the boundary values are continued).
+
+    :return: The interpolated data. The last two axes correspond to the target latitude and longitude grids.
+    """
+    lat_idx0, lat_idx1, lat_weights = _linear_interpolation_weights(tuple(np.asarray(source_lat, dtype=float)),
+                                                                    tuple(np.asarray(target_lat, dtype=float)),
+                                                                    clamp_to_source_grid, "Latitude")
+    long_idx0, long_idx1, long_weights = _linear_interpolation_weights(tuple(np.asarray(source_long, dtype=float)),
+                                                                       tuple(np.asarray(target_long, dtype=float)),
+                                                                       clamp_to_source_grid, "Longitude")
+    data = np.asarray(data, dtype=float)
+    lat_weights = lat_weights[:, np.newaxis]
+    data_at_target_lat = (1. - lat_weights) * data[..., lat_idx0, :] + lat_weights * data[..., lat_idx1, :]
+    return (1. - long_weights) * data_at_target_lat[..., long_idx0] + long_weights * data_at_target_lat[..., long_idx1]
+
+
+@functools.lru_cache(maxsize=64)
+def _linear_interpolation_weights(source: tuple, target: tuple, clamp_to_source_grid: bool,
+                                  axis_name: str) -> typing.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculates the indices of the neighbouring source grid points and the linear interpolation weights for each
+    target grid point.
+
+    The grids are given as tuples, so that the results can be cached.
+
+    :return: Tuple of the indices of the left and right neighbours and the weights of the right neighbours.
+    """
+    source = np.array(source)
+    target = np.array(target)
+    sort_idx = np.argsort(source, kind="stable")
+    sorted_source = source[sort_idx]
+    if clamp_to_source_grid:
+        target = np.clip(target, sorted_source[0], sorted_source[-1])
+    elif np.any(target < sorted_source[0]) or np.any(target > sorted_source[-1]):
+        raise ValueError("%s values out of range. Target grid has to be within [%s, %s]."
+                         % (axis_name, str(sorted_source[0]), str(sorted_source[-1])))
+    if sorted_source.size == 1:
+        idx = np.zeros(target.size, dtype=int)
+        weights = np.zeros(target.size)
+        idx0 = idx1 = sort_idx[idx]
+    else:
+        idx = np.clip(np.searchsorted(sorted_source, target, side="right") - 1, 0, sorted_source.size - 2)
+        weights = (target - sorted_source[idx]) / (sorted_source[idx + 1] - sorted_source[idx])
+        idx0 = sort_idx[idx]
+        idx1 = sort_idx[idx + 1]
+    for arr in (idx0, idx1, weights):
+        arr.setflags(write=False)
+    return idx0, idx1, weights
+
+
+def save_npy_file(filename: Path, data: np.ndarray) -> None:
+    """
+    Saves an array into a numpy ``.npy`` file without overwriting the existing file in place.
+
+    The array is first written into a temporary file, which then replaces the existing file. Hence, arrays which are
+    still memory-mapped from the existing file (e.g., because the data to save has been restored from the same
+    directory) remain valid and are not truncated while they are read.
+
+    :param filename: The filename, including the suffix ``.npy``.
+    :param data: The array to save.
+    """
+    filename = Path(filename)
+    temp_filename = filename.with_name(filename.name + ".tmp")
+    with open(temp_filename, "wb") as f:
+        np.save(f, data)
+    os.replace(temp_filename, filename)
 
 
+def remove_metadata_file(filename: Path) -> None:
+    """
+    Removes the metadata file of a dataset saved into a directory, if it exists.
+
+    This should be done before the data files of a previously saved dataset are overwritten, so that the directory is
+    not recognized as valid while it is incomplete. See :py:func:`write_metadata_file`.
+
+    :param filename: The path of the metadata file.
+    """
+    filename = Path(filename)
+    if filename.exists():
+        filename.unlink()
+
+
+def write_metadata_file(filename: Path, metadata: dict) -> None:
+    """
+    Writes the metadata file of a dataset saved into a directory as JSON file.
+
+    The metadata file should be written after all data files, since its existence marks the saved dataset as complete.
+    It is first written into a temporary file, which is then renamed, so that also an interrupted write of the metadata
+    file itself does not leave a corrupt file behind. The metadata should contain a format version, so that readers
+    can reject files written by incompatible versions of the package.
+
+    :param filename: The path of the metadata file.
+    :param metadata: The metadata. Has to be serializable as JSON.
+    """
+    filename = Path(filename)
+    temp_filename = filename.with_name(filename.name + ".tmp")
+    with open(temp_filename, "w") as f:
+        json.dump(metadata, f)
+    os.replace(temp_filename, filename)
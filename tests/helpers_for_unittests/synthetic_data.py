@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2019 Christoph G. Hoffmann. All rights reserved.
+
+# This file is part of mjoindices
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Contact: christoph.hoffmann@uni-greifswald.de
+
+"""
+Synthetic OLR data and EOFs for unit tests, which do not need the original data files.
+
+The OLR data contains an eastward propagating wave with a period of 45 days plus Gaussian noise on a coarse tropical
+grid.
+"""
+
+import numpy as np
+
+import mjoindices.empirical_orthogonal_functions as eof
+import mjoindices.olr_handling as olr
+
+#: The latitude grid of the synthetic EOFs (and the default grid of the synthetic OLR data).
+LAT = np.array([-5., 0., 5.])
+#: The longitude grid of the synthetic EOFs (and the default grid of the synthetic OLR data).
+LONG = np.arange(0., 359.9, 30.)
+#: A coarser latitude grid, which covers a larger region than the EOFs.
+WIDE_LAT = np.array([-10., 0., 10.])
+#: A finer longitude grid, which differs from the grid of the EOFs.
+FINE_LONG = np.arange(0., 359.9, 20.)
+
+
+def synthetic_olr(start: str, end: str, rng: np.random.Generator, lat: np.ndarray = None, long: np.ndarray = None,
+                  offset: float = 0., time_shift: int = 0) -> olr.OLRData:
+    """
+    Generates synthetic OLR data.
+
+    :param start: The first date (included).
+    :param end: The last date (excluded).
+    :param rng: The random number generator for the noise.
+    :param lat: The latitude grid. Defaults to :py:data:`LAT`.
+    :param long: The longitude grid. Defaults to :py:data:`LONG`.
+    :param offset: A constant added to all values, e.g., 230 W/m^2 for realistic absolute values.
+    :param time_shift: A shift of the phase of the wave in days.
+
+    :return: The OLR data.
+    """
+    lat = LAT if lat is None else lat
+    long = LONG if long is None else long
+    time = np.arange(start, end, dtype="datetime64[D]")
+    t = np.arange(time.size)[:, None, None] + time_shift
+    olrmatrix = (offset + 20. * np.cos(np.deg2rad(long)[None, None, :] - 2 * np.pi * t / 45.)
+                 * np.ones((1, lat.size, 1)) + 5. * rng.standard_normal((time.size, lat.size, long.size)))
+    return olr.OLRData(olrmatrix, time, lat, long)
+
+
+def synthetic_eofs(rng: np.random.Generator, lat: np.ndarray = None, long: np.ndarray = None,
+                   no_leap_years: bool = False) -> eof.EOFDataForAllDOYs:
+    """
+    Generates random EOFs for all DOYs.
+
+    :param rng: The random number generator.
+    :param lat: The latitude grid. Defaults to :py:data:`LAT`.
+    :param long: The longitude grid. Defaults to :py:data:`LONG`.
+    :param no_leap_years: If ``True``, EOFs for 365 instead of 366 DOYs are generated.
+
+    :return: The EOFs.
+    """
+    lat = LAT if lat is None else lat
+    long = LONG if long is None else long
+    shape = (365 if no_leap_years else 366, lat.size * long.size)
+    return eof.EOFDataForAllDOYs.from_arrays(lat, long, rng.standard_normal(shape), rng.standard_normal(shape),
+                                             no_leap_years=no_leap_years)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2019 Christoph G. Hoffmann. All rights reserved.
+
+# This file is part of mjoindices
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Contact: christoph.hoffmann@uni-greifswald.de
+
+import numpy as np
+import pytest
+
+import mjoindices.olr_handling as olr
+import mjoindices.omi.bootstrap as bootstrap
+import mjoindices.omi.omi_calculator as omi
+
+from helpers_for_unittests.synthetic_data import synthetic_olr
+
+
+def test_bootstrap_statistics():
+    rng = np.random.default_rng(1)
+    values = rng.standard_normal((10, 3))
+
+    errors = []
+    target = bootstrap.BootstrapStatistics()
+    for value in values[:4]:
+        target.add({"x": value})
+    other = bootstrap.BootstrapStatistics()
+    for value in values[4:]:
+        other.add({"x": value})
+    target.merge(other)
+    if not (target.count == 10 and np.allclose(target.mean("x"), np.mean(values, axis=0))
+            and np.allclose(target.std("x"), np.std(values, axis=0, ddof=1))):
+        errors.append("Merged statistics are incorrect")
+    lower, upper = target.confidence_interval("x", level=0.95)
+    if not np.allclose(upper - target.mean("x"), 1.959964 * target.std("x")):
+        errors.append("Confidence interval is incorrect")
+
+    single = bootstrap.BootstrapStatistics()
+    single.add({"x": values[0]})
+    if not np.all(np.isnan(single.std("x"))):
+        errors.append("Standard deviation of a single replicate should be NaN")
+    with pytest.raises(ValueError):
+        single.add({"y": values[1]})
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_bootstrap_eofs_and_pcs():
+    testdata = synthetic_olr("2011-01-01", "2015-01-01", np.random.default_rng(42))
+    seed = 42
+
+    errors = []
+    reference = omi.calc_eofs_from_preprocessed_olr(testdata)
+    target = bootstrap.bootstrap_eofs_and_pcs(testdata, 1, pc_olr=testdata, eofs_postprocessing_type=None,
+                                              reference_eofs=reference, seed=seed)
+
+    # a single replicate corresponds to the EOFs of a record, which is concatenated from the drawn years
+    rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(1)[0])
+    drawn_years = 2011 + rng.integers(0, 4, size=4)
+    years = testdata.time.astype("datetime64[Y]").astype(int) + 1970
+    inds = np.concatenate([np.nonzero(years == year)[0] for year in drawn_years])
+    control = omi.calc_eofs_from_preprocessed_olr(olr.OLRData(testdata.olr[inds], testdata.time[inds], testdata.lat,
+                                                              testdata.long))
+    for name, control_vectors, reference_vectors in (("eof1", control.eof1vectors, reference.eof1vectors),
+                                                     ("eof2", control.eof2vectors, reference.eof2vectors)):
+        signs = np.sign(np.sum(control_vectors * reference_vectors, axis=1))[:, np.newaxis]
+        if not np.allclose(target.mean(name), signs * control_vectors, rtol=0, atol=1e-8):
+            errors.append("Replicate of %s differs from calculation for concatenated record" % name)
+    if not np.allclose(target.mean("explained_variance1"), control.explained_variance1_for_all_doys()):
+        errors.append("Replicate of explained variance differs from calculation for concatenated record")
+    if not (target.mean("pc1").shape == testdata.time.shape and np.isclose(np.std(target.mean("pc1")), 1.)):
+        errors.append("Replicate of PCs is incorrect")
+
+    statistics = bootstrap.bootstrap_eofs_and_pcs(testdata, 4, pc_olr=testdata, eofs_postprocessing_type=None,
+                                                  reference_eofs=reference, seed=seed)
+    parallel_statistics = bootstrap.bootstrap_eofs_and_pcs(testdata, 4, pc_olr=testdata,
+                                                           eofs_postprocessing_type=None, reference_eofs=reference,
+                                                           seed=seed, max_workers=2)
+    if not statistics.count == 4 or sorted(statistics.names) != sorted(["eof1", "eof2", "explained_variance1",
+                                                                         "explained_variance2", "pc1", "pc2"]):
+        errors.append("Statistics are incomplete")
+    for name in statistics.names:
+        if not (np.allclose(statistics.mean(name), parallel_statistics.mean(name), rtol=0, atol=1e-10)
+                and np.allclose(statistics.std(name), parallel_statistics.std(name), rtol=0, atol=1e-10)):
+            errors.append("Statistics of %s depend on the number of processes" % name)
+
+    with pytest.raises(ValueError):
+        bootstrap.bootstrap_eofs_and_pcs(testdata, 0)
+    with pytest.raises(ValueError):
+        bootstrap.bootstrap_eofs_and_pcs(testdata, 1, pc_olr=olr.OLRData(testdata.olr, testdata.time,
+                                                                         testdata.lat + 1., testdata.long))
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2019 Christoph G. Hoffmann. All rights reserved.
+
+# This file is part of mjoindices
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Contact: christoph.hoffmann@uni-greifswald.de
+
+import os
+
+import numpy as np
+import pytest
+
+import mjoindices.empirical_orthogonal_functions as eof
+import mjoindices.olr_handling as olr
+import mjoindices.omi.calculation_cache as cc
+import mjoindices.omi.omi_calculator as omi
+
+from helpers_for_unittests.synthetic_data import synthetic_olr
+
+
+def _synthetic_olr(no_years=2, seed=42):
+    return synthetic_olr("2011-01-01", "%i-01-01" % (2011 + no_years), np.random.default_rng(seed), offset=230.)
+
+
+def test_fingerprint_olr(tmp_path):
+    cache = cc.CalculationCache(tmp_path / "cache")
+    testdata = _synthetic_olr(no_years=1)
+
+    errors = []
+    fingerprint = cache.fingerprint_olr(testdata)
+    if not fingerprint == cache.fingerprint_olr(_synthetic_olr(no_years=1)):
+        errors.append("Fingerprint of identical data differs")
+
+    modified_olr = testdata.olr.copy()
+    modified_olr[100, 1, 1] += 1e-10
+    if fingerprint == cache.fingerprint_olr(olr.OLRData(modified_olr, testdata.time, testdata.lat, testdata.long)):
+        errors.append("Fingerprint does not reflect the OLR values")
+    if fingerprint == cache.fingerprint_olr(olr.OLRData(testdata.olr, testdata.time + np.timedelta64(1, "D"),
+                                                        testdata.lat, testdata.long)):
+        errors.append("Fingerprint does not reflect the time axis")
+    if fingerprint == cache.fingerprint_olr(olr.OLRData(testdata.olr, testdata.time, testdata.lat + 1.,
+                                                        testdata.long)):
+        errors.append("Fingerprint does not reflect the latitude grid")
+
+    packed = olr.pack_olr_data(testdata)
+    if fingerprint == cache.fingerprint_olr(packed):
+        errors.append("Fingerprint of packed data should differ from unpacked data")
+    if not cache.fingerprint_olr(packed) == cache.fingerprint_olr(olr.pack_olr_data(testdata)):
+        errors.append("Fingerprint of identical packed data differs")
+
+    if not cache.key("a", x=1, y="b") == cache.key("a", y="b", x=1):
+        errors.append("Key depends on order of settings")
+    if cache.key("a", x=1) == cache.key("a", x=2) or cache.key("a", x=1) == cache.key("b", x=1):
+        errors.append("Key does not reflect kind or settings")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_store_and_load(tmp_path):
+    cache = cc.CalculationCache(tmp_path / "cache")
+    testdata = _synthetic_olr(no_years=1)
+    lat = np.array([-10., 0., 10.])
+    long = np.array([0., 5.])
+    eofs = eof.EOFDataForAllDOYs.from_arrays(lat, long, np.ones((366, 6)), np.arange(366 * 6.).reshape(366, 6),
+                                             no_leap_years=False)
+
+    errors = []
+    if cache.load_olr("abc") is not None or cache.load_eofs("def") is not None:
+        errors.append("Missing entries not detected")
+
+    cache.store_olr("abc", testdata)
+    cache.store_eofs("def", eofs)
+    if not cache.load_olr("abc") == testdata:
+        errors.append("OLR data loaded from cache is incorrect")
+    if not cache.load_eofs("def").eof_list == eofs.eof_list:
+        errors.append("EOFs loaded from cache are incorrect")
+    if cache.load_eofs("abc") is not None:
+        errors.append("Content type of entry not checked")
+
+    # incomplete entries are ignored
+    (tmp_path / "cache" / "abc" / "entry.json").unlink()
+    if cache.load_olr("abc") is not None:
+        errors.append("Incomplete entry not detected")
+
+    cache.clear()
+    if cache.total_size_bytes() != 0 or cache.load_eofs("def") is not None:
+        errors.append("Cache has not been cleared")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_eviction(tmp_path):
+    testdata = _synthetic_olr(no_years=1)
+    entry_size = testdata.olr.nbytes
+    cache = cc.CalculationCache(tmp_path / "cache", max_size_bytes=int(2.5 * entry_size))
+
+    errors = []
+    cache.store_olr("first", testdata)
+    cache.store_olr("second", testdata)
+    # access the first entry, so that the second one is the least recently used
+    cache.load_olr("first")
+    entry_file = tmp_path / "cache" / "second" / "entry.json"
+    stat = entry_file.stat()
+    os.utime(entry_file, (stat.st_atime - 100, stat.st_mtime - 100))
+    cache.store_olr("third", testdata)
+    if cache.load_olr("second") is not None:
+        errors.append("Least recently used entry has not been removed")
+    if cache.load_olr("first") is None or cache.load_olr("third") is None:
+        errors.append("Recently used entries have been removed")
+    if cache.total_size_bytes() > cache.max_size_bytes:
+        errors.append("Cache exceeds maximum size")
+
+    small_cache = cc.CalculationCache(tmp_path / "small_cache", max_size_bytes=0)
+    small_cache.store_olr("only", testdata)
+    if small_cache.load_olr("only") is None:
+        errors.append("Entry just stored must not be removed")
+
+    with pytest.raises(ValueError):
+        cc.CalculationCache(tmp_path / "invalid_cache", max_size_bytes=-1)
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_calc_eofs_from_olr_with_result_cache(tmp_path, monkeypatch):
+    testdata = _synthetic_olr()
+    cache = cc.CalculationCache(tmp_path / "cache")
+
+    errors = []
+    control_raw = omi.calc_eofs_from_olr(testdata, eofs_postprocessing_type=None)
+    target = omi.calc_eofs_from_olr(testdata, eofs_postprocessing_type="kiladis2014", result_cache=cache)
+    if not target.eof_list == omi.initiate_eof_post_processing(control_raw, "kiladis2014").eof_list:
+        errors.append("EOFs calculated with cache differ")
+
+    # from now on, the preprocessing and EOF analysis must not be executed again
+    def fail(*args, **kwargs):
+        raise AssertionError("Calculation has not been taken from cache")
+    monkeypatch.setattr(omi, "preprocess_olr", fail)
+    monkeypatch.setattr(omi, "calc_eofs_from_preprocessed_olr", fail)
+
+    target = omi.calc_eofs_from_olr(testdata, eofs_postprocessing_type="kiladis2014", result_cache=cache)
+    if not target.eof_list == omi.initiate_eof_post_processing(control_raw, "kiladis2014").eof_list:
+        errors.append("EOFs loaded from cache differ")
+    target = omi.calc_eofs_from_olr(testdata, eofs_postprocessing_type="eof_rotation", result_cache=cache)
+    if not target.eof_list == omi.initiate_eof_post_processing(control_raw, "eof_rotation").eof_list:
+        errors.append("EOFs with other post-processing differ")
+    monkeypatch.undo()
+
+    # a different leap year treatment reuses only the filtered OLR data
+    monkeypatch.setattr(omi, "preprocess_olr", fail)
+    target = omi.calc_eofs_from_olr(testdata, leap_year_treatment="strict", eofs_postprocessing_type=None,
+                                    result_cache=cache)
+    control = omi.calc_eofs_from_preprocessed_olr(cache.load_olr(cache.key(
+        "filtered_olr", olr=cache.fingerprint_olr(testdata), filter="wheeler_kiladis_mjo_eof", dtype="float64")),
+        leap_year_treatment="strict")
+    monkeypatch.undo()
+    if not target.eof_list == control.eof_list:
+        errors.append("EOFs with other leap year treatment differ")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
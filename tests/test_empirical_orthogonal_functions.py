@@ -354,6 +354,14 @@ def test_save_eofs_to_txt_file_load_eofs_from_txt_file(tmp_path):
     target_reloaded = eof.load_single_eofs_from_txt_file(filename)
 
     errors = []
+    with open(filename, "r") as f:
+        lines = f.read().splitlines()
+    if not lines[0] == "Lat,Long,EOF1,EOF2":
+        errors.append("Header line is incorrect")
+    if not lines[2] == "  -10.0000000,    5.0000000,    2.0000000,   20.0000000":
+        errors.append("Data line is incorrect")
+    if not len(lines) == 7:
+        errors.append("Number of lines is incorrect")
     if not np.all(target_reloaded.lat == lat):
         errors.append("Latitude grid does not fit")
     if not np.all(target_reloaded.long == long):
@@ -632,6 +640,88 @@ def test_EOFDataForAllDOYs_alldoy_getfunctions():
     assert not errors, "errors occurred:\n{}".format("\n".join(errors))
 
 
+@pytest.mark.parametrize('no_leap_years', [False, True])
+def test_EOFDataForAllDOYs_from_arrays(no_leap_years):
+    doys = tools.doy_list(no_leap_years)
+    lat = np.array([-10., 0., 10.])
+    long = np.array([0., 5.])
+    eof1 = np.outer(doys, np.array([1., 2., 3., 4., 5., 6.]))
+    eof2 = np.outer(doys, np.array([10., 20., 30., 40., 50., 60.]))
+    eigenvalues = np.outer(doys, np.array([6., 5., 4., 3., 2., 1.]))
+    explained_variances = eigenvalues / np.sum(eigenvalues, axis=1)[:, np.newaxis]
+    no_obs = doys * 5
+
+    target = eof.EOFDataForAllDOYs.from_arrays(lat, long, eof1, eof2, no_leap_years,
+                                               explained_variances=explained_variances, eigenvalues=eigenvalues,
+                                               no_observations=no_obs)
+    control = eof.EOFDataForAllDOYs([eof.EOFData(lat, long, eof1[idx, :], eof2[idx, :],
+                                                 explained_variances=explained_variances[idx, :],
+                                                 eigenvalues=eigenvalues[idx, :], no_observations=no_obs[idx])
+                                     for idx in range(doys.size)], no_leap_years)
+
+    errors = []
+    if not target.eof_list == control.eof_list:
+        errors.append("EOFs created from arrays differ from EOFs created from list")
+    if not np.all(target.eof1vectors == eof1) or not np.all(target.eof2vectors == eof2):
+        errors.append("EOF arrays incorrect")
+    if not np.all(target.eigenvalues == eigenvalues) or not np.all(target.no_observations == no_obs):
+        errors.append("Eigenvalue or number of observations arrays incorrect")
+    if not np.all(target.explained_variance2_for_all_doys() == explained_variances[:, 1]):
+        errors.append("Explained variance 2 incorrect")
+
+    # the container has its own read-only copies of the data
+    eof1[0, 0] = 1000.
+    if target.eof1vector_for_doy(1)[0] != 1.:
+        errors.append("Container data has been modified from outside")
+    with pytest.raises(ValueError):
+        target.eofdata_for_doy(1).eof1vector[0] = 1000.
+    with pytest.raises(ValueError):
+        target.eigenvalues[0, 0] = 1000.
+    # the arrays of the caller are not made read-only, even if they are referenced by the container
+    eof_list = [eof.EOFData(lat, long, eof1[idx, :], eof2[idx, :]) for idx in range(doys.size)]
+    eof.EOFDataForAllDOYs(eof_list, no_leap_years)
+    if not (eof_list[0].lat.flags.writeable and eof_list[0].long.flags.writeable):
+        errors.append("Arrays of the caller have been made read-only")
+
+    with pytest.raises(ValueError):
+        eof.EOFDataForAllDOYs.from_arrays(lat, long, eof1[1:, :], eof2[1:, :], no_leap_years)
+    with pytest.raises(ValueError):
+        eof.EOFDataForAllDOYs.from_arrays(lat, long, eof1, eof2, no_leap_years, eigenvalues=eigenvalues[:, :1])
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_EOFDataForAllDOYs_incomplete_optional_values(tmp_path):
+    lat = np.array([-10., 0., 10.])
+    long = np.array([0., 5.])
+    eofs = []
+    for doy in range(1, 367):
+        eof1 = np.array([1, 2, 3, 4, 5, 6]) * doy
+        eof2 = np.array([10, 20, 30, 40, 50, 60]) * doy
+        eofs.append(eof.EOFData(lat, long, eof1, eof2))
+
+    errors = []
+
+    # values missing for all DOYs
+    target = eof.EOFDataForAllDOYs(eofs, no_leap_years=False)
+    if target.eigenvalues is not None or target.eigenvalue1_for_all_doys()[0] is not None:
+        errors.append("Missing eigenvalues not represented as None")
+    target.save_all_eofs_to_npzfile(tmp_path / "test.npz")
+    target_reloaded = eof.restore_all_eofs_from_npzfile(tmp_path / "test.npz")
+    if not target_reloaded.eof_list == eofs:
+        errors.append("Reloaded EOFs without eigenvalues incorrect")
+
+    # values missing only for some DOYs
+    eofs[10] = eof.EOFData(lat, long, eofs[10].eof1vector, eofs[10].eof2vector,
+                           eigenvalues=np.array([6., 5., 4., 3., 2., 1.]))
+    with pytest.raises(ValueError) as e:
+        eof.EOFDataForAllDOYs(eofs, no_leap_years=False)
+    if "all DOYs or for none" not in str(e.value):
+        errors.append("Incomplete eigenvalues not detected")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
 def test_save_all_eofs_to_dir(tmp_path):
     lat = np.array([-10., 0., 10.])
     long = np.array([0., 5.])
@@ -760,3 +850,145 @@ def test_load_all_original_eofs_from_directory():
         errors.append("EOF2 of DOY 366 is incorrect (Last position)")
 
     assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def _write_synthetic_original_eofs(dirname):
+    (dirname / "eof1").mkdir(parents=True)
+    (dirname / "eof2").mkdir(parents=True)
+    rng = np.random.default_rng(42)
+    for doy in tools.doy_list(no_leap_years=False):
+        np.savetxt(dirname / "eof1" / ("eof" + str(doy).zfill(3) + ".txt"), rng.standard_normal(17 * 144), fmt="%.9g")
+        np.savetxt(dirname / "eof2" / ("eof" + str(doy).zfill(3) + ".txt"), rng.standard_normal(17 * 144), fmt="%.9g")
+
+
+def test_load_all_original_eofs_from_directory_with_cache(tmp_path):
+    dirname = tmp_path / "orig"
+    _write_synthetic_original_eofs(dirname)
+    cache_dirname = dirname / ".mjoindices_eof_cache"
+
+    errors = []
+    target = eof.load_all_original_eofs_from_directory(dirname, max_workers=4)
+    for doy in [1, 100, 366]:
+        if not target.eofdata_for_doy(doy) == eof.load_original_eofs_for_doy(dirname, doy):
+            errors.append("EOFs of DOY %i differ from single DOY loader" % doy)
+    if cache_dirname.exists():
+        errors.append("Cache should not be created without use_cache")
+
+    cached = eof.load_all_original_eofs_from_directory(dirname, use_cache=True)
+    if not (cache_dirname / "source_files.json").is_file():
+        errors.append("Cache has not been created")
+    if not cached.eof_list == target.eof_list:
+        errors.append("EOFs are incorrect when cache is created")
+
+    reloaded = eof.load_all_original_eofs_from_directory(dirname, use_cache=True)
+    if not reloaded.eof_list == target.eof_list:
+        errors.append("EOFs are incorrect when read from cache")
+    del reloaded
+
+    # an unchanged source directory has to be served from the cache without parsing the text files again
+    marker = np.full((366, 17 * 144), 42.)
+    np.save(cache_dirname / "eof1.npy", marker)
+    mapped = eof.load_all_original_eofs_from_directory(dirname, use_cache=True)
+    if not np.all(mapped.eof1vectors == marker):
+        errors.append("EOFs are not read from the cache")
+
+    # modified source files have to invalidate the cache
+    changed_file = dirname / "eof2" / "eof010.txt"
+    new_values = np.linspace(-1, 1, 17 * 144)
+    np.savetxt(changed_file, new_values, fmt="%.9g")
+    os.utime(changed_file, ns=(0, 0))
+    reloaded = eof.load_all_original_eofs_from_directory(dirname, use_cache=True)
+    if not np.allclose(reloaded.eofdata_for_doy(10).eof2vector, new_values):
+        errors.append("Cache has not been invalidated after modification of a source file")
+    if not reloaded.eofdata_for_doy(11) == target.eofdata_for_doy(11):
+        errors.append("Unmodified EOFs are incorrect after invalidation of the cache")
+    # EOFs restored from the outdated cache are still memory-mapped from its files
+    if not np.all(mapped.eof1vectors == marker):
+        errors.append("Memory-mapped EOFs of the outdated cache have changed")
+    if not sorted(f.name for f in dirname.iterdir() if f.name.startswith(".")) == [".mjoindices_eof_cache"]:
+        errors.append("Temporary cache directories have not been removed")
+    if not eof.load_all_original_eofs_from_directory(dirname, use_cache=True).eof_list == reloaded.eof_list:
+        errors.append("EOFs are incorrect when read from the rewritten cache")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.parametrize('no_leap_years', [False, True])
+def test_load_all_eofs_from_directory_with_cache(tmp_path, no_leap_years):
+    doys = tools.doy_list(no_leap_years)
+    lat = np.array([-10., 0., 10.])
+    long = np.array([0., 5.])
+    eofs = [eof.EOFData(lat, long, np.array([1, 2, 3, 4, 5, 6]) * doy, np.array([10, 20, 30, 40, 50, 60]) * doy)
+            for doy in doys]
+    eof.EOFDataForAllDOYs(eofs, no_leap_years).save_all_eofs_to_dir(tmp_path / "eofs", max_workers=4)
+
+    errors = []
+    for i in range(2):
+        if no_leap_years:
+            with pytest.warns(UserWarning,
+                              match="No EOFs from DOY 366 in directory. Assuming no leap years in dataset."):
+                target = eof.load_all_eofs_from_directory(tmp_path / "eofs", max_workers=2, use_cache=True)
+        else:
+            target = eof.load_all_eofs_from_directory(tmp_path / "eofs", max_workers=2, use_cache=True)
+        if not target.eof_list == eofs:
+            errors.append("List of EOFData objects incorrect (load %i)" % i)
+        if not target.no_leap_years == no_leap_years:
+            errors.append("no_leap_years is incorrect (load %i)" % i)
+    if not (tmp_path / "eofs" / ".mjoindices_eof_cache" / "source_files.json").is_file():
+        errors.append("Cache has not been created")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.parametrize('no_leap_years', [False, True])
+def test_save_all_eofs_to_npy_dir(tmp_path, no_leap_years):
+    doys = tools.doy_list(no_leap_years)
+    lat = np.array([-10., 0., 10.])
+    long = np.array([0., 5.])
+    eof1 = np.outer(doys, np.array([1., 2., 3., 4., 5., 6.]))
+    eof2 = np.outer(doys, np.array([10., 20., 30., 40., 50., 60.]))
+    eigenvalues = np.outer(doys, np.array([6., 5., 4., 3., 2., 1.]))
+    explained_variances = eigenvalues / np.sum(eigenvalues, axis=1)[:, np.newaxis]
+    no_obs = doys * 5
+    target = eof.EOFDataForAllDOYs.from_arrays(lat, long, eof1, eof2, no_leap_years,
+                                               explained_variances=explained_variances, eigenvalues=eigenvalues,
+                                               no_observations=no_obs)
+
+    errors = []
+
+    target.save_all_eofs_to_npy_dir(tmp_path / "eofs")
+    target_reloaded = eof.restore_all_eofs_from_npy_dir(tmp_path / "eofs")
+    if not isinstance(np.load(tmp_path / "eofs" / "eof1.npy", mmap_mode="r"), np.memmap):
+        errors.append("EOF file cannot be memory-mapped")
+    if not target_reloaded.eof_list == target.eof_list:
+        errors.append("Reloaded EOFs incorrect")
+    if not target_reloaded.no_leap_years == no_leap_years:
+        errors.append("Reloaded no_leap_years incorrect")
+
+    # memory-mapped EOFs can be saved into the directory they are mapped from
+    target_reloaded.save_all_eofs_to_npy_dir(tmp_path / "eofs")
+    if not target_reloaded.eof_list == target.eof_list:
+        errors.append("Memory-mapped EOFs changed by saving them into their own directory")
+    if not eof.restore_all_eofs_from_npy_dir(tmp_path / "eofs").eof_list == target.eof_list:
+        errors.append("EOFs saved into their own directory incorrect")
+
+    # truncated spectra in single precision
+    target.save_all_eofs_to_npy_dir(tmp_path / "eofs", no_eigenvalues=3, dtype=np.float32)
+    target_reloaded = eof.restore_all_eofs_from_npy_dir(tmp_path / "eofs", mmap_mode=None)
+    if target_reloaded.eof1vectors.dtype != np.float32 or target_reloaded.eigenvalues.shape != (doys.size, 3):
+        errors.append("Truncated single precision data has wrong type or shape")
+    if not np.allclose(target_reloaded.eof1vectors, eof1) or not np.allclose(target_reloaded.eof2vectors, eof2):
+        errors.append("Reloaded truncated EOFs incorrect")
+    if not np.allclose(target_reloaded.explained_variance2_for_all_doys(), explained_variances[:, 1]):
+        errors.append("Explained variances of truncated spectrum incorrect")
+    reloaded_doy = target_reloaded.eofdata_for_doy(12)
+    if not (np.allclose(reloaded_doy.eigenvalues, np.array([72., 60., 48., 0., 0., 0.]))
+            and reloaded_doy.no_observations == 60):
+        errors.append("Truncated eigenvalues not padded with zeros")
+
+    with pytest.raises(ValueError):
+        target.save_all_eofs_to_npy_dir(tmp_path / "eofs", no_eigenvalues=1)
+    with pytest.raises(ValueError):
+        eof.restore_all_eofs_from_npy_dir(tmp_path)
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
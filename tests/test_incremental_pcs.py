@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2019 Christoph G. Hoffmann. All rights reserved.
+
+# This file is part of mjoindices
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Contact: christoph.hoffmann@uni-greifswald.de
+
+import json
+
+import numpy as np
+import pytest
+
+import mjoindices.empirical_orthogonal_functions as eof
+import mjoindices.olr_handling as olr
+import mjoindices.omi.incremental_pcs as incremental
+import mjoindices.omi.omi_calculator as omi
+import mjoindices.omi.quick_temporal_filter as qfilter
+import mjoindices.omi.wheeler_kiladis_mjo_filter as wkfilter
+
+from helpers_for_unittests.synthetic_data import FINE_LONG, WIDE_LAT, synthetic_eofs, synthetic_olr
+
+
+def _synthetic_olr(start="2011-01-01", end="2013-03-01", seed=42):
+    return synthetic_olr(start, end, np.random.default_rng(seed), lat=WIDE_LAT, long=FINE_LONG, offset=230.)
+
+
+def _synthetic_eofs(seed=1):
+    return synthetic_eofs(np.random.default_rng(seed))
+
+
+def _select_days(olrdata, start, stop=None):
+    return olr.OLRData(olrdata.olr[start:stop], olrdata.time[start:stop], olrdata.lat, olrdata.long)
+
+
+def _pcs_equal(pcs1, pcs2):
+    return (np.array_equal(pcs1.time, pcs2.time) and np.array_equal(pcs1.pc1, pcs2.pc1, equal_nan=True)
+            and np.array_equal(pcs1.pc2, pcs2.pc2, equal_nan=True))
+
+
+def test_incremental_pcs_equal_full_calculation_for_complete_window():
+    testdata = _synthetic_olr()
+    eofs = _synthetic_eofs()
+    no_initial_days = testdata.time.size - 5
+
+    errors = []
+    calculator = incremental.IncrementalPCCalculator(eofs, _select_days(testdata, 0, no_initial_days),
+                                                     filter_window_length=100000, revision_length=10000)
+    control = omi.calculate_pcs_from_olr(testdata, eofs, testdata.time[0], testdata.time[no_initial_days - 1])
+    if not _pcs_equal(calculator.pcs, control):
+        errors.append("Initial PCs differ from complete calculation")
+
+    updated = calculator.add_days(_select_days(testdata, no_initial_days))
+    resampled = olr.interpolate_spatial_grid(testdata, eofs.lat, eofs.long)
+    raw_control = omi.regress_3dim_data_onto_eofs(wkfilter.filter_olr_for_mjo_pc_calculation(resampled), eofs)
+    if not np.array_equal(calculator.pcs.time, testdata.time):
+        errors.append("Time axis of updated PCs is incorrect")
+    if not np.allclose(calculator.pcs.pc1, raw_control.pc1 * calculator.normalization_factor, rtol=0, atol=1e-10):
+        errors.append("PC1 differs from complete calculation")
+    if not np.allclose(calculator.pcs.pc2, raw_control.pc2 * calculator.normalization_factor, rtol=0, atol=1e-10):
+        errors.append("PC2 differs from complete calculation")
+    if not updated.time.size == testdata.time.size:
+        errors.append("Not all days have been revised")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_incremental_pcs_with_trailing_window_and_persistence(tmp_path):
+    testdata = _synthetic_olr()
+    eofs = _synthetic_eofs()
+    window = 400
+    revision = 30
+    no_initial_days = testdata.time.size - 10
+
+    errors = []
+    calculator = incremental.IncrementalPCCalculator(eofs, _select_days(testdata, 0, no_initial_days),
+                                                     filter_window_length=window, revision_length=revision,
+                                                     use_quick_temporal_filter=True)
+    factor = calculator.normalization_factor
+    calculator.save_to_directory(tmp_path / "state")
+
+    previous = calculator.pcs
+    updated = calculator.add_days(_select_days(testdata, no_initial_days, no_initial_days + 1))
+    if not updated.time.size == revision + 1 or not updated.time[-1] == testdata.time[no_initial_days]:
+        errors.append("Period of updated PCs is incorrect")
+    no_kept = no_initial_days - revision
+    if not (np.array_equal(calculator.pcs.pc1[:no_kept], previous.pc1[:no_kept])
+            and np.array_equal(calculator.pcs.pc2[:no_kept], previous.pc2[:no_kept])):
+        errors.append("PCs before the revision period have been changed")
+
+    resampled = olr.interpolate_spatial_grid(_select_days(testdata, no_initial_days + 1 - window, no_initial_days + 1),
+                                             eofs.lat, eofs.long)
+    filtered = qfilter.filter_olr_for_mjo_pc_calculation_1d_spectral_smoothing(resampled)
+    raw_control = omi.regress_3dim_data_onto_eofs(_select_days(filtered, -(revision + 1)), eofs)
+    if not (np.allclose(updated.pc1, raw_control.pc1 * factor, rtol=0, atol=1e-10)
+            and np.allclose(updated.pc2, raw_control.pc2 * factor, rtol=0, atol=1e-10)):
+        errors.append("Updated PCs are not calculated from the trailing filter window")
+
+    calculator.add_days(_select_days(testdata, no_initial_days + 1))
+
+    restored = incremental.restore_from_directory(tmp_path / "state")
+    if not (restored.normalization_factor == factor and restored.filter_window_length == window
+            and restored.revision_length == revision and _pcs_equal(restored.pcs, previous)):
+        errors.append("Restored state differs")
+    restored.add_days(_select_days(testdata, no_initial_days, no_initial_days + 1))
+    restored.add_days(_select_days(testdata, no_initial_days + 1))
+    if not _pcs_equal(restored.pcs, calculator.pcs):
+        errors.append("PCs of restored calculation differ")
+
+    # states of format version 1 do not contain the raw PCs and the ROMI settings
+    metadata_filename = tmp_path / "state" / "metadata.json"
+    with open(metadata_filename, "r") as f:
+        metadata = json.load(f)
+    for key in ("method", "mean_removal_length", "smoothing_length"):
+        del metadata[key]
+    metadata["format_version"] = 1
+    with open(metadata_filename, "w") as f:
+        json.dump(metadata, f)
+    np.savez(tmp_path / "state" / "pcs.npz", time=previous.time, pc1=previous.pc1, pc2=previous.pc2)
+    restored = incremental.restore_from_directory(tmp_path / "state")
+    if not (restored.method == "omi" and _pcs_equal(restored.pcs, previous)):
+        errors.append("State of format version 1 not restored correctly")
+    restored.add_days(_select_days(testdata, no_initial_days, no_initial_days + 1))
+    restored.add_days(_select_days(testdata, no_initial_days + 1))
+    if not _pcs_equal(restored.pcs, calculator.pcs):
+        errors.append("PCs of calculation restored from format version 1 differ")
+
+    metadata["format_version"] = 3
+    with open(metadata_filename, "w") as f:
+        json.dump(metadata, f)
+    with pytest.raises(ValueError):
+        incremental.restore_from_directory(tmp_path / "state")
+    with pytest.raises(ValueError):
+        calculator.add_days(_select_days(testdata, -3))
+    with pytest.raises(ValueError):
+        incremental.restore_from_directory(tmp_path / "missing_state")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_incremental_romi_pcs(tmp_path):
+    testdata = _synthetic_olr(end="2012-03-01")
+    eofs = _synthetic_eofs()
+    no_initial_days = testdata.time.size - 20
+
+    errors = []
+    calculator = incremental.IncrementalPCCalculator(eofs, _select_days(testdata, 0, no_initial_days), method="romi",
+                                                     mean_removal_length=40, smoothing_length=9)
+    calculator.save_to_directory(tmp_path / "state")
+
+    # manual calculation for the complete record
+    resampled = olr.interpolate_spatial_grid(testdata, eofs.lat, eofs.long)
+    anomalies = np.array([resampled.olr[i] - np.mean(resampled.olr[i - 40:i], axis=0)
+                          for i in range(40, testdata.time.size)])
+    raw_control = omi.regress_3dim_data_onto_eofs(olr.OLRData(anomalies, testdata.time[40:], eofs.lat, eofs.long),
+                                                  eofs)
+    smoothed_pc1 = np.convolve(raw_control.pc1, np.ones(9) / 9., mode="valid")
+    smoothed_pc2 = np.convolve(raw_control.pc2, np.ones(9) / 9., mode="valid")
+    no_nan_days = 40 + 8
+    factor = 1 / np.std(smoothed_pc1[:no_initial_days - no_nan_days])
+
+    if not np.isclose(calculator.normalization_factor, factor, rtol=1e-12, atol=0):
+        errors.append("Normalization factor is incorrect")
+    if not (np.all(np.isnan(calculator.pcs.pc1[:no_nan_days]))
+            and not np.any(np.isnan(calculator.pcs.pc1[no_nan_days:]))):
+        errors.append("Days without sufficient history are not NaN")
+    if not np.allclose(calculator.pcs.pc1[no_nan_days:], smoothed_pc1[:no_initial_days - no_nan_days] * factor,
+                       rtol=0, atol=1e-10):
+        errors.append("Initial PC1 is incorrect")
+
+    updated = calculator.add_days(_select_days(testdata, no_initial_days, no_initial_days + 5))
+    calculator.add_days(_select_days(testdata, no_initial_days + 5))
+    if not (np.array_equal(updated.time, testdata.time[no_initial_days:no_initial_days + 5])):
+        errors.append("ROMI mode must not revise previous days")
+    if not np.array_equal(calculator.pcs.time, testdata.time):
+        errors.append("Time axis of updated PCs is incorrect")
+    if not (np.allclose(calculator.pcs.pc1[no_nan_days:], smoothed_pc1 * calculator.normalization_factor, rtol=0,
+                        atol=1e-10)
+            and np.allclose(calculator.pcs.pc2[no_nan_days:], smoothed_pc2 * calculator.normalization_factor,
+                            rtol=0, atol=1e-10)):
+        errors.append("Updated PCs differ from complete calculation")
+
+    restored = incremental.restore_from_directory(tmp_path / "state")
+    if not (restored.method == "romi" and restored.mean_removal_length == 40 and restored.smoothing_length == 9):
+        errors.append("Restored settings differ")
+    restored.add_days(_select_days(testdata, no_initial_days, no_initial_days + 5))
+    restored.add_days(_select_days(testdata, no_initial_days + 5))
+    if not _pcs_equal(restored.pcs, calculator.pcs):
+        errors.append("PCs of restored calculation differ")
+
+    with pytest.raises(ValueError):
+        incremental.IncrementalPCCalculator(eofs, testdata, method="rmm")
+    with pytest.raises(ValueError):
+        incremental.IncrementalPCCalculator(eofs, _select_days(testdata, 0, 45), method="romi")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
@@ -27,6 +27,8 @@ from pathlib import Path
 
 import numpy as np
 import pytest
+import scipy.io
+import netCDF4 as netcdf4
 
 import mjoindices.olr_handling as olr
 
@@ -209,6 +211,274 @@ def test_loadNOAAInterpolatedOLRNetCDF4(use_xarray):
 
 
 
+def _write_synthetic_noaa_olr_file(filename, netcdf4_format):
+    # 10 days, latitude in descending order as in the original NOAA files
+    hours_since1800 = (np.arange(0, 10) + 64000) * 24.
+    lat = np.arange(30., -30.1, -10.)
+    lon = np.arange(0., 359.9, 60.)
+    packed_olr = np.arange(hours_since1800.size * lat.size * lon.size, dtype="int16").reshape(
+        (hours_since1800.size, lat.size, lon.size))
+    if netcdf4_format:
+        f = netcdf4.Dataset(filename, "w")
+        f.createDimension("time", hours_since1800.size)
+        f.createDimension("lat", lat.size)
+        f.createDimension("lon", lon.size)
+        f.createVariable("time", "f8", ("time",))[:] = hours_since1800
+        f.createVariable("lat", "f4", ("lat",))[:] = lat
+        f.createVariable("lon", "f4", ("lon",))[:] = lon
+        f.createVariable("olr", "f4", ("time", "lat", "lon"))[:] = packed_olr / 100. + 327.65
+    else:
+        f = scipy.io.netcdf_file(str(filename), "w")
+        f.createDimension("time", hours_since1800.size)
+        f.createDimension("lat", lat.size)
+        f.createDimension("lon", lon.size)
+        f.createVariable("time", "d", ("time",))[:] = hours_since1800
+        f.createVariable("lat", "f", ("lat",))[:] = lat
+        f.createVariable("lon", "f", ("lon",))[:] = lon
+        f.createVariable("olr", "h", ("time", "lat", "lon"))[:] = packed_olr
+    f.close()
+    dates = np.datetime64("1800-01-01") + (np.arange(0, 10) + 64000).astype("timedelta64[D]")
+    return dates, lat, lon, packed_olr / 100. + 327.65
+
+
+@pytest.mark.parametrize("netcdf4_format", [False, True])
+def test_load_noaa_interpolated_olr_subset_on_read(tmp_path, netcdf4_format):
+    filename = tmp_path / "olr_synthetic.nc"
+    dates, lat, lon, olrmatrix = _write_synthetic_noaa_olr_file(filename, netcdf4_format)
+    if netcdf4_format:
+        loader = olr.load_noaa_interpolated_olr_netcdf4
+    else:
+        loader = olr.load_noaa_interpolated_olr
+
+    errors = []
+
+    target = loader(filename)
+    if not np.all(target.time == dates):
+        errors.append("Time grid of complete file incorrect.")
+    if not np.allclose(target.olr, olrmatrix):
+        errors.append("OLR of complete file incorrect.")
+
+    target = loader(filename, lat_range=(-20., 20.), lon_range=(60., 180.),
+                    time_range=(dates[2], dates[5]))
+    if not np.all(target.time == dates[2:6]):
+        errors.append("Restricted time grid incorrect.")
+    if not np.allclose(target.lat, np.array([20., 10., 0., -10., -20.])):
+        errors.append("Restricted latitude grid incorrect.")
+    if not np.allclose(target.long, np.array([60., 120., 180.])):
+        errors.append("Restricted longitude grid incorrect.")
+    if not np.allclose(target.olr, olrmatrix[2:6, 1:6, 1:4]):
+        errors.append("Restricted OLR data incorrect.")
+
+    # ranges containing a single grid point or day keep the respective axis
+    target = loader(filename, lat_range=(-1., 1.), time_range=(dates[3], dates[3]))
+    if not (target.olr.shape == (1, 1, lon.size) and np.allclose(target.lat, np.array([0.]))):
+        errors.append("Range with single latitude and date incorrect.")
+    if not np.allclose(target.olr[0, 0, :], olrmatrix[3, lat == 0., :]):
+        errors.append("OLR data for single latitude and date incorrect.")
+
+    with pytest.raises(ValueError) as e:
+        loader(filename, lat_range=(40., 50.))
+    if "latitude" not in str(e.value):
+        errors.append("Empty latitude range not detected.")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.parametrize("netcdf4_format", [False, True])
+def test_load_noaa_interpolated_olr_keep_packed(tmp_path, netcdf4_format):
+    filename = tmp_path / "olr_synthetic.nc"
+    dates, lat, lon, olrmatrix = _write_synthetic_noaa_olr_file(filename, netcdf4_format)
+
+    errors = []
+
+    if netcdf4_format:
+        # the synthetic NetCDF4 file contains unpacked float values
+        with pytest.raises(ValueError):
+            olr.load_noaa_interpolated_olr_netcdf4(filename, keep_packed=True)
+    else:
+        target = olr.load_noaa_interpolated_olr(filename, keep_packed=True, time_range=(dates[2], dates[5]))
+        if not target.is_packed or target.packed_olr.dtype != np.int16:
+            errors.append("OLR data is not kept packed.")
+        if not np.allclose(target.olr, olrmatrix[2:6, :, :]):
+            errors.append("Decoded packed OLR data incorrect.")
+        if not np.allclose(target.get_olr_block(np.s_[:, 2, :]), olrmatrix[2:6, 2, :]):
+            errors.append("Decoded block of packed OLR data incorrect.")
+        with pytest.raises(ValueError):
+            olr.load_noaa_interpolated_olr(filename, use_xarray=True, keep_packed=True)
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_load_noaa_interpolated_olr_packing_attributes(tmp_path):
+    errors = []
+
+    # without packing attributes, the data is decoded exactly as by earlier versions
+    filename = tmp_path / "olr_synthetic.nc"
+    dates, lat, lon, olrmatrix = _write_synthetic_noaa_olr_file(filename, False)
+    target = olr.load_noaa_interpolated_olr(filename)
+    if not np.array_equal(target.olr, olrmatrix):
+        errors.append("OLR data of file without packing attributes incorrect.")
+    target = olr.load_noaa_interpolated_olr_from_multiple_files([filename])
+    if not np.array_equal(target.olr, olrmatrix):
+        errors.append("OLR data of file without packing attributes loaded with multi-file loader incorrect.")
+
+    # packed data has to be decoded with the attributes of the file
+    dates = np.datetime64("2000-01-01") + np.arange(0, 5).astype("timedelta64[D]")
+    olrmatrix = 200. + np.arange(0, 45).reshape((5, 3, 3)) * 0.25
+    filename = tmp_path / "olr_packed.nc"
+    f = scipy.io.netcdf_file(str(filename), "w")
+    f.createDimension("time", dates.size)
+    f.createDimension("lat", 3)
+    f.createDimension("lon", 3)
+    f.createVariable("time", "d", ("time",))[:] = (dates - np.datetime64("1800-01-01")).astype("timedelta64[h]").astype("float")
+    f.createVariable("lat", "f", ("lat",))[:] = np.array([10., 0., -10.])
+    f.createVariable("lon", "f", ("lon",))[:] = np.array([0., 120., 240.])
+    olr_variable = f.createVariable("olr", "h", ("time", "lat", "lon"))
+    olr_variable.scale_factor = np.float32(0.25)
+    olr_variable.add_offset = np.float32(200.)
+    olr_variable[:] = np.round((olrmatrix - 200.) / 0.25).astype("int16")
+    f.close()
+    target = olr.load_noaa_interpolated_olr(filename)
+    if not np.allclose(target.olr, olrmatrix):
+        errors.append("OLR data of file with packing attributes incorrect.")
+    target = olr.load_noaa_interpolated_olr(filename, keep_packed=True)
+    if not (target.scale_factor == 0.25 and target.add_offset == 200. and np.allclose(target.olr, olrmatrix)):
+        errors.append("Packed OLR data of file with packing attributes incorrect.")
+    if not np.array_equal(olr.load_noaa_interpolated_olr_from_multiple_files([filename]).olr,
+                          olr.load_noaa_interpolated_olr(filename).olr):
+        errors.append("Single and multi-file loaders return different OLR data.")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.parametrize("netcdf4_format", [False, True])
+def test_load_noaa_interpolated_olr_from_multiple_files(tmp_path, netcdf4_format):
+    complete_filename = tmp_path / "olr_synthetic.nc"
+    dates, lat, lon, olrmatrix = _write_synthetic_noaa_olr_file(complete_filename, netcdf4_format)
+    complete = olr.OLRData(olrmatrix, dates, lat, lon)
+
+    # split the synthetic dataset into 3 files along the time axis
+    for idx, (start, stop) in enumerate([(0, 4), (4, 7), (7, 10)]):
+        part = olr.restrict_time_coverage(complete, dates[start], dates[stop - 1])
+        _write_olr_data_to_netcdf_file(tmp_path / ("olr_part%i.nc" % idx), part, netcdf4_format)
+
+    errors = []
+
+    target = olr.load_noaa_interpolated_olr_from_multiple_files(str(tmp_path / "olr_part*.nc"), max_workers=2)
+    if not target.close(complete):
+        errors.append("Data loaded with glob pattern incorrect.")
+
+    # order of files does not matter
+    target = olr.load_noaa_interpolated_olr_from_multiple_files([tmp_path / "olr_part2.nc",
+                                                                 tmp_path / "olr_part0.nc",
+                                                                 tmp_path / "olr_part1.nc"])
+    if not target.close(complete):
+        errors.append("Data loaded from unordered file list incorrect.")
+
+    target = olr.load_noaa_interpolated_olr_from_multiple_files(str(tmp_path / "olr_part*.nc"),
+                                                                lat_range=(-10., 10.),
+                                                                time_range=(dates[5], dates[8]))
+    if not np.all(target.time == dates[5:9]):
+        errors.append("Restricted time grid incorrect.")
+    if not np.allclose(target.olr, olrmatrix[5:9, 2:5, :]):
+        errors.append("Restricted OLR data incorrect.")
+
+    with pytest.raises(ValueError) as e:
+        olr.load_noaa_interpolated_olr_from_multiple_files([tmp_path / "olr_part0.nc", tmp_path / "olr_part2.nc"])
+    if "not continuous" not in str(e.value):
+        errors.append("Gap between files not detected.")
+
+    other_grid = olr.OLRData(complete.olr[:, :, 1:], dates, lat, lon[1:])
+    _write_olr_data_to_netcdf_file(tmp_path / "olr_other_grid.nc", other_grid, netcdf4_format)
+    with pytest.raises(ValueError) as e:
+        olr.load_noaa_interpolated_olr_from_multiple_files([tmp_path / "olr_part0.nc",
+                                                            tmp_path / "olr_other_grid.nc"])
+    if "Longitude grid" not in str(e.value):
+        errors.append("Inconsistent grids not detected.")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.parametrize("netcdf4_format", [False, True])
+def test_iterate_noaa_interpolated_olr_chunks(tmp_path, netcdf4_format):
+    complete_filename = tmp_path / "olr_synthetic.nc"
+    dates, lat, lon, olrmatrix = _write_synthetic_noaa_olr_file(complete_filename, netcdf4_format)
+    complete = olr.OLRData(olrmatrix, dates, lat, lon)
+    for idx, (start, stop) in enumerate([(0, 4), (4, 7), (7, 10)]):
+        part = olr.restrict_time_coverage(complete, dates[start], dates[stop - 1])
+        _write_olr_data_to_netcdf_file(tmp_path / ("olr_part%i.nc" % idx), part, netcdf4_format)
+
+    errors = []
+
+    # chunks crossing the boundaries of the files
+    chunks = list(olr.iterate_noaa_interpolated_olr_chunks(str(tmp_path / "olr_part*.nc"), chunk_length=3))
+    if not [chunk.time.size for chunk in chunks] == [3, 3, 3, 1]:
+        errors.append("Chunk lengths incorrect.")
+    if not np.all(np.concatenate([chunk.time for chunk in chunks]) == dates):
+        errors.append("Time grid of chunks incorrect.")
+    if not np.allclose(np.concatenate([chunk.olr for chunk in chunks]), olrmatrix):
+        errors.append("OLR data of chunks incorrect.")
+
+    chunks = list(olr.iterate_noaa_interpolated_olr_chunks(str(tmp_path / "olr_part*.nc"), chunk_length=2,
+                                                           lat_range=(-10., 10.), time_range=(dates[5], dates[8])))
+    if not np.all(np.concatenate([chunk.time for chunk in chunks]) == dates[5:9]):
+        errors.append("Restricted time grid of chunks incorrect.")
+    if not np.allclose(np.concatenate([chunk.olr for chunk in chunks]), olrmatrix[5:9, 2:5, :]):
+        errors.append("Restricted OLR data of chunks incorrect.")
+
+    # inconsistent files are detected before reading the first chunk
+    with pytest.raises(ValueError):
+        olr.iterate_noaa_interpolated_olr_chunks([tmp_path / "olr_part0.nc", tmp_path / "olr_part2.nc"])
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_iterate_time_chunks(tmp_path):
+    time = np.arange("2018-01-01", "2018-01-11", dtype='datetime64[D]')
+    lat = np.array([-2.5, 0., 2.5])
+    long = np.array([10., 20., 30., 40.])
+    olrmatrix = np.random.default_rng(1).uniform(150., 300., (time.size, lat.size, long.size))
+    testdata = olr.OLRData(olrmatrix, time, lat, long)
+    testdata.save_to_directory(tmp_path / "olr")
+
+    errors = []
+    for data in (testdata, olr.restore_from_directory(tmp_path / "olr"), olr.pack_olr_data(testdata)):
+        chunks = list(olr.iterate_time_chunks(data, 4))
+        if not [chunk.time.size for chunk in chunks] == [4, 4, 2]:
+            errors.append("Chunk lengths incorrect.")
+        if not np.all(np.concatenate([chunk.time for chunk in chunks]) == time):
+            errors.append("Time grid of chunks incorrect.")
+        if not np.array_equal(np.concatenate([chunk.olr for chunk in chunks]), data.olr):
+            errors.append("OLR data of chunks incorrect.")
+        if not all(chunk.is_packed == data.is_packed for chunk in chunks):
+            errors.append("Packing of chunks incorrect.")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+def _write_olr_data_to_netcdf_file(filename, olrdata, netcdf4_format):
+    hours_since1800 = (olrdata.time - np.datetime64("1800-01-01")).astype("timedelta64[h]").astype("float")
+    if netcdf4_format:
+        f = netcdf4.Dataset(filename, "w")
+        datatypes = ("f8", "f4", "f8")
+    else:
+        f = scipy.io.netcdf_file(str(filename), "w")
+        datatypes = ("d", "f", "h")
+    f.createDimension("time", olrdata.time.size)
+    f.createDimension("lat", olrdata.lat.size)
+    f.createDimension("lon", olrdata.long.size)
+    f.createVariable("time", datatypes[0], ("time",))[:] = hours_since1800
+    f.createVariable("lat", datatypes[1], ("lat",))[:] = olrdata.lat
+    f.createVariable("lon", datatypes[1], ("lon",))[:] = olrdata.long
+    olr_variable = f.createVariable("olr", datatypes[2], ("time", "lat", "lon"))
+    if netcdf4_format:
+        olr_variable[:] = olrdata.olr
+    else:
+        olr_variable.scale_factor = 0.01
+        olr_variable.add_offset = 327.65
+        olr_variable[:] = np.round((olrdata.olr - 327.65) * 100.).astype("int16")
+    f.close()
+
+
 @pytest.mark.skipif(not os.path.isfile(olr_data_filename),
                     reason="OLR data file not available")
 def test_resampleOLRToOriginalSpatialGrid():
@@ -367,6 +637,100 @@ def test_save_to_npzfile_restore_from_npzfile(tmp_path):
     assert not errors, "errors occurred:\n{}".format("\n".join(errors))
 
 
+def test_save_to_directory_restore_from_directory(tmp_path):
+    dirname = tmp_path / "OLRSaveTest"
+    time = np.arange("2018-01-01", "2019-01-10", dtype='datetime64[D]')
+    lat = np.array([-2.5, 2.5])
+    long = np.array([10, 20, 30, 40])
+    olrmatrix = np.random.rand(time.size, 2, 4)
+    testdata = olr.OLRData(olrmatrix, time, lat, long)
+    testdata.save_to_directory(dirname)
+
+    errors = []
+
+    target = olr.restore_from_directory(dirname)
+    if not isinstance(target.olr, np.memmap):
+        errors.append("OLR data is not memory-mapped")
+    if not target == testdata:
+        errors.append("Restored memory-mapped data incorrect")
+    if not np.all(target.extract_olr_matrix_for_doy_range(4, 2) == testdata.extract_olr_matrix_for_doy_range(4, 2)):
+        errors.append("DOY window of memory-mapped data incorrect")
+    if not np.all(target.get_olr_for_date(np.datetime64("2018-06-01")) == olrmatrix[151, :, :]):
+        errors.append("OLR for single date of memory-mapped data incorrect")
+
+    target = olr.restore_from_directory(dirname, mmap_mode=None)
+    if isinstance(target.olr, np.memmap):
+        errors.append("OLR data should not be memory-mapped")
+    if not target == testdata:
+        errors.append("Restored data incorrect")
+
+    # data memory-mapped from the directory can be saved into the same directory
+    target = olr.restore_from_directory(dirname)
+    target.save_to_directory(dirname)
+    if not target == testdata:
+        errors.append("Memory-mapped data changed by saving it into its own directory")
+    if not olr.restore_from_directory(dirname) == testdata:
+        errors.append("Data saved into its own directory incorrect")
+    if sorted(f.name for f in dirname.iterdir()) != ["lat.npy", "long.npy", "metadata.json", "olr.npy", "time.npy"]:
+        errors.append("Unexpected files in directory")
+
+    with pytest.raises(ValueError):
+        olr.restore_from_directory(tmp_path)
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_pack_olr_data(tmp_path):
+    time = np.arange("2018-01-01", "2019-01-10", dtype='datetime64[D]')
+    lat = np.array([-2.5, 2.5])
+    long = np.array([10, 20, 30, 40])
+    olrmatrix = 150. + 150. * np.random.rand(time.size, 2, 4)
+    testdata = olr.OLRData(olrmatrix, time, lat, long)
+    target = olr.pack_olr_data(testdata)
+
+    errors = []
+
+    if not target.is_packed or target.packed_olr.dtype != np.int16:
+        errors.append("Data is not packed as int16")
+    if testdata.is_packed or testdata.packed_olr is not None:
+        errors.append("Unpacked data reported as packed")
+    if not np.allclose(target.olr, olrmatrix, rtol=0., atol=0.005 + 1e-10):
+        errors.append("Decoded data deviates by more than the packing resolution")
+    if not np.isclose(target.mean_olr(), np.mean(target.olr)):
+        errors.append("Mean of packed data incorrect")
+    if not np.all(target.get_olr_for_date(np.datetime64("2018-06-01")) == target.olr[151, :, :]):
+        errors.append("OLR for single date of packed data incorrect")
+    if not np.all(target.extract_olr_matrix_for_doy_range(4, 2) == target.olr[np.r_[1:6, 366:371], :, :]):
+        errors.append("DOY window of packed data incorrect")
+
+    restricted = olr.restrict_time_coverage(target, np.datetime64("2018-02-01"), np.datetime64("2018-02-10"))
+    if not restricted.is_packed or not np.all(restricted.olr == target.olr[31:41, :, :]):
+        errors.append("Restricted data is not packed or incorrect")
+
+    target.save_to_npzfile(tmp_path / "packed.npz")
+    restored = olr.restore_from_npzfile(tmp_path / "packed.npz")
+    if not restored.is_packed or not restored == target:
+        errors.append("Packed data restored from npz file incorrect")
+
+    target.save_to_directory(tmp_path / "packed")
+    restored = olr.restore_from_directory(tmp_path / "packed")
+    if not restored.is_packed or not isinstance(restored.packed_olr, np.memmap) or not restored == target:
+        errors.append("Packed data restored from directory incorrect")
+
+    with pytest.raises(ValueError):
+        olr.pack_olr_data(olr.OLRData(olrmatrix + 1000., time, lat, long))
+    nan_olrmatrix = olrmatrix.copy()
+    nan_olrmatrix[1, 0, 0] = np.nan
+    with pytest.raises(ValueError) as e:
+        olr.pack_olr_data(olr.OLRData(nan_olrmatrix, time, lat, long))
+    if "NaN" not in str(e.value):
+        errors.append("NaN values not detected")
+    with pytest.raises(ValueError):
+        olr.OLRData(olrmatrix, time, lat, long, scale_factor=0.01)
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
 def test_get_olr_for_date():
     time = np.arange("2018-01-01", "2018-01-04", dtype='datetime64[D]')
     lat = np.array([-2.5, 2.5])
@@ -29,11 +29,14 @@ import pytest
 import importlib
 
 import mjoindices.omi.omi_calculator as omi
+import mjoindices.omi.quick_temporal_filter as qfilter
 import mjoindices.principal_components as pc
 import mjoindices.empirical_orthogonal_functions as eof
 import mjoindices.evaluation_tools
 import mjoindices.olr_handling as olr
 
+from helpers_for_unittests.synthetic_data import FINE_LONG, LONG, WIDE_LAT, synthetic_eofs, synthetic_olr
+
 olr_data_filename = Path(os.path.abspath('')) / "testdata" / "olr.day.mean.nc"
 originalOMIDataDirname = Path(os.path.abspath('')) / "testdata" / "OriginalOMI"
 eof1Dirname = originalOMIDataDirname / "eof1"
@@ -664,3 +667,308 @@ def test_initiate_eof_post_processing():
 
     
     assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_calc_eofs_and_regression_single_precision():
+    testdata = synthetic_olr("2010-01-01", "2013-01-01", np.random.default_rng(42))
+
+    errors = []
+
+    eofs = []
+    for dtype in (np.float64, np.float32):
+        eofs.append(eof.EOFDataForAllDOYs([omi.calc_eofs_for_doy(testdata, doy, dtype=dtype) for doy in range(1, 367)],
+                                          no_leap_years=False))
+    control, target = eofs
+    if target.eofdata_for_doy(1).eof1vector.dtype != np.float32:
+        errors.append("EOFs not computed in single precision")
+    for doy in range(1, 367):
+        for control_vec, target_vec in ((control.eof1vector_for_doy(doy), target.eof1vector_for_doy(doy)),
+                                        (control.eof2vector_for_doy(doy), target.eof2vector_for_doy(doy))):
+            # the signs of eigenvectors are arbitrary
+            if not np.allclose(control_vec, np.sign(np.dot(control_vec, target_vec)) * target_vec, rtol=0., atol=1e-4):
+                errors.append("Single precision EOFs deviate too much for DOY %i" % doy)
+    if not np.allclose(control.explained_variance1_for_all_doys(), target.explained_variance1_for_all_doys(),
+                       rtol=0., atol=1e-5):
+        errors.append("Single precision explained variances deviate too much")
+
+    control_pcs = omi.regress_3dim_data_onto_eofs(testdata, control)
+    target_pcs = omi.regress_3dim_data_onto_eofs(testdata, control, dtype=np.float32)
+    if target_pcs.pc1.dtype != np.float32:
+        errors.append("PCs not computed in single precision")
+    if not (np.allclose(control_pcs.pc1, target_pcs.pc1, rtol=1e-4, atol=1e-3)
+            and np.allclose(control_pcs.pc2, target_pcs.pc2, rtol=1e-4, atol=1e-3)):
+        errors.append("Single precision PCs deviate too much")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_calc_eofs_from_preprocessed_olr_with_checkpoints(tmp_path, monkeypatch):
+    rng = np.random.default_rng(42)
+    time = np.arange("2011-01-01", "2013-01-01", dtype='datetime64[D]')
+    lat = np.array([-5., 0., 5.])
+    long = np.arange(0., 359.9, 30.)
+    testdata = olr.OLRData(rng.standard_normal((time.size, lat.size, long.size)), time, lat, long)
+    checkpoint_dirname = tmp_path / "checkpoints"
+
+    errors = []
+
+    control = omi.calc_eofs_from_preprocessed_olr(testdata)
+    target = omi.calc_eofs_from_preprocessed_olr(testdata, checkpoint_dirname=checkpoint_dirname, max_workers=4)
+    if not target.eof_list == control.eof_list:
+        errors.append("EOFs calculated with checkpoints and several threads differ")
+    if not len(list(checkpoint_dirname.glob("doy*.npz"))) == 366:
+        errors.append("Checkpoints have not been saved for all DOYs")
+
+    # simulate an interrupted calculation
+    for doy in (5, 100, 366):
+        (checkpoint_dirname / ("doy%s.npz" % format(doy, '03'))).unlink()
+    calculated_doys = []
+    original_calc_eofs_for_doy = omi.calc_eofs_for_doy
+
+    def counting_calc_eofs_for_doy(olrdata, doy, **kwargs):
+        calculated_doys.append(doy)
+        return original_calc_eofs_for_doy(olrdata, doy, **kwargs)
+    monkeypatch.setattr(omi, "calc_eofs_for_doy", counting_calc_eofs_for_doy)
+
+    target = omi.calc_eofs_from_preprocessed_olr(testdata, checkpoint_dirname=checkpoint_dirname, resume=True)
+    if not sorted(calculated_doys) == [5, 100, 366]:
+        errors.append("Only the missing DOYs should have been calculated when resuming")
+    if not target.eof_list == control.eof_list:
+        errors.append("EOFs calculated with resumed calculation differ")
+
+    with pytest.raises(ValueError) as e:
+        omi.calc_eofs_from_preprocessed_olr(testdata, checkpoint_dirname=checkpoint_dirname, resume=True,
+                                            leap_year_treatment="strict")
+    if "different input data or settings" not in str(e.value):
+        errors.append("Checkpoints for different settings not detected")
+    modified_data = olr.OLRData(testdata.olr + 1e-3, time, lat, long)
+    with pytest.raises(ValueError) as e:
+        omi.calc_eofs_from_preprocessed_olr(modified_data, checkpoint_dirname=checkpoint_dirname, resume=True)
+    if "different input data or settings" not in str(e.value):
+        errors.append("Checkpoints for different input data not detected")
+
+    calculated_doys.clear()
+    omi.calc_eofs_from_preprocessed_olr(testdata, checkpoint_dirname=checkpoint_dirname, resume=False)
+    if not len(calculated_doys) == 366:
+        errors.append("Existing checkpoints should have been discarded without resume")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_doy_covariance_accumulators(tmp_path):
+    testdata = synthetic_olr("2011-01-01", "2015-01-01", np.random.default_rng(42))
+
+    def eofs_equal(eofs1, eofs2):
+        for doy in range(1, 367):
+            for vec1, vec2 in ((eofs1.eof1vector_for_doy(doy), eofs2.eof1vector_for_doy(doy)),
+                               (eofs1.eof2vector_for_doy(doy), eofs2.eof2vector_for_doy(doy))):
+                # the signs of eigenvectors are arbitrary
+                if not np.allclose(vec1, np.sign(np.dot(vec1, vec2)) * vec2, rtol=0., atol=1e-8):
+                    return False
+            if not (np.allclose(eofs1.eofdata_for_doy(doy).eigenvalues, eofs2.eofdata_for_doy(doy).eigenvalues,
+                                rtol=1e-10, atol=1e-10)
+                    and eofs1.eofdata_for_doy(doy).no_observations == eofs2.eofdata_for_doy(doy).no_observations):
+                return False
+        return True
+
+    errors = []
+
+    accumulators = omi.calc_doy_covariance_accumulators(testdata)
+    if not np.array_equal(accumulators.years, np.array([2011, 2012, 2013, 2014])):
+        errors.append("Years of accumulators are incorrect")
+    target = accumulators.calc_eofs(eofs_postprocessing_type=None, max_workers=2)
+    if not eofs_equal(target, omi.calc_eofs_from_preprocessed_olr(testdata)):
+        errors.append("EOFs for all years differ from complete calculation")
+
+    subset = olr.OLRData(testdata.olr[365:365 + 731], testdata.time[365:365 + 731], testdata.lat, testdata.long)
+    target = accumulators.calc_eofs(years=[2012, 2013], eofs_postprocessing_type=None)
+    if not eofs_equal(target, omi.calc_eofs_from_preprocessed_olr(subset)):
+        errors.append("EOFs for subset of years differ from complete calculation")
+
+    loyo = accumulators.calc_leave_one_year_out_eofs(eofs_postprocessing_type=None)
+    if not sorted(loyo.keys()) == [2011, 2012, 2013, 2014]:
+        errors.append("Left-out years are incorrect")
+    if not eofs_equal(loyo[2011], accumulators.calc_eofs(exclude_years=[2011], eofs_postprocessing_type=None)):
+        errors.append("Leave-one-year-out EOFs differ")
+
+    stored = omi.calc_doy_covariance_accumulators(testdata, dirname=tmp_path / "accumulators")
+    restored = omi.restore_doy_covariance_accumulators(tmp_path / "accumulators")
+    if not len(list((tmp_path / "accumulators").glob("covariance_doy*.npy"))) == 366:
+        errors.append("Accumulators have not been stored for all DOYs")
+    control = accumulators.calc_eofs(years=[2012, 2013]).eof_list
+    if not (np.array_equal(restored.counts, accumulators.counts) and stored.calc_eofs(years=[2012, 2013]).eof_list
+            == control and restored.calc_eofs(years=[2012, 2013]).eof_list == control):
+        errors.append("EOFs from stored accumulators differ")
+
+    with pytest.raises(ValueError):
+        omi.calc_doy_covariance_accumulators(testdata, leap_year_treatment="strict")
+    with pytest.raises(ValueError):
+        accumulators.calc_eofs(years=[2010])
+    with pytest.raises(ValueError):
+        omi.restore_doy_covariance_accumulators(tmp_path / "missing")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_calculate_pcs_from_olr_chunks():
+    rng = np.random.default_rng(42)
+    testdata = synthetic_olr("2001-01-01", "2005-01-01", rng, lat=WIDE_LAT, long=FINE_LONG, offset=230.)
+    time = testdata.time
+    eofs = synthetic_eofs(rng)
+    overlap = 365
+
+    errors = []
+
+    control = omi.calculate_pcs_from_olr(testdata, eofs, time[0], time[-1], use_quick_temporal_filter=True)
+
+    # with an overlap covering the complete record, all PCs are calculated from one filter window
+    target = omi.calculate_pcs_from_olr_chunks(olr.iterate_time_chunks(testdata, 200), eofs, overlap=10000,
+                                               use_quick_temporal_filter=True)
+    if not (np.array_equal(target.time, control.time) and np.allclose(target.pc1, control.pc1, rtol=0, atol=1e-12)
+            and np.allclose(target.pc2, control.pc2, rtol=0, atol=1e-12)):
+        errors.append("PCs calculated from one window differ from complete calculation")
+
+    raw_chunks = list(omi.iterate_raw_pcs_from_olr_chunks(olr.iterate_time_chunks(testdata, 200), eofs,
+                                                          overlap=overlap, use_quick_temporal_filter=True))
+    if not np.array_equal(np.concatenate([chunk.time for chunk in raw_chunks]), time):
+        errors.append("Time axes of the emitted chunks are incorrect")
+    # the first PCs are emitted as soon as enough data for the overlap after them is available
+    if not raw_chunks[0].time.size == 400 - overlap:
+        errors.append("First chunk has not been emitted as early as possible")
+    first_window = olr.interpolate_spatial_grid(olr.restrict_time_coverage(testdata, time[0], time[399]),
+                                                eofs.lat, eofs.long)
+    first_control = omi.regress_3dim_data_onto_eofs(
+        olr.restrict_time_coverage(
+            qfilter.filter_olr_for_mjo_pc_calculation_1d_spectral_smoothing(first_window),
+            time[0], time[400 - overlap - 1]),
+        eofs)
+    if not np.array_equal(raw_chunks[0].pc1, first_control.pc1):
+        errors.append("First chunk is not calculated from the correct filter window")
+
+    # away from the edges of the record, the chunked calculation agrees with the complete calculation
+    target = omi.calculate_pcs_from_olr_chunks(olr.iterate_time_chunks(testdata, 200), eofs, overlap=overlap,
+                                               use_quick_temporal_filter=True)
+    interior = np.s_[overlap:-overlap]
+    if not (np.allclose(target.pc1[interior], control.pc1[interior], rtol=0, atol=0.15)
+            and np.allclose(target.pc2[interior], control.pc2[interior], rtol=0, atol=0.15)):
+        errors.append("Chunked calculation deviates too much from complete calculation")
+
+    with pytest.raises(ValueError):
+        chunks = list(olr.iterate_time_chunks(testdata, 200))
+        omi.calculate_pcs_from_olr_chunks([chunks[0], chunks[2]], eofs, use_quick_temporal_filter=True)
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+@pytest.mark.parametrize("use_quick_temporal_filter", [True, False])
+def test_calculate_pcs_from_olr_fused_projection(use_quick_temporal_filter):
+    rng = np.random.default_rng(42)
+    testdata = synthetic_olr("2011-01-01", "2013-01-01", rng, lat=WIDE_LAT, long=FINE_LONG, offset=230.)
+    time = testdata.time
+    eofs = synthetic_eofs(rng)
+
+    errors = []
+    for dtype, tolerance in ((np.float64, 1e-12), (np.float32, 1e-5)):
+        control = omi.calculate_pcs_from_olr(testdata, eofs, time[10], time[-10],
+                                             use_quick_temporal_filter=use_quick_temporal_filter, dtype=dtype)
+        target = omi.calculate_pcs_from_olr(testdata, eofs, time[10], time[-10],
+                                            use_quick_temporal_filter=use_quick_temporal_filter, dtype=dtype,
+                                            fused_projection=True)
+        if not np.array_equal(target.time, control.time):
+            errors.append("Time axis of fused calculation is incorrect")
+        if target.pc1.dtype != dtype:
+            errors.append("PCs of fused calculation are not of type %s" % str(np.dtype(dtype)))
+        if not (np.allclose(target.pc1, control.pc1, rtol=0, atol=tolerance)
+                and np.allclose(target.pc2, control.pc2, rtol=0, atol=tolerance)):
+            errors.append("PCs of fused calculation in %s differ" % str(np.dtype(dtype)))
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def _synthetic_olr_ensemble(no_members, seed=42):
+    rng = np.random.default_rng(seed)
+    return [synthetic_olr("2011-01-01", "2012-07-01", rng, lat=WIDE_LAT, long=FINE_LONG, offset=230.,
+                          time_shift=5 * imember) for imember in range(no_members)]
+
+
+@pytest.mark.parametrize("use_quick_temporal_filter", [True, False])
+def test_calculate_pcs_from_olr_ensemble(use_quick_temporal_filter):
+    members = _synthetic_olr_ensemble(3)
+    time = members[0].time
+    eofs = synthetic_eofs(np.random.default_rng(1))
+
+    errors = []
+    targets = omi.calculate_pcs_from_olr_ensemble(members, eofs, period_start=time[5], period_end=time[-5],
+                                                  use_quick_temporal_filter=use_quick_temporal_filter)
+    if not len(targets) == len(members):
+        errors.append("Number of PC results does not match number of members")
+    for imember, (member, target) in enumerate(zip(members, targets)):
+        control = omi.calculate_pcs_from_olr(member, eofs, time[5], time[-5],
+                                             use_quick_temporal_filter=use_quick_temporal_filter)
+        if not np.array_equal(target.time, control.time):
+            errors.append("Time axis of member %i is incorrect" % imember)
+        if not (np.allclose(target.pc1, control.pc1, rtol=0, atol=1e-12)
+                and np.allclose(target.pc2, control.pc2, rtol=0, atol=1e-12)):
+            errors.append("PCs of member %i differ from single calculation" % imember)
+
+    stacked = np.stack([member.olr for member in members])
+    stacked_targets = omi.calculate_pcs_from_olr_ensemble(stacked, eofs, time=time, lat=members[0].lat,
+                                                          long=members[0].long, period_start=time[5],
+                                                          period_end=time[-5],
+                                                          use_quick_temporal_filter=use_quick_temporal_filter,
+                                                          normalization_factor=2., max_workers=2)
+    for imember, (target, stacked_target) in enumerate(zip(targets, stacked_targets)):
+        # only the normalization differs
+        raw_pc1 = stacked_target.pc1 / 2.
+        if not np.allclose(raw_pc1 / np.std(raw_pc1), target.pc1, rtol=0, atol=1e-12):
+            errors.append("PCs of member %i computed from array in several processes differ" % imember)
+
+    # packed members are decoded member by member
+    packed_targets = omi.calculate_pcs_from_olr_ensemble([olr.pack_olr_data(member) for member in members], eofs,
+                                                         period_start=time[5], period_end=time[-5],
+                                                         use_quick_temporal_filter=use_quick_temporal_filter)
+    for imember, (target, packed_target) in enumerate(zip(targets, packed_targets)):
+        if not (np.allclose(packed_target.pc1, target.pc1, rtol=0, atol=1e-2)
+                and np.allclose(packed_target.pc2, target.pc2, rtol=0, atol=1e-2)):
+            errors.append("PCs of packed member %i differ" % imember)
+
+    with pytest.raises(ValueError):
+        omi.calculate_pcs_from_olr_ensemble(stacked, eofs)
+    with pytest.raises(ValueError) as e:
+        omi.calculate_pcs_from_olr_ensemble(members, eofs, period_start=time[-1] + np.timedelta64(1, "D"))
+    if "No OLR data within specified period found" not in str(e.value):
+        errors.append("Empty period not detected")
+    shifted = olr.OLRData(members[1].olr, time + np.timedelta64(1, "D"), members[1].lat, members[1].long)
+    with pytest.raises(ValueError):
+        omi.calculate_pcs_from_olr_ensemble([members[0], shifted], eofs)
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_calculate_pcs_from_olr_for_multiple_eofs():
+    rng = np.random.default_rng(42)
+    testdata = synthetic_olr("2013-01-01", "2015-01-01", rng, lat=WIDE_LAT, long=FINE_LONG, offset=230.)
+    time = testdata.time
+    eof_sets = {"variant_a": synthetic_eofs(rng),
+                "variant_b": synthetic_eofs(rng),
+                "no_leap_years": synthetic_eofs(rng, no_leap_years=True)}
+
+    errors = []
+    targets = omi.calculate_pcs_from_olr_for_multiple_eofs(testdata, eof_sets, time[10], time[-10],
+                                                           use_quick_temporal_filter=True)
+    if not list(targets.keys()) == list(eof_sets.keys()):
+        errors.append("Keys of result do not match keys of EOF sets")
+    for name, eofs in eof_sets.items():
+        control = omi.calculate_pcs_from_olr(testdata, eofs, time[10], time[-10], use_quick_temporal_filter=True)
+        if not np.array_equal(targets[name].time, control.time):
+            errors.append("Time axis of PCs for %s is incorrect" % name)
+        if not (np.allclose(targets[name].pc1, control.pc1, rtol=0, atol=1e-12)
+                and np.allclose(targets[name].pc2, control.pc2, rtol=0, atol=1e-12)):
+            errors.append("PCs for %s differ from single calculation" % name)
+
+    other_grid = synthetic_eofs(rng, long=LONG + 1.)
+    with pytest.raises(ValueError):
+        omi.calculate_pcs_from_olr_for_multiple_eofs(testdata, {"a": eof_sets["variant_a"], "b": other_grid},
+                                                     time[10], time[-10], use_quick_temporal_filter=True)
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2019 Christoph G. Hoffmann. All rights reserved.
+
+# This file is part of mjoindices
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Contact: christoph.hoffmann@uni-greifswald.de
+
+import numpy as np
+import pytest
+
+import mjoindices.olr_handling as olr
+import mjoindices.phase_composites as composites
+import mjoindices.principal_components as pc
+
+
+def _synthetic_data(seed=42):
+    rng = np.random.default_rng(seed)
+    time = np.arange("2010-01-01", "2012-01-01", dtype="datetime64[D]")
+    lat = np.array([-10., 0., 10.])
+    long = np.arange(0., 359.9, 30.)
+    olrdata = olr.OLRData(230. + 10. * rng.standard_normal((time.size, lat.size, long.size)), time, lat, long)
+    pcs = pc.PCData(time, 1.2 * rng.standard_normal(time.size), 1.2 * rng.standard_normal(time.size))
+    return olrdata, pcs
+
+
+def test_phase_composites():
+    olrdata, pcs = _synthetic_data()
+    seasons = {"NDJFMA": (11, 12, 1, 2, 3, 4), "MJJ": (5, 6, 7)}
+
+    errors = []
+    target = composites.PhaseCompositeAccumulator((3, 12), seasons=seasons, amplitude_threshold=1.)
+    target.add_olr(olrdata, pcs, chunk_length=100)
+
+    # straightforward calculation for one season and phase
+    months = olrdata.time.astype("datetime64[M]").astype(int) % 12 + 1
+    phase = pcs.calc_phase()
+    amplitude = pcs.calc_amplitude()
+    summer = np.isin(months, (5, 6, 7))
+    selection = summer & (amplitude > 1.) & (phase == 3)
+    if not np.allclose(target.mean()[1, 3], np.mean(olrdata.olr[selection], axis=0), rtol=0, atol=1e-10):
+        errors.append("Mean of composite is incorrect")
+    if not np.allclose(target.std()[1, 3], np.std(olrdata.olr[selection], axis=0, ddof=1), rtol=0, atol=1e-8):
+        errors.append("Standard deviation of composite is incorrect")
+    selection = summer & (amplitude <= 1.)
+    if not np.allclose(target.mean()[1, 0], np.mean(olrdata.olr[selection], axis=0), rtol=0, atol=1e-10):
+        errors.append("Mean of inactive days is incorrect")
+    if not np.sum(target.counts) == np.sum(np.isin(months, (11, 12, 1, 2, 3, 4, 5, 6, 7))):
+        errors.append("Days not assigned to the correct categories")
+    if not target.mean().shape == (2, 9, 3, 12):
+        errors.append("Shape of composites is incorrect")
+
+    # partial accumulators can be merged
+    first = composites.PhaseCompositeAccumulator((3, 12), seasons=seasons)
+    first.add(olrdata.olr[:300], olrdata.time[:300], pcs)
+    second = composites.PhaseCompositeAccumulator((3, 12), seasons=seasons)
+    second.add(olrdata.olr[300:], olrdata.time[300:], pcs)
+    first.merge(second)
+    if not (np.array_equal(first.counts, target.counts)
+            and np.allclose(first.mean(), target.mean(), rtol=0, atol=1e-10)):
+        errors.append("Merged composites differ")
+
+    # days with undefined PCs are ignored and empty categories are NaN
+    nan_pcs = pc.PCData(pcs.time, np.full(pcs.time.size, np.nan), pcs.pc2)
+    empty = composites.PhaseCompositeAccumulator((3, 12))
+    empty.add_olr(olrdata, nan_pcs)
+    if not (np.sum(empty.counts) == 0 and np.all(np.isnan(empty.mean()))):
+        errors.append("Undefined PCs not ignored")
+
+    with pytest.raises(ValueError):
+        composites.PhaseCompositeAccumulator((3, 12), seasons={"a": (1, 2), "b": (2, 3)})
+    with pytest.raises(ValueError):
+        target.add(olrdata.olr, olrdata.time, pc.PCData(pcs.time[10:], pcs.pc1[10:], pcs.pc2[10:]))
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
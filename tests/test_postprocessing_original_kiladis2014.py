@@ -50,6 +50,45 @@ def test_if_refdata_isfound_for_correct_spontaneous_sign_changes_in_eof_series()
         pytest.fail("Function failed with OS Error, hence the reference data has probably not been found, which points "
                     "to an installation problem of the package: ".format(OSError))
 
+def test_correct_spontaneous_sign_changes_in_eof_series():
+    lat = np.array([-10., 0., 10.])
+    long = np.array([0., 5.])
+    doys = np.arange(1, 367)
+    base1 = np.array([1., 2., 3., 4., 5., 6.])
+    base2 = np.array([6., -5., 4., -3., 2., -1.])
+    signs1 = np.where(doys % 3 == 0, -1., 1.)
+    signs2 = np.where(doys % 7 == 0, -1., 1.)
+    eofs = eof.EOFDataForAllDOYs.from_arrays(lat, long, signs1[:, np.newaxis] * base1, signs2[:, np.newaxis] * base2,
+                                             no_leap_years=False)
+
+    errors = []
+
+    target = pp_kil2014.correct_spontaneous_sign_changes_in_eof_series(eofs, doy1reference=False)
+    if not np.all(target.eof1vectors == base1):
+        errors.append("Signs of EOF1 are not aligned")
+    if not np.all(target.eof2vectors == base2):
+        errors.append("Signs of EOF2 are not aligned")
+
+    flipped_eofs = eof.EOFDataForAllDOYs.from_arrays(lat, long, -1 * eofs.eof1vectors, eofs.eof2vectors,
+                                                     no_leap_years=False)
+    target = pp_kil2014.correct_spontaneous_sign_changes_in_eof_series(flipped_eofs, doy1reference=False)
+    if not np.all(target.eof1vectors == -1 * base1):
+        errors.append("Signs of EOF1 are not aligned to DOY 1")
+
+    # The reference is interpolated onto the target grid. Both results must be equal, although the second call
+    # uses the cached reference
+    with pytest.warns(UserWarning, match="References for the sign of the EOFs for DOY1 have to be interpolated"):
+        target1 = pp_kil2014.correct_spontaneous_sign_changes_in_eof_series(eofs, doy1reference=True)
+    with pytest.warns(UserWarning, match="References for the sign of the EOFs for DOY1 have to be interpolated"):
+        target2 = pp_kil2014.correct_spontaneous_sign_changes_in_eof_series(flipped_eofs, doy1reference=True)
+    if not np.all(np.abs(target1.eof1vectors) == base1) or not np.all(target1.eof1vectors == target2.eof1vectors):
+        errors.append("Signs of EOF1 are not aligned to the reference")
+    if not np.all(np.abs(target1.eof2vectors) == np.abs(base2)) or not np.all(target1.eof2vectors == target2.eof2vectors):
+        errors.append("Signs of EOF2 are not aligned to the reference")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
 def test_post_process_eofs_original_kiladis_approach():
 
     errors = []
@@ -89,3 +128,33 @@ def test_post_process_eofs_original_kiladis_approach_with_kw_dict():
 
 
 
+
+
+@pytest.mark.parametrize('no_leap_years', [False, True])
+def test_interpolate_eofs_between_doys(no_leap_years):
+    lat = np.array([-10., 0., 10.])
+    long = np.array([0., 5.])
+    rng = np.random.default_rng(1)
+    ndoys = 365 if no_leap_years else 366
+    eof1 = rng.standard_normal((ndoys, 6))
+    eof2 = rng.standard_normal((ndoys, 6))
+    eofs = eof.EOFDataForAllDOYs.from_arrays(lat, long, eof1, eof2, no_leap_years)
+
+    target = pp_kil2014.interpolate_eofs_between_doys(eofs, start_doy=10, end_doy=20)
+
+    errors = []
+    expected_eof1 = eof1.copy()
+    expected_eof2 = eof2.copy()
+    for i in range(6):
+        expected_eof1[10:18, i] = np.interp(np.arange(11, 19), [10, 20], [eof1[9, i], eof1[19, i]])
+        expected_eof2[10:18, i] = np.interp(np.arange(11, 19), [10, 20], [eof2[9, i], eof2[19, i]])
+    if not np.allclose(target.eof1vectors, expected_eof1, rtol=0, atol=1e-14):
+        errors.append("Interpolated EOF1 is incorrect")
+    if not np.allclose(target.eof2vectors, expected_eof2, rtol=0, atol=1e-14):
+        errors.append("Interpolated EOF2 is incorrect")
+    if not np.all(target.eof1vectors[18:, :] == eof1[18:, :]) or not np.all(target.eof1vectors[:10, :] == eof1[:10, :]):
+        errors.append("EOF1 outside of the interpolation period has been changed")
+    if not target.no_leap_years == no_leap_years:
+        errors.append("no_leap_years is incorrect")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
@@ -46,6 +46,76 @@ def test_compute_angle_between_vectors(a,b,result):
 
     assert not errors, "errors occurred:\n{}".format("\n".join(errors)) 
 
+def test_compute_angle_between_vectors_rowwise():
+    vectors1 = np.array([a for (a, b, result) in setups_angle])
+    vectors2 = np.array([b for (a, b, result) in setups_angle])
+    results = np.array([result for (a, b, result) in setups_angle])
+
+    errors = []
+
+    vect_angles = omir.angle_btwn_vectors(vectors1, vectors2)
+
+    if not np.allclose(vect_angles, results):
+        errors.append("error with row-wise calculation of angles")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def _synthetic_eofs_for_rotation():
+    rng = np.random.default_rng(7)
+    lat = np.array([-10., 0., 10.])
+    long = np.array([0., 5., 10., 15.])
+    base1 = rng.standard_normal(12)
+    base2 = rng.standard_normal(12)
+    eofs = []
+    for doy in range(1, 367):
+        phase = 2 * np.pi * doy / 366
+        eof1 = np.cos(phase) * base1 + np.sin(phase) * base2 + 0.1 * rng.standard_normal(12)
+        eof2 = -np.sin(phase) * base1 + np.cos(phase) * base2 + 0.1 * rng.standard_normal(12)
+        # orthonormal basis per DOY
+        q, r = np.linalg.qr(np.array([eof1, eof2]).T)
+        eofs.append(eof.EOFData(lat, long, q[:, 0], q[:, 1]))
+    return eof.EOFDataForAllDOYs(eofs, no_leap_years=False)
+
+
+def test_rotation_equals_explicit_projection_matrices():
+    eofs = _synthetic_eofs_for_rotation()
+
+    # straightforward implementation with explicit M x M projection matrices
+    rots = np.array([eofs.eof1vector_for_doy(1), eofs.eof2vector_for_doy(1)])
+    for doy in list(range(2, 367)) + [1]:
+        B = np.array([eofs.eof1vector_for_doy(doy), eofs.eof2vector_for_doy(doy)]).T
+        rots = np.matmul(np.matmul(B, B.T), rots.T).T
+    discont = omir.angle_btwn_vectors(eofs.eof1vector_for_doy(1), rots[0, :])
+    if np.dot(eofs.eof1vector_for_doy(1), rots[1, :]) <= 0:
+        discont = -discont
+    delta = discont / 366
+
+    R = omir.rotation_matrix(delta)
+    rots = np.array([eofs.eof1vector_for_doy(1), eofs.eof2vector_for_doy(1)])
+    expected_eof1 = [rots[0, :]]
+    expected_eof2 = [rots[1, :]]
+    for doy in range(2, 367):
+        B = np.array([eofs.eof1vector_for_doy(doy), eofs.eof2vector_for_doy(doy)]).T
+        rots = np.matmul(np.matmul(np.matmul(B, B.T), rots.T), R).T
+        expected_eof1.append(rots[0, :])
+        expected_eof2.append(rots[1, :])
+
+    errors = []
+
+    target_delta = omir.calculate_angle_from_discontinuity(eofs)
+    if not np.isclose(target_delta, delta, rtol=1e-10, atol=0):
+        errors.append("Rotation angle differs from explicit calculation")
+
+    target = omir.rotate_each_eof_by_delta(eofs, delta)
+    if not np.allclose(target.eof1vectors, np.array(expected_eof1), rtol=0, atol=1e-12):
+        errors.append("Rotated EOF1 differs from explicit calculation")
+    if not np.allclose(target.eof2vectors, np.array(expected_eof2), rtol=0, atol=1e-12):
+        errors.append("Rotated EOF2 differs from explicit calculation")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
 def test_calculate_rotation_angle():
     # test rotation direction also
     errors = []
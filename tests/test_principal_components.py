@@ -112,3 +112,194 @@ def test_load_original_pcs_from_txt_file():
         errors.append("Last Entry of Dates wrong!")
 
     assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_load_original_pcs_from_txt_file_synthetic_data(tmp_path):
+    filename = tmp_path / "omi.txt"
+    with open(filename, "w") as f:
+        f.write("2019 12 31  0  0.12345 -0.54321  0.55714\n")
+        f.write("2020  1  1  0  0.22345 -0.64321  0.68092\n")
+        f.write("2020  2 29  0  0.32345 -0.74321  0.81054\n")
+
+    target = pc.load_original_pcs_from_txt_file(filename)
+
+    errors = []
+    if not np.all(target.time == np.array([np.datetime64("2019-12-31"), np.datetime64("2020-01-01"),
+                                           np.datetime64("2020-02-29")])):
+        errors.append("Dates do not match.")
+    if not np.all(target.pc1 == np.array([0.12345, 0.22345, 0.32345])):
+        errors.append("PC1 values do not match.")
+    if not np.all(target.pc2 == np.array([-0.54321, -0.64321, -0.74321])):
+        errors.append("PC2 values do not match.")
+
+    with open(filename, "w") as f:
+        f.write("2019  2 29  0  0.12345 -0.54321  0.55714\n")
+    with pytest.raises(ValueError) as e:
+        pc.load_original_pcs_from_txt_file(filename)
+    if "Invalid date" not in str(e.value):
+        errors.append("Invalid date not detected.")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_save_pcs_to_npy_file_and_load_pcs_from_npy_file(tmp_path):
+    filename = tmp_path / "pcs.npy"
+    test_dates = np.arange("2019-06-10", "2019-06-20", dtype="datetime64[D]")
+    test_pc1 = np.linspace(-1, 1, test_dates.size)
+    test_pc2 = np.linspace(2, 3, test_dates.size)
+
+    errors = []
+    pc.PCData(test_dates[:4], test_pc1[:4], test_pc2[:4]).save_pcs_to_npy_file(filename)
+    target = pc.load_pcs_from_npy_file(filename)
+    if not np.all(target.time == test_dates[:4]):
+        errors.append("Dates do not match.")
+    if not np.all(target.pc1 == test_pc1[:4]) or not np.all(target.pc2 == test_pc2[:4]):
+        errors.append("PC values do not match.")
+
+    pc.PCData(test_dates[4:5], test_pc1[4:5], test_pc2[4:5]).append_pcs_to_npy_file(filename)
+    pc.PCData(test_dates[5:], test_pc1[5:], test_pc2[5:]).append_pcs_to_npy_file(filename)
+    target = pc.load_pcs_from_npy_file(filename)
+    if not np.all(target.time == test_dates):
+        errors.append("Dates do not match after appending.")
+    if not np.all(target.pc1 == test_pc1) or not np.all(target.pc2 == test_pc2):
+        errors.append("PC values do not match after appending.")
+
+    with pytest.raises(ValueError) as e:
+        pc.PCData(test_dates[-2:], test_pc1[-2:], test_pc2[-2:]).append_pcs_to_npy_file(filename)
+    if "start after the last date" not in str(e.value):
+        errors.append("Overlapping dates not detected.")
+
+    new_filename = tmp_path / "new_pcs.npy"
+    pc.PCData(test_dates, test_pc1, test_pc2).append_pcs_to_npy_file(new_filename)
+    if not np.all(pc.load_pcs_from_npy_file(new_filename).time == test_dates):
+        errors.append("Appending to a non-existing file failed.")
+
+    with pytest.raises(ValueError) as e:
+        pc.PCData(np.array([np.datetime64("2019-06-10T12:00")]), np.array([1.]),
+                  np.array([2.])).save_pcs_to_npy_file(tmp_path / "invalid.npy")
+    if "full days" not in str(e.value):
+        errors.append("Time grid with fractional days not detected.")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_append_pcs_to_npy_file_past_digit_boundary(tmp_path):
+    test_dates = np.arange("2019-06-01", "2019-06-13", dtype="datetime64[D]")
+    test_pc1 = np.linspace(-1, 1, test_dates.size)
+    test_pc2 = np.linspace(2, 3, test_dates.size)
+
+    errors = []
+    # header with growth space, which is updated in place
+    filename = tmp_path / "pcs.npy"
+    pc.PCData(test_dates[:9], test_pc1[:9], test_pc2[:9]).save_pcs_to_npy_file(filename)
+    pc.PCData(test_dates[9:], test_pc1[9:], test_pc2[9:]).append_pcs_to_npy_file(filename)
+    target = pc.load_pcs_from_npy_file(filename)
+    if not (np.all(target.time == test_dates) and np.all(target.pc1 == test_pc1) and np.all(target.pc2 == test_pc2)):
+        errors.append("PCs do not match after appending past a digit boundary.")
+
+    # header without any spare space as written by older numpy versions, which requires rewriting the file
+    legacy_filename = tmp_path / "legacy_pcs.npy"
+    data = np.load(filename)[:9]
+    header = "{'descr': %s, 'fortran_order': False, 'shape': (9,), }\n" % repr(
+        np.lib.format.dtype_to_descr(data.dtype))
+    with open(legacy_filename, "wb") as f:
+        f.write(b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1"))
+        f.write(data.tobytes())
+    pc.PCData(test_dates[9:], test_pc1[9:], test_pc2[9:]).append_pcs_to_npy_file(legacy_filename)
+    target = pc.load_pcs_from_npy_file(legacy_filename)
+    if not (np.all(target.time == test_dates) and np.all(target.pc1 == test_pc1) and np.all(target.pc2 == test_pc2)):
+        errors.append("PCs do not match after appending to a file without spare header space.")
+    if (tmp_path / "legacy_pcs.npy.tmp").exists():
+        errors.append("Temporary file has not been removed.")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_calc_amplitude_and_phase():
+    # RMM1 = PC2 and RMM2 = -PC1, phase 1 starts at the negative RMM1 axis
+    angles = np.deg2rad(np.array([-170., -100., -80., -10., 10., 80., 100., 170., 180.]))
+    rmm1 = 2. * np.cos(angles)
+    rmm2 = 2. * np.sin(angles)
+    pc1 = -rmm2
+    pc2 = rmm1
+    time = np.arange("2010-01-01", "2010-01-10", dtype="datetime64[D]")
+    target = pc.PCData(time, pc1, pc2)
+
+    errors = []
+    if not np.allclose(target.calc_amplitude(), 2.):
+        errors.append("Amplitude is incorrect")
+    if not np.array_equal(target.calc_phase(), np.array([1, 2, 3, 4, 5, 6, 7, 8, 8])):
+        errors.append("Phase is incorrect")
+
+    stacked_pc1 = np.stack((pc1, -pc1))
+    stacked_pc2 = np.stack((pc2, -pc2))
+    if not np.array_equal(pc.calc_phase(stacked_pc1, stacked_pc2)[1, :-1], np.array([5, 6, 7, 8, 1, 2, 3, 4])):
+        errors.append("Phase of stacked PCs is incorrect")
+    if not pc.calc_amplitude(stacked_pc1, stacked_pc2).shape == (2, 9):
+        errors.append("Shape of amplitude of stacked PCs is incorrect")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_find_mjo_events():
+    time = np.arange("2010-01-01", "2010-02-10", dtype="datetime64[D]")
+    amplitude = np.full(time.size, 0.5)
+    amplitude[2:12] = 1.5
+    amplitude[20:23] = 2.
+    amplitude[30:40] = 1.2
+    # eastward propagation by 10° per day, starting in phase 1
+    angle = np.deg2rad(-175. + 10. * np.arange(time.size))
+    # westward propagation for the last event
+    angle[30:40] = np.deg2rad(50. - 10. * np.arange(10))
+    pc1 = -amplitude * np.sin(angle)
+    pc2 = amplitude * np.cos(angle)
+    target = pc.PCData(time, pc1, pc2)
+
+    errors = []
+    events = target.find_mjo_events()
+    if not len(events) == 3:
+        errors.append("Number of events is incorrect")
+    else:
+        if not (events.start[0] == time[2] and events.end[0] == time[11] and events.duration[0] == 10):
+            errors.append("Period of first event is incorrect")
+        if not (np.isclose(events.max_amplitude[1], 2.) and np.isclose(events.mean_amplitude[2], 1.2)):
+            errors.append("Amplitude of events is incorrect")
+        if not (events.start_phase[0] == 1 and events.end_phase[0] == 3):
+            errors.append("Phase of first event is incorrect")
+        if not (np.isclose(events.phase_propagation[0], 2.) and np.isclose(events.phase_propagation[2], -2.)):
+            errors.append("Phase propagation is incorrect")
+        if "member" in events.columns:
+            errors.append("Member column for single PCs")
+
+    events = target.find_mjo_events(min_duration=4, min_phase_propagation=1.)
+    if not (len(events) == 1 and events.start[0] == time[2]):
+        errors.append("Events not filtered correctly")
+
+    # ensemble with an event reaching the end of the first member and one starting at the beginning of the second
+    stacked_pc1 = np.stack((pc1, np.roll(pc1, -2)))
+    stacked_pc2 = np.stack((pc2, np.roll(pc2, -2)))
+    events = pc.find_mjo_events(time, stacked_pc1, stacked_pc2)
+    if not np.array_equal(events.member.values, np.array([0, 0, 0, 1, 1, 1])):
+        errors.append("Members of events are incorrect")
+    elif not (events.end.values[2] == time[-1] and events.start.values[3] == time[0]
+              and events.duration.values[3] == 10):
+        errors.append("Events at member boundaries are incorrect")
+
+    # leading undefined PCs, e.g., from the real-time OMI, do not affect the events
+    nan_pc1 = pc1.copy()
+    nan_pc2 = pc2.copy()
+    nan_pc1[:2] = np.nan
+    nan_pc2[:2] = np.nan
+    with np.errstate(invalid="raise"):
+        phase = pc.calc_phase(nan_pc1, nan_pc2)
+    if not (np.all(phase[:2] == 0) and np.array_equal(phase[2:], pc.calc_phase(pc1, pc2)[2:])):
+        errors.append("Phase of undefined PCs is incorrect")
+    nan_events = pc.find_mjo_events(time, nan_pc1, nan_pc2, min_phase_propagation=-10.)
+    if not (len(nan_events) == 3 and np.allclose(nan_events.phase_propagation.values,
+                                                 target.find_mjo_events().phase_propagation.values)):
+        errors.append("Events are affected by undefined PCs")
+
+    with pytest.raises(ValueError):
+        pc.find_mjo_events(time[1:], pc1, pc2)
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
@@ -21,6 +21,8 @@
 
 # Contact: christoph.hoffmann@uni-greifswald.de
 
+import json
+
 import numpy as np
 import pytest
 
@@ -111,6 +113,21 @@ def test_calc_day_of_year_array():
     if not np.all(target == np.array([1, 2, 3])):
         errors.append("Error in DOY calc for array with format ns")
 
+    dates = np.arange("2019-12-30", "2021-01-03", dtype="datetime64[D]")
+    control = np.array([tools.calc_day_of_year(date, no_leap_years) for date in dates])
+    target = tools.calc_day_of_year(dates, no_leap_years)
+    if not np.all(target == control):
+        errors.append("Error in DOY calc for array covering a leap year")
+
+    no_leap_years = True
+    dates_without_feb29 = dates[dates != np.datetime64("2020-02-29")]
+    control = np.array([tools.calc_day_of_year(date, no_leap_years) for date in dates_without_feb29])
+    target = tools.calc_day_of_year(dates_without_feb29, no_leap_years)
+    if not np.all(target == control):
+        errors.append("Error in DOY calc for array with no_leap_years = True")
+    with pytest.raises(ValueError):
+        tools.calc_day_of_year(dates, no_leap_years)
+
     assert not errors, "errors occurred:\n{}".format("\n".join(errors))
 
 
@@ -271,3 +288,78 @@ def test_doy_list():
         errors.append("DOY list not correct for no_leap_years = True") 
 
     assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_regrid_bilinear():
+    source_lat = np.array([2.5, 0., -2.5])
+    source_long = np.array([10., 20., 30., 40.])
+    data = np.array([((9., 10., 11., 12.),
+                      (5., 6., 7., 8.),
+                      (1., 2., 3., 4.)),
+                     ((90., 100., 110., 120.),
+                      (50., 60., 70., 80.),
+                      (10., 20., 30., 40.))])
+
+    errors = []
+
+    target = tools.regrid_bilinear(data, source_lat, source_long, np.array([-1.25, 1.25]), np.array([15., 25., 35.]))
+    if not target.shape == (2, 2, 3):
+        errors.append("Shape of interpolated data is incorrect.")
+    if not np.all(target[0, :, :] == np.array([(3.5, 4.5, 5.5), (7.5, 8.5, 9.5)])):
+        errors.append("Interpolation with descending source latitudes incorrect.")
+    if not np.all(target[1, 1, :] == np.array([75., 85., 95.])):
+        errors.append("Interpolation of second time step incorrect.")
+
+    target = tools.regrid_bilinear(data[0, :, :], source_lat, source_long, np.array([2.5, 0.]), np.array([40., 10.]))
+    if not np.all(target == np.array([(12., 9.), (8., 5.)])):
+        errors.append("Interpolation onto source grid points incorrect.")
+
+    with pytest.raises(ValueError) as e:
+        tools.regrid_bilinear(data, source_lat, source_long, np.array([0.]), np.array([15., 45.]))
+    if "Longitude values out of range" not in str(e.value):
+        errors.append("Target grid outside of source grid not detected.")
+
+    target = tools.regrid_bilinear(data[0, :, :], source_lat, source_long, np.array([5.]), np.array([5., 45.]),
+                                   clamp_to_source_grid=True)
+    if not np.all(target == np.array([(9., 12.)])):
+        errors.append("Clamping to source grid incorrect.")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_write_and_remove_metadata_file(tmp_path):
+    filename = tmp_path / "metadata.json"
+    errors = []
+
+    tools.write_metadata_file(filename, {"content": "test", "format_version": 1})
+    tools.write_metadata_file(filename, {"content": "test", "format_version": 2})
+    with open(filename, "r") as f:
+        if not json.load(f) == {"content": "test", "format_version": 2}:
+            errors.append("Content of metadata file incorrect.")
+    if not [f.name for f in tmp_path.iterdir()] == ["metadata.json"]:
+        errors.append("Temporary file has not been removed.")
+
+    tools.remove_metadata_file(filename)
+    if filename.exists():
+        errors.append("Metadata file has not been removed.")
+    # removing a non-existing file is no error
+    tools.remove_metadata_file(filename)
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_save_npy_file(tmp_path):
+    filename = tmp_path / "data.npy"
+    errors = []
+
+    tools.save_npy_file(filename, np.arange(10.))
+    mapped = np.load(filename, mmap_mode="r")
+    tools.save_npy_file(filename, np.arange(20.))
+    if not np.all(mapped == np.arange(10.)):
+        errors.append("Memory-mapped data of the replaced file has changed.")
+    if not np.all(np.load(filename) == np.arange(20.)):
+        errors.append("Content of saved file incorrect.")
+    if not [f.name for f in tmp_path.iterdir()] == ["data.npy"]:
+        errors.append("Temporary file has not been removed.")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
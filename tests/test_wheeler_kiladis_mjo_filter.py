@@ -111,6 +111,66 @@ def test_mjoindices_reference_validation_filterOLRForMJO_PC_Calculation():
     assert not errors, "errors occurred:\n{}".format("\n".join(errors))
 
 
+def test_filter_olr_temporally_read_only_data(tmp_path):
+    time = np.arange("2018-01-01", "2019-12-31", dtype='datetime64[D]')
+    lat = np.array([-2.5, 2.5])
+    long = np.array([0., 90., 180., 270.])
+    olrmatrix = 200. + 10. * np.sin(2 * np.pi * np.arange(time.size) / 50.)[:, None, None] * np.ones((1, 2, 4))
+    testdata = olr.OLRData(olrmatrix, time, lat, long)
+    testdata.save_to_directory(tmp_path / "olr")
+    mmap_data = olr.restore_from_directory(tmp_path / "olr")
+
+    control = wkfilter.filter_olr_for_mjo_pc_calculation(olr.OLRData(olrmatrix, time, lat, long))
+    target = wkfilter.filter_olr_for_mjo_pc_calculation(mmap_data)
+
+    errors = []
+    if not np.allclose(target.olr, control.olr):
+        errors.append("Filtered memory-mapped data is not identical to filtered in-memory data")
+    if not np.all(mmap_data.olr == olrmatrix):
+        errors.append("Memory-mapped input data has been modified")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_filter_olr_temporally_packed_data():
+    time = np.arange("2018-01-01", "2019-12-31", dtype='datetime64[D]')
+    lat = np.array([-2.5, 2.5])
+    long = np.array([0., 90., 180., 270.])
+    olrmatrix = 200. + 10. * np.sin(2 * np.pi * np.arange(time.size) / 50.)[:, None, None] * np.ones((1, 2, 4))
+    packed_data = olr.pack_olr_data(olr.OLRData(olrmatrix, time, lat, long))
+
+    control = wkfilter.filter_olr_for_mjo_pc_calculation(olr.OLRData(packed_data.olr, time, lat, long))
+    target = wkfilter.filter_olr_for_mjo_pc_calculation(packed_data)
+
+    errors = []
+    if not np.allclose(target.olr, control.olr):
+        errors.append("Filtered packed data is not identical to filtered decoded data")
+    if not packed_data.is_packed or not np.allclose(packed_data.olr, olrmatrix, atol=0.005):
+        errors.append("Packed input data has been modified")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
+def test_filter_olr_single_precision():
+    time = np.arange("2018-01-01", "2019-12-31", dtype='datetime64[D]')
+    lat = np.array([-2.5, 2.5])
+    long = np.arange(0., 359.9, 30.)
+    t = np.arange(time.size)[:, None, None]
+    olrmatrix = 230. + 20. * np.cos(np.deg2rad(long)[None, None, :] - 2 * np.pi * t / 50.) * np.ones((1, 2, 1))
+    testdata = olr.OLRData(olrmatrix, time, lat, long)
+
+    control = wkfilter.filter_olr_for_mjo_eof_calculation(testdata)
+    target = wkfilter.filter_olr_for_mjo_eof_calculation(testdata, dtype=np.float32)
+
+    errors = []
+    if target.olr.dtype != np.float32:
+        errors.append("Filtered data is not of single precision")
+    if not np.allclose(target.olr, control.olr, rtol=0., atol=1e-3):
+        errors.append("Single precision filter result deviates too much from double precision result")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))
+
+
 def generate_reference_data_for_eof_filter_tests():
 
     orig_long = np.arange(0., 359.9, 2.5)
@@ -159,3 +219,48 @@ def generate_reference_data_for_pc_filter_tests():
     olrdata_filtered = wkfilter.filter_olr_for_mjo_pc_calculation(test_olr_part)
     filename = Path(str(reference_file_filterOLRForMJO_PC_Calculation_latmin10) + ".newcalc")
     olrdata_filtered.save_to_npzfile(filename)
+
+
+@pytest.mark.parametrize("nl", [12, 13])
+@pytest.mark.parametrize("filter_constants", [(20., 96., -720., 720.), (30., 96., 0., 720.)])
+def test_spectral_filter_removal_mask(nl, filter_constants):
+    nt = 256
+    dataperday = 0.25
+    period_min, period_max, wn_min, wn_max = filter_constants
+    f1 = f2 = 1 / period_max
+    f3 = f4 = 1 / period_min
+    s1 = s3 = wn_min
+    s2 = s4 = wn_max
+
+    # explicit evaluation on the reordered spectrum like in the original Kiladis code
+    freq_axis = wkfilter._kiladis_frequency_axis(nt, dataperday)
+    wn_axis = wkfilter._kiladis_wavenumber_axis(nl)
+    control = np.zeros((nt, nl), dtype=bool)
+    control_count = 0
+    for i_f in range(0, int(nt / 2) + 1):
+        for i_wn in range(0, nl):
+            ff = freq_axis[i_f]
+            ss = wn_axis[i_wn]
+            if ((ff >= ((ss * (f1 - f2) + f2 * s1 - f1 * s2) / (s1 - s2))) and
+                    (ff <= ((ss * (f3 - f4) + f4 * s3 - f3 * s4) / (s3 - s4))) and
+                    (ss >= ((ff * (s3 - s1) - f1 * s3 + f3 * s1) / (f3 - f1))) and
+                    (ss <= ((ff * (s4 - s2) - f2 * s4 + f4 * s2) / (f4 - f2)))):
+                control_count += 1
+            else:
+                control[i_f, i_wn] = True
+                control[(nt - i_f) % nt, (nl - i_wn) % nl] = True
+    control = wkfilter._reorder_spectrum_from_kiladis(control)
+
+    errors = []
+    target, target_count = wkfilter._spectral_filter_removal_mask(nt, nl, dataperday, f1, f3, wn_min, wn_max)
+    if not np.array_equal(target, control):
+        errors.append("Removal mask differs from explicit evaluation")
+    if not target_count == control_count:
+        errors.append("Number of retained elements is incorrect")
+    if not np.array_equal(wkfilter._reorder_spectrum_from_kiladis(wkfilter._reorder_spectrum_to_kiladis(target)),
+                          target):
+        errors.append("Reordering of the spectrum is not reversible")
+    if target.flags.writeable:
+        errors.append("Cached mask must be read-only")
+
+    assert not errors, "errors occurred:\n{}".format("\n".join(errors))